@@ -1,17 +1,65 @@
 import os
-from sqlalchemy import create_engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./resume_scorer.db")
 
-connect_args = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# Connection pool (Postgres): persistent connections, extra connections under burst load,
+# seconds to wait for a free connection, and max connection age (reconnects before server/proxy timeouts)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections on checkout so a restarted database doesn't surface as request errors
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# SQLite: how long a writer waits for the lock before "database is locked", and the
+# fsync level (NORMAL is safe with WAL; only the last commits can be lost on power loss)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+# Serve the read endpoints through an async engine (drivers in requirements-async.txt)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
-)
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def engine_options(url: str) -> dict:
+    if is_sqlite(url):
+        # SQLite locks the whole file; more connections than threads only adds contention
+        return {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def apply_sqlite_pragmas(engine):
+    """
+    WAL lets readers run alongside the writer instead of blocking on it, and
+    with WAL synchronous=NORMAL skips the fsync on every commit.
+    """
+    in_memory = make_url(str(engine.url)).database in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.close()
+
+def make_engine(url: str):
+    engine = create_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(engine)
+    return engine
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -22,3 +70,80 @@ def get_db():
         yield db
     finally:
         db.close()
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+_async_sessions = None
+
+def async_url(url: str):
+    """The async driver URL for a database URL (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    url = make_url(url)
+    return url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}")
+
+def get_async_sessions():
+    """Async session factory, or None when DB_ASYNC is off or the driver is missing."""
+    global _async_sessions
+    if _async_sessions is None and DB_ASYNC:
+        try:
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+            async_engine = create_async_engine(
+                async_url(SQLALCHEMY_DATABASE_URL), **engine_options(SQLALCHEMY_DATABASE_URL)
+            )
+            if is_sqlite(SQLALCHEMY_DATABASE_URL):
+                apply_sqlite_pragmas(async_engine.sync_engine)
+            _async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        except Exception as e:
+            print(f"Async database engine unavailable ({e}), using the sync engine")
+            _async_sessions = False
+    return _async_sessions or None
+
+async def get_read_db():
+    """
+    Session for read-only async endpoints: an AsyncSession when the async engine
+    is enabled, otherwise a regular Session. Run statements with execute().
+    """
+    sessions = get_async_sessions()
+    if sessions is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+        return
+    async with sessions() as db:
+        yield db
+
+async def execute(db, statement):
+    """Runs a statement on either session type without blocking the event loop."""
+    if isinstance(db, Session):
+        return await run_in_threadpool(db.execute, statement)
+    return await db.execute(statement)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+def upgrade_database(bind=None) -> list:
+    """
+    Applies the Alembic migrations (migrations/) up to head. Returns the
+    "table.column" names added to tables that already existed, so callers
+    can backfill them.
+    """
+    from alembic import command
+    from alembic.config import Config
+    bind = bind or engine
+    inspector = inspect(bind)
+    before = {
+        table: {column["name"] for column in inspector.get_columns(table)}
+        for table in inspector.get_table_names()
+    }
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["target_metadata"] = Base.metadata
+    with bind.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+
+    inspector = inspect(bind)
+    return [
+        f"{table}.{column['name']}"
+        for table, existing in before.items() if table != "alembic_version"
+        for column in inspector.get_columns(table) if column["name"] not in existing
+    ]
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Optional, List
 from dotenv import load_dotenv
 from langchain_core.tools import tool
@@ -17,7 +18,10 @@ GITLAB_TOKEN = os.getenv("GITLAB_TOKEN")
 GITLAB_URL = os.getenv("GITLAB_URL", "https://gitlabproxy.lightinfosys.com")
 PROJECT_ID = int(os.getenv("GITLAB_PROJECT_ID", "192"))
 
-gitlab_service = GitLabService(token=GITLAB_TOKEN, url=GITLAB_URL)
+@lru_cache(maxsize=1)
+def get_gitlab_service() -> GitLabService:
+    # Connects on the first tool call, not when the app imports this module
+    return GitLabService(token=GITLAB_TOKEN, url=GITLAB_URL)
 
 @tool
 def list_issues(state: str = "opened") -> str:
@@ -42,7 +46,7 @@ def list_issues(state: str = "opened") -> str:
         # or we just use the existing list_milestones to get a summary.
         
         # Let's try to get the project and list issues directly for now using the service's client
-        project = gitlab_service.gl.projects.get(PROJECT_ID)
+        project = get_gitlab_service().gl.projects.get(PROJECT_ID)
         issues = project.issues.list(state=state, per_page=20)
         
         result = []
@@ -81,7 +85,7 @@ def create_issue(title: str, description: str = "", assignee_id: Optional[int] =
         return "Error: GITLAB_PROJECT_ID not set."
     
     try:
-        project = gitlab_service.gl.projects.get(PROJECT_ID)
+        project = get_gitlab_service().gl.projects.get(PROJECT_ID)
         issue_data = {'title': title, 'description': description}
         if assignee_id:
             issue_data['assignee_ids'] = [assignee_id]
@@ -103,7 +107,7 @@ def add_comment(issue_iid: int, comment: str) -> str:
         return "Error: GITLAB_PROJECT_ID not set."
     
     try:
-        project = gitlab_service.gl.projects.get(PROJECT_ID)
+        project = get_gitlab_service().gl.projects.get(PROJECT_ID)
         issue = project.issues.get(issue_iid)
         note = issue.notes.create({'body': comment})
         return f"Added comment to issue #{issue_iid}."
@@ -118,7 +122,7 @@ def get_milestone_summary_tool(milestone_id: int) -> str:
         milestone_id: The ID of the milestone
     """
     try:
-        summary = gitlab_service.get_milestone_summary(PROJECT_ID, milestone_id)
+        summary = get_gitlab_service().get_milestone_summary(PROJECT_ID, milestone_id)
         # Format summary for LLM
         return str(summary)
     except Exception as e:
@@ -135,7 +139,7 @@ def list_milestones(state: str = "active") -> str:
         return "Error: GITLAB_PROJECT_ID not set."
     
     try:
-        project = gitlab_service.gl.projects.get(PROJECT_ID)
+        project = get_gitlab_service().gl.projects.get(PROJECT_ID)
         milestones = project.milestones.list(state=state)
         
         if not milestones:
@@ -163,7 +167,7 @@ def update_issue(issue_iid: int, milestone_id: Optional[int] = None, due_date: O
         return "Error: GITLAB_PROJECT_ID not set."
     
     try:
-        project = gitlab_service.gl.projects.get(PROJECT_ID)
+        project = get_gitlab_service().gl.projects.get(PROJECT_ID)
         issue = project.issues.get(issue_iid)
         
         updates = {}
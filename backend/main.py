@@ -1,19 +1,58 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 try:
-    from .database import engine, Base
+    from .database import upgrade_database
     from .routers import resume, gitlab, chat, neil
+    from .services.scoring_jobs import resume_pending_jobs, backfill_resume_scores
+    from .services.skills import backfill_skill_ids
+    from .services.search import backfill_search_index
+    from .services.dedup import backfill_candidates
+    from .services.extraction import shutdown_pool
+    from .services.embeddings import load_index
+    from .services.uploads import RequestSizeLimitMiddleware
 except ImportError:
-    from database import engine, Base
+    from database import upgrade_database
     from routers import resume, gitlab, chat, neil
+    from services.scoring_jobs import resume_pending_jobs, backfill_resume_scores
+    from services.skills import backfill_skill_ids
+    from services.search import backfill_search_index
+    from services.dedup import backfill_candidates
+    from services.extraction import shutdown_pool
+    from services.embeddings import load_index
+    from services.uploads import RequestSizeLimitMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi import Request
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+def prepare_database():
+    """Migrates the schema and fills in everything derived from stored resumes. Safe to run repeatedly."""
+    # Create or migrate the schema (see migrations/); backfill columns new to existing tables
+    added_columns = upgrade_database()
+    if "resumes.score" in added_columns:
+        backfill_resume_scores()
+    # Skill ids of resumes and JDs stored before the taxonomy, or cleared by a migration to be resolved again
+    backfill_skill_ids()
+    # Full-text index over resumes; fills in any resume not indexed yet
+    backfill_search_index()
+    # Candidate identities and near-duplicate signatures for resumes stored before deduplication
+    backfill_candidates()
+    # Embed resumes missing a current vector and load the similarity-search index
+    load_index()
 
-app = FastAPI(title="e42 Foundry API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs when the server starts, not when this module is imported
+    prepare_database()
+    # Pick up scoring jobs interrupted by a crash or restart
+    resume_pending_jobs()
+    yield
+    shutdown_pool()
+
+app = FastAPI(title="e42 Foundry API", lifespan=lifespan)
+
+# Oversized uploads are refused before their body is parsed; added first so CORS headers still wrap the 413
+app.add_middleware(RequestSizeLimitMiddleware)
 
 # CORS setup
 # Allow all origins for development to prevent 400 Bad Request
@@ -23,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.exception_handler(RequestValidationError)
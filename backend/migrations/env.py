@@ -0,0 +1,42 @@
+from alembic import context
+
+config = context.config
+
+def target_metadata():
+    # Passed in by database.upgrade_database(); imported when run from the alembic CLI
+    metadata = config.attributes.get("target_metadata")
+    if metadata is None:
+        from database import Base
+        import models  # noqa: F401  registers the tables on Base
+        metadata = Base.metadata
+    return metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Tables outside the models (the full-text index, see services/search.py) are not dropped
+    if type_ == "table" and reflected and compare_to is None:
+        return False
+    # Postgres-only indexes (GIN on JSONB) are not expected on other databases
+    if type_ == "index" and not reflected and object._ddl_if is not None:
+        return object._ddl_if.dialect in (None, context.get_context().dialect.name)
+    return True
+
+def configure(**kwargs):
+    context.configure(target_metadata=target_metadata(), include_object=include_object, **kwargs)
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    from database import engine
+    with engine.connect() as connection:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    # The migrations inspect the live schema (to extend pre-migration databases)
+    raise SystemExit("Offline (--sql) mode is not supported; run the migrations against a database")
+run_migrations_online()
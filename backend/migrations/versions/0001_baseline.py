@@ -0,0 +1,120 @@
+"""Baseline: the schema as created by create_all() before migrations existed
+
+Databases created before migrations have no alembic_version table, and may
+predate some of these columns; for them existing tables are extended with
+whatever is missing instead of being created.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def create_or_extend(name, *columns):
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table(name):
+        op.create_table(name, *columns)
+        return
+    existing = {column["name"] for column in inspector.get_columns(name)}
+    for column in columns:
+        if column.name not in existing:
+            op.add_column(name, column)
+
+def create_index(name, table, columns):
+    if name not in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}:
+        op.create_index(name, table, columns)
+
+def upgrade():
+    create_or_extend(
+        "job_descriptions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("role_title", sa.String),
+        sa.Column("filename", sa.String),
+        sa.Column("raw_text", sa.Text),
+        sa.Column("parsed_json", sa.JSON),
+        sa.Column("skill_ids", sa.JSON),
+        sa.Column("timestamp", sa.DateTime),
+    )
+    create_index("ix_job_descriptions_id", "job_descriptions", ["id"])
+
+    create_or_extend(
+        "resumes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("job_description_id", sa.Integer, sa.ForeignKey("job_descriptions.id")),
+        sa.Column("filename", sa.String),
+        sa.Column("raw_text", sa.Text),
+        sa.Column("parsed_json", sa.JSON),
+        sa.Column("score_json", sa.JSON),
+        sa.Column("score", sa.Float, nullable=False, server_default="0"),
+        sa.Column("verdict", sa.String),
+        sa.Column("timestamp", sa.DateTime),
+        sa.Column("embedding", sa.LargeBinary),
+        sa.Column("embedding_model", sa.String(64)),
+        sa.Column("skill_ids", sa.JSON),
+    )
+    create_index("ix_resumes_id", "resumes", ["id"])
+    create_index("ix_resumes_jd_score", "resumes", ["job_description_id", "score", "id"])
+
+    create_or_extend(
+        "scoring_jobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("job_description_id", sa.Integer, sa.ForeignKey("job_descriptions.id")),
+        sa.Column("status", sa.String),
+        sa.Column("total", sa.Integer),
+        sa.Column("done", sa.Integer),
+        sa.Column("failed", sa.Integer),
+        sa.Column("skipped", sa.Integer),
+        sa.Column("screened_out", sa.Integer),
+        sa.Column("error", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("heartbeat_at", sa.DateTime),
+    )
+    create_index("ix_scoring_jobs_id", "scoring_jobs", ["id"])
+
+    create_or_extend(
+        "scoring_job_items",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("job_id", sa.Integer, sa.ForeignKey("scoring_jobs.id")),
+        sa.Column("resume_id", sa.Integer, sa.ForeignKey("resumes.id")),
+        sa.Column("status", sa.String),
+        sa.Column("error", sa.Text),
+    )
+    create_index("ix_scoring_job_items_id", "scoring_job_items", ["id"])
+    create_index("ix_scoring_job_items_job_id", "scoring_job_items", ["job_id"])
+
+    create_or_extend(
+        "parse_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String),
+        sa.Column("prompt_version", sa.String),
+        sa.Column("parsed_json", sa.JSON),
+        sa.Column("hits", sa.Integer),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("last_used_at", sa.DateTime),
+    )
+    create_index("ix_parse_cache_last_used_at", "parse_cache", ["last_used_at"])
+
+    create_or_extend(
+        "skills",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String),
+    )
+    create_index("ix_skills_id", "skills", ["id"])
+
+    create_or_extend(
+        "skill_aliases",
+        sa.Column("key", sa.String, primary_key=True),
+        sa.Column("skill_id", sa.Integer, sa.ForeignKey("skills.id")),
+    )
+    create_index("ix_skill_aliases_skill_id", "skill_aliases", ["skill_id"])
+
+def downgrade():
+    for table in ("skill_aliases", "skills", "parse_cache", "scoring_job_items", "scoring_jobs", "resumes", "job_descriptions"):
+        op.drop_table(table)
@@ -0,0 +1,103 @@
+"""Typed, indexed hot columns on resumes; JSONB with GIN indexes on Postgres
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+import re
+import json
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 1000
+JSON_COLUMNS = [("resumes", "parsed_json"), ("resumes", "score_json"), ("job_descriptions", "parsed_json")]
+INDEXES = [
+    ("ix_resumes_email", ["email"]),
+    # "Highly Relevant with >= 5 years", overall and within a JD
+    ("ix_resumes_verdict_experience", ["verdict", "total_experience_years"]),
+    ("ix_resumes_jd_verdict_experience", ["job_description_id", "verdict", "total_experience_years"]),
+]
+GIN_INDEXES = [
+    ("ix_resumes_parsed_json_gin", "parsed_json"),
+    ("ix_resumes_score_json_gin", "score_json"),
+]
+
+def _years(value):
+    # Frozen copy of services.llm_schemas.years_value(): "5+ years" -> 5.0
+    if isinstance(value, str):
+        match = re.search(r"\d+(?:\.\d+)?", value)
+        return float(match.group()) if match else None
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _email(value):
+    return value.strip().lower() if isinstance(value, str) and "@" in value else None
+
+def backfill(bind):
+    """Copies email and experience out of parsed_json in id-ordered chunks."""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, parsed_json FROM resumes WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BACKFILL_CHUNK},
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for resume_id, parsed_json in rows:
+            if isinstance(parsed_json, str):
+                try:
+                    parsed_json = json.loads(parsed_json)
+                except ValueError:
+                    parsed_json = None
+            parsed_json = parsed_json if isinstance(parsed_json, dict) else {}
+            updates.append({
+                "id": resume_id,
+                "email": _email(parsed_json.get("email")),
+                "years": _years(parsed_json.get("total_experience_years")),
+            })
+        bind.execute(
+            sa.text("UPDATE resumes SET email = :email, total_experience_years = :years WHERE id = :id"), updates
+        )
+        last_id = rows[-1][0]
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases created by create_all() from the current models already have these
+    columns = {column["name"] for column in inspector.get_columns("resumes")}
+    if "email" not in columns:
+        op.add_column("resumes", sa.Column("email", sa.String))
+    if "total_experience_years" not in columns:
+        op.add_column("resumes", sa.Column("total_experience_years", sa.Float))
+    indexes = {index["name"] for index in inspector.get_indexes("resumes")}
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, "resumes", index_columns)
+
+    if bind.dialect.name == "postgresql":
+        for table, column in JSON_COLUMNS:
+            op.alter_column(table, column, type_=JSONB, postgresql_using=f"{column}::jsonb")
+        for name, column in GIN_INDEXES:
+            if name not in indexes:
+                op.create_index(name, "resumes", [column], postgresql_using="gin", postgresql_ops={column: "jsonb_path_ops"})
+
+    backfill(bind)
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for name, _ in GIN_INDEXES:
+            op.drop_index(name, table_name="resumes")
+        for table, column in JSON_COLUMNS:
+            op.alter_column(table, column, type_=sa.JSON, postgresql_using=f"{column}::json")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name="resumes")
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_column("total_experience_years")
+        batch.drop_column("email")
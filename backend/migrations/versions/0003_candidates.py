@@ -0,0 +1,61 @@
+"""Candidates with identity keys, MinHash signatures and an LSH band index for deduplication
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases created by create_all() from the current models already have these
+    if not inspector.has_table("candidates"):
+        op.create_table(
+            "candidates",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("name", sa.String),
+            sa.Column("email", sa.String),
+            sa.Column("created_at", sa.DateTime),
+        )
+        op.create_index("ix_candidates_id", "candidates", ["id"])
+    if not inspector.has_table("candidate_keys"):
+        op.create_table(
+            "candidate_keys",
+            sa.Column("key", sa.String, primary_key=True),
+            sa.Column("candidate_id", sa.Integer, sa.ForeignKey("candidates.id")),
+        )
+        op.create_index("ix_candidate_keys_candidate_id", "candidate_keys", ["candidate_id"])
+    if not inspector.has_table("resume_lsh_bands"):
+        op.create_table(
+            "resume_lsh_bands",
+            sa.Column("band", sa.BigInteger, primary_key=True),
+            sa.Column("resume_id", sa.Integer, sa.ForeignKey("resumes.id"), primary_key=True),
+        )
+
+    columns = {column["name"] for column in inspector.get_columns("resumes")}
+    with op.batch_alter_table("resumes") as batch:
+        if "candidate_id" not in columns:
+            batch.add_column(sa.Column("candidate_id", sa.Integer))
+            batch.create_foreign_key("fk_resumes_candidate_id", "candidates", ["candidate_id"], ["id"])
+        if "minhash" not in columns:
+            batch.add_column(sa.Column("minhash", sa.LargeBinary))
+    if "ix_resumes_candidate_id" not in {index["name"] for index in inspector.get_indexes("resumes")}:
+        op.create_index("ix_resumes_candidate_id", "resumes", ["candidate_id"])
+    # Existing resumes are linked by backfill_candidates() at startup
+
+def downgrade():
+    op.drop_index("ix_resumes_candidate_id", table_name="resumes")
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_constraint("fk_resumes_candidate_id", type_="foreignkey")
+        batch.drop_column("minhash")
+        batch.drop_column("candidate_id")
+    op.drop_table("resume_lsh_bands")
+    op.drop_table("candidate_keys")
+    op.drop_table("candidates")
@@ -0,0 +1,50 @@
+"""Resume x JD match table and matrix scoring jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases created by create_all() from the current models already have these
+    if not inspector.has_table("resume_matches"):
+        op.create_table(
+            "resume_matches",
+            sa.Column("resume_id", sa.Integer, sa.ForeignKey("resumes.id"), primary_key=True),
+            sa.Column("job_description_id", sa.Integer, sa.ForeignKey("job_descriptions.id"), primary_key=True),
+            sa.Column("prescore", sa.Float, nullable=False),
+            sa.Column("score_json", sa.JSON().with_variant(JSONB(), "postgresql")),
+            sa.Column("score", sa.Float),
+            sa.Column("verdict", sa.String),
+            sa.Column("status", sa.String),
+            sa.Column("updated_at", sa.DateTime),
+        )
+        op.create_index("ix_resume_matches_jd_score", "resume_matches", ["job_description_id", "score"])
+
+    if "mode" not in {column["name"] for column in inspector.get_columns("scoring_jobs")}:
+        op.add_column("scoring_jobs", sa.Column("mode", sa.String))
+    if "job_description_id" not in {column["name"] for column in inspector.get_columns("scoring_job_items")}:
+        with op.batch_alter_table("scoring_job_items") as batch:
+            batch.add_column(sa.Column("job_description_id", sa.Integer))
+            batch.create_foreign_key(
+                "fk_scoring_job_items_job_description_id", "job_descriptions", ["job_description_id"], ["id"]
+            )
+
+def downgrade():
+    with op.batch_alter_table("scoring_job_items") as batch:
+        batch.drop_constraint("fk_scoring_job_items_job_description_id", type_="foreignkey")
+        batch.drop_column("job_description_id")
+    with op.batch_alter_table("scoring_jobs") as batch:
+        batch.drop_column("mode")
+    op.drop_index("ix_resume_matches_jd_score", table_name="resume_matches")
+    op.drop_table("resume_matches")
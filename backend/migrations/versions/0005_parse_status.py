@@ -0,0 +1,53 @@
+"""How each resume was parsed, so local-only parses are not reused for near-duplicates
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 1000
+
+def _status(verdict, parsed_json):
+    if verdict == "Parse Failed":
+        return "failed"
+    if isinstance(parsed_json, str):
+        try:
+            parsed_json = json.loads(parsed_json)
+        except ValueError:
+            parsed_json = None
+    # LLM parses always carry the skills object; local-only ones (no API key) never do
+    return "parsed" if isinstance(parsed_json, dict) and "skills" in parsed_json else "local"
+
+def backfill(bind):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, verdict, parsed_json FROM resumes WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BACKFILL_CHUNK},
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE resumes SET parse_status = :status WHERE id = :id"),
+            [{"id": resume_id, "status": _status(verdict, parsed_json)} for resume_id, verdict, parsed_json in rows],
+        )
+        last_id = rows[-1][0]
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases created by create_all() from the current models already have it
+    if "parse_status" not in {column["name"] for column in sa.inspect(bind).get_columns("resumes")}:
+        op.add_column("resumes", sa.Column("parse_status", sa.String(16)))
+        backfill(bind)
+
+def downgrade():
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_column("parse_status")
@@ -0,0 +1,22 @@
+"""Token of the worker holding a scoring job, so a superseded worker stops writing
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Databases created by create_all() from the current models already have it
+    if "worker_token" not in {column["name"] for column in sa.inspect(op.get_bind()).get_columns("scoring_jobs")}:
+        op.add_column("scoring_jobs", sa.Column("worker_token", sa.String(32)))
+
+def downgrade():
+    with op.batch_alter_table("scoring_jobs") as batch:
+        batch.drop_column("worker_token")
@@ -0,0 +1,91 @@
+"""Drop seed skill aliases that merged different skills ("github" into Git, "spring" into Spring Boot, ...)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 1000
+
+# Seed alias -> the skill it was wrongly mapped to
+WRONG_ALIASES = {
+    "github": "Git",
+    "gitlab": "Git",
+    "spring": "Spring Boot",
+    "next": "Next.js",
+    "pm": "Project Management",
+}
+# Canonical skills for the aliases that name a skill of their own
+NEW_SKILLS = {
+    "GitHub": ["github"],
+    "GitLab": ["gitlab"],
+    "Spring": ["spring", "springframework"],
+}
+
+def _ids(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return set()
+    if isinstance(value, dict):
+        return {skill_id for ids in value.values() for skill_id in ids or []}
+    return set(value or [])
+
+def reset_skill_ids(bind, table: str, skill_ids: set):
+    """Clears skill_ids that include the given skills, so backfill_skill_ids() resolves them again."""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(f"SELECT id, skill_ids FROM {table} WHERE id > :last_id AND skill_ids IS NOT NULL ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BACKFILL_CHUNK},
+        ).all()
+        if not rows:
+            break
+        stale = [{"id": row_id} for row_id, value in rows if _ids(value) & skill_ids]
+        if stale:
+            bind.execute(sa.text(f"UPDATE {table} SET skill_ids = NULL WHERE id = :id"), stale)
+        last_id = rows[-1][0]
+
+def upgrade():
+    bind = op.get_bind()
+    # An empty table is seeded with the corrected aliases on first use
+    if bind.execute(sa.text("SELECT 1 FROM skill_aliases LIMIT 1")).first() is None:
+        return
+    wrong = bind.execute(sa.text(
+        "SELECT skill_aliases.key, skills.id, skills.name FROM skill_aliases "
+        "JOIN skills ON skills.id = skill_aliases.skill_id WHERE skill_aliases.key IN :keys"
+    ).bindparams(sa.bindparam("keys", expanding=True)), {"keys": list(WRONG_ALIASES)}).all()
+    wrong = [(key, skill_id) for key, skill_id, name in wrong if WRONG_ALIASES[key] == name]
+    if not wrong:
+        return
+    bind.execute(sa.text("DELETE FROM skill_aliases WHERE key = :key"), [{"key": key} for key, _ in wrong])
+    for name, keys in NEW_SKILLS.items():
+        taken = bind.execute(
+            sa.text("SELECT 1 FROM skill_aliases WHERE key IN :keys").bindparams(sa.bindparam("keys", expanding=True)),
+            {"keys": keys},
+        ).first()
+        if taken:
+            continue
+        bind.execute(sa.text("INSERT INTO skills (name) VALUES (:name)"), {"name": name})
+        skill_id = bind.execute(sa.text("SELECT MAX(id) FROM skills WHERE name = :name"), {"name": name}).scalar()
+        bind.execute(
+            sa.text("INSERT INTO skill_aliases (key, skill_id) VALUES (:key, :skill_id)"),
+            [{"key": key, "skill_id": skill_id} for key in keys],
+        )
+    # Resumes and JDs resolved through a dropped alias are resolved again at startup
+    merged = {skill_id for _, skill_id in wrong}
+    reset_skill_ids(bind, "resumes", merged)
+    reset_skill_ids(bind, "job_descriptions", merged)
+
+def downgrade():
+    # Data fix only: the dropped aliases were wrong and are not restored
+    pass
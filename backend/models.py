@@ -1,31 +1,150 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, JSON, DateTime, ForeignKey, Index, LargeBinary
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 try:
     from .database import Base
 except ImportError:
     from database import Base
 
+# JSONB on Postgres (indexable, parsed once on write), JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 class Resume(Base):
     __tablename__ = 'resumes'
     id = Column(Integer, primary_key=True, index=True)
     job_description_id = Column(Integer, ForeignKey('job_descriptions.id'))
     filename = Column(String)
-    raw_text = Column(Text)
-    parsed_json = Column(JSON)  # Stores extracted skills, exp, etc.
-    score_json = Column(JSON)   # Stores calculated scores
+    # Large fields are only loaded when accessed (or with undefer())
+    raw_text = deferred(Column(Text))
+    parsed_json = deferred(Column(JSONType))  # Stores extracted skills, exp, etc.
+    score_json = Column(JSONType)   # Stores calculated scores
+    score = Column(Float, nullable=False, default=0, server_default="0")  # score_json["score"], for SQL-side ranking
     verdict = Column(String)
+    # Copied out of parsed_json so they can be filtered on an index
+    email = Column(String)
+    total_experience_years = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # Skill vector (float32 bytes) for semantic search, and the embedder that produced it
+    embedding = deferred(Column(LargeBinary))
+    embedding_model = Column(String(64))
+    skill_ids = Column(JSON)  # Canonical Skill ids of the parsed skills
+    # The person behind this resume, shared by their other uploads, and the
+    # MinHash signature (uint32 bytes) of raw_text used to find near-duplicates
+    candidate_id = Column(Integer, ForeignKey('candidates.id'), index=True)
+    minhash = deferred(Column(LargeBinary))
+    # How parsed_json was produced: the ingestion status ("parsed", "cached", "reused",
+    # "local", "failed" or "empty"); only parses by the LLM are reused for near-duplicates
+    parse_status = Column(String(16))
 
     job_description = relationship("JobDescription", back_populates="resumes")
 
+    __table_args__ = (
+        # Ranking within a JD: ORDER BY score DESC, id with keyset pagination
+        Index('ix_resumes_jd_score', 'job_description_id', 'score', 'id'),
+        Index('ix_resumes_email', 'email'),
+        # Verdict + minimum experience filters, overall and within a JD
+        Index('ix_resumes_verdict_experience', 'verdict', 'total_experience_years'),
+        Index('ix_resumes_jd_verdict_experience', 'job_description_id', 'verdict', 'total_experience_years'),
+        # Containment queries on the JSON documents (Postgres only)
+        Index('ix_resumes_parsed_json_gin', 'parsed_json', postgresql_using='gin',
+              postgresql_ops={'parsed_json': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_resumes_score_json_gin', 'score_json', postgresql_using='gin',
+              postgresql_ops={'score_json': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+    )
+
 class JobDescription(Base):
     __tablename__ = 'job_descriptions'
     id = Column(Integer, primary_key=True, index=True)
     role_title = Column(String) # e.g. "Senior Python Dev"
     filename = Column(String)
-    raw_text = Column(Text)
-    parsed_json = Column(JSON)  # Stores required skills, exp, etc.
+    raw_text = deferred(Column(Text))
+    parsed_json = Column(JSONType)  # Stores required skills, exp, etc.
+    skill_ids = Column(JSON)  # {"required": [...], "good_to_have": [...]} canonical Skill ids
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     resumes = relationship("Resume", back_populates="job_description")
+
+class ScoringJob(Base):
+    __tablename__ = 'scoring_jobs'
+    id = Column(Integer, primary_key=True, index=True)
+    job_description_id = Column(Integer, ForeignKey('job_descriptions.id'))  # None for matrix jobs
+    mode = Column(String, default="jd")  # jd: the resumes of one JD; matrix: (resume, JD) pairs across JDs
+    status = Column(String, default="queued")  # queued, running, completed, failed
+    total = Column(Integer, default=0)
+    done = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)  # Resumes whose score was already up to date
+    screened_out = Column(Integer, default=0)  # Resumes kept at their local pre-score, not sent to the LLM
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow)  # Refreshed while a worker runs the job, used to detect crashed workers
+    worker_token = Column(String(32))  # Set by the worker that claimed the job; writes from any other worker are refused
+
+    items = relationship("ScoringJobItem", back_populates="job")
+
+class ScoringJobItem(Base):
+    __tablename__ = 'scoring_job_items'
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey('scoring_jobs.id'), index=True)
+    resume_id = Column(Integer, ForeignKey('resumes.id'))
+    job_description_id = Column(Integer, ForeignKey('job_descriptions.id'))  # Matrix jobs: the JD of this pair
+    status = Column(String, default="pending")  # pending, done, failed
+    error = Column(Text)
+
+    job = relationship("ScoringJob", back_populates="items")
+
+class ParseCache(Base):
+    __tablename__ = 'parse_cache'
+    key = Column(String(64), primary_key=True)  # sha256 of normalized text + prompt version + model
+    model = Column(String)
+    prompt_version = Column(String)
+    parsed_json = Column(JSON)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class Skill(Base):
+    __tablename__ = 'skills'
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)  # Canonical display name, e.g. "React"
+
+class SkillAlias(Base):
+    __tablename__ = 'skill_aliases'
+    key = Column(String, primary_key=True)  # Normalized spelling, e.g. "reactjs"
+    skill_id = Column(Integer, ForeignKey('skills.id'), index=True)
+
+class Candidate(Base):
+    __tablename__ = 'candidates'
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)  # From the first resume linked to the candidate
+    email = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CandidateKey(Base):
+    __tablename__ = 'candidate_keys'
+    key = Column(String, primary_key=True)  # Normalized identity, e.g. "email:jane@example.com"
+    candidate_id = Column(Integer, ForeignKey('candidates.id'), index=True)
+
+class ResumeBand(Base):
+    __tablename__ = 'resume_lsh_bands'
+    # LSH index over Resume.minhash: resumes sharing a band key are near-duplicate candidates
+    band = Column(BigInteger, primary_key=True)
+    resume_id = Column(Integer, ForeignKey('resumes.id'), primary_key=True)
+
+class ResumeMatch(Base):
+    __tablename__ = 'resume_matches'
+    # One row per (resume, JD) pair of matrix scoring, for any JD, not only the one uploaded for
+    resume_id = Column(Integer, ForeignKey('resumes.id'), primary_key=True)
+    job_description_id = Column(Integer, ForeignKey('job_descriptions.id'), primary_key=True)
+    prescore = Column(Float, nullable=False, default=0)  # Local pre-score (0-100), kept for every pair
+    score_json = Column(JSONType)  # AI score, for shortlisted pairs
+    score = Column(Float)
+    verdict = Column(String)
+    status = Column(String, default="screened_out")  # screened_out, pending, scored
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Ranking within a JD; the primary key already serves "roles of a resume"
+        Index('ix_resume_matches_jd_score', 'job_description_id', 'score'),
+    )
@@ -5,9 +5,11 @@ from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.messages import HumanMessage
 try:
     from ..services.ai_service import get_llm
+    from ..services.llm_clients import ainvoke_with_retry
     from backend.services.competitor_agent import competitor_graph
 except ImportError:
     from services.ai_service import get_llm
+    from services.llm_clients import ainvoke_with_retry
     from services.competitor_agent import competitor_graph
 
 router = APIRouter()
@@ -174,7 +176,7 @@ async def discover_competitors():
         ])
         
         chain = prompt | llm | JsonOutputParser()
-        parsed = await chain.ainvoke({"results": combined_results})
+        parsed = await ainvoke_with_retry(chain, {"results": combined_results}, client=llm)
         
         competitors_data = parsed.get("competitors", [])
         market_summary = parsed.get("market_summary", "Analysis unavailable.")
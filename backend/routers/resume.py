@@ -1,19 +1,61 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, and_, select, func, case
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, undefer
+from pydantic import BaseModel
+from datetime import datetime
 from typing import List, Optional
+import hashlib
+import json
+import time
 try:
-    from ..database import get_db
-    from ..models import Resume, JobDescription
-    from ..services.parser import extract_text
-    from ..services.ai_service import parse_resume_with_ai, parse_jd_with_ai, score_candidate_with_ai
+    from ..database import get_db, get_read_db, execute
+    from ..models import Resume, JobDescription, ScoringJob, Candidate, ResumeMatch
+    from ..services.extraction import extract_document, get_metrics as get_extraction_metrics
+    from ..services.ai_service import aparse_jd_with_ai
+    from ..services.ingestion import ingest_resumes, insert_resumes
+    from ..services.uploads import UploadTooLarge, check_upload_sizes, MAX_ARCHIVE_BYTES
+    from ..services.bulk_import import import_zip
+    from ..services.parse_cache import get_stats as get_parse_cache_stats
+    from ..services.scoring_jobs import create_scoring_job, create_matrix_job, enqueue_scoring_job, get_job_progress, is_stale
+    from ..services import embeddings
+    from ..services.skills import jd_skill_ids
+    from ..services.search import search_resumes, SearchUnavailable
 except ImportError:
-    from database import get_db
-    from models import Resume, JobDescription
-    from services.parser import extract_text
-    from services.ai_service import parse_resume_with_ai, parse_jd_with_ai, score_candidate_with_ai
+    from database import get_db, get_read_db, execute
+    from models import Resume, JobDescription, ScoringJob, Candidate, ResumeMatch
+    from services.extraction import extract_document, get_metrics as get_extraction_metrics
+    from services.ai_service import aparse_jd_with_ai
+    from services.ingestion import ingest_resumes, insert_resumes
+    from services.uploads import UploadTooLarge, check_upload_sizes, MAX_ARCHIVE_BYTES
+    from services.bulk_import import import_zip
+    from services.parse_cache import get_stats as get_parse_cache_stats
+    from services.scoring_jobs import create_scoring_job, create_matrix_job, enqueue_scoring_job, get_job_progress, is_stale
+    from services import embeddings
+    from services.skills import jd_skill_ids
+    from services.search import search_resumes, SearchUnavailable
 
 router = APIRouter()
 
+def candidate_ids(db: Session, resume_ids: List[int]) -> dict:
+    return dict(db.query(Resume.id, Resume.candidate_id).filter(Resume.id.in_(resume_ids)).all())
+
+def store_jd(db: Session, filename: str, text: str, parsed_data: dict) -> JobDescription:
+    db_jd = JobDescription(
+        # Role title from the parsed data, defaulting to the filename
+        role_title=parsed_data.get("role_title") or filename,
+        filename=filename,
+        raw_text=text,
+        parsed_json=parsed_data,
+        skill_ids=jd_skill_ids(db, parsed_data),
+    )
+    db.add(db_jd)
+    db.commit()
+    db.refresh(db_jd)
+    return db_jd
+
 @router.post("/upload/resumes")
 async def upload_resumes(
     files: List[UploadFile] = File(...), 
@@ -23,29 +65,52 @@ async def upload_resumes(
 ):
     print(f"Received upload_resumes request. Key present: {bool(x_openai_key)}")
     print(f"Files: {[f.filename for f in files]}")
-    uploaded_ids = []
-    for file in files:
-        content = await file.read()
-        text = extract_text(file.filename, content)
-        
-        # Parse with AI
-        parsed_data = parse_resume_with_ai(text, api_key=x_openai_key)
-        
-        # Create DB entry
-        db_resume = Resume(
-            job_description_id=jd_id,
-            filename=file.filename,
-            raw_text=text,
-            parsed_json=parsed_data,
-            score_json={},  # Placeholder
-            verdict="Pending"
-        )
-        db.add(db_resume)
-        db.commit()
-        db.refresh(db_resume)
-        uploaded_ids.append(db_resume.id)
-    
-    return {"message": f"Uploaded {len(files)} resumes", "ids": uploaded_ids}
+    filenames = [file.filename for file in files]
+    try:
+        check_upload_sizes(files)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # Extraction runs in the process pool, reading each file from the request's
+    # own spooled copy, and AI parsing is awaited concurrently
+    results = await ingest_resumes(filenames, [file.file for file in files], x_openai_key, db)
+
+    # Single bulk insert; ids come back in upload order. Inserting also resolves
+    # skills, embeds, links candidates and indexes, so it runs off the event loop
+    uploaded_ids = await run_in_threadpool(insert_resumes, db, jd_id, results)
+
+    candidates = await run_in_threadpool(candidate_ids, db, uploaded_ids)
+    files_status = [
+        {"id": resume_id, "filename": result["filename"], "status": result["status"], "error": result["error"], "tokens": result["tokens"],
+         "candidate_id": candidates.get(resume_id), "duplicate_of": result.get("duplicate_of")}
+        for resume_id, result in zip(uploaded_ids, results)
+    ]
+    tokens_saved = sum(result["tokens"]["tokens_saved"] for result in results if result["tokens"])
+    return {"message": f"Uploaded {len(files)} resumes", "ids": uploaded_ids, "files": files_status, "tokens_saved": tokens_saved}
+
+@router.post("/upload/resumes/zip")
+async def upload_resumes_zip(
+    file: UploadFile = File(...),
+    jd_id: int = 1,
+    x_openai_key: Optional[str] = Header(None)
+):
+    """
+    Bulk import of a ZIP of resumes. Streams progress as NDJSON, one event per
+    line: start, file (per member), saved (ids per insert batch), done.
+    """
+    print(f"Received upload_resumes_zip request. Key present: {bool(x_openai_key)}")
+    print(f"Archive: {file.filename}")
+    try:
+        check_upload_sizes([file], MAX_ARCHIVE_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    async def events():
+        # Members are read straight from the archive's spooled upload file
+        async for event in import_zip(file.file, jd_id, api_key=x_openai_key):
+            yield json.dumps(jsonable_encoder(event)) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 @router.post("/upload/jd")
 async def upload_jd(
@@ -55,31 +120,28 @@ async def upload_jd(
 ):
     print(f"Received upload_jd request. Key present: {bool(x_openai_key)}")
     print(f"File: {file.filename}")
-    content = await file.read()
-    text = extract_text(file.filename, content)
+    try:
+        check_upload_sizes([file])
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    text = await extract_document(file.filename, file.file)
     
     # Parse with AI
-    parsed_data = parse_jd_with_ai(text, api_key=x_openai_key)
+    parsed_data = await aparse_jd_with_ai(text, api_key=x_openai_key)
+    if "error" in parsed_data:
+        # Nothing useful to score against; don't store an empty JD
+        raise HTTPException(status_code=502, detail=f"Could not parse JD: {parsed_data['error']}")
     
-    # Extract role title from parsed data, default to filename
-    role_title = parsed_data.get("role_title", file.filename)
-    
-    # Create DB entry
-    db_jd = JobDescription(
-        role_title=role_title,
-        filename=file.filename,
-        raw_text=text,
-        parsed_json=parsed_data
-    )
-    db.add(db_jd)
-    db.commit()
-    db.refresh(db_jd)
-    
-    return {"message": "JD uploaded successfully", "id": db_jd.id, "role_title": role_title}
+    # Skill resolution and the insert are blocking database work
+    db_jd = await run_in_threadpool(store_jd, db, file.filename, text, parsed_data)
+    return {"message": "JD uploaded successfully", "id": db_jd.id, "role_title": db_jd.role_title}
 
 @router.post("/score")
 def score_all_candidates(
     jd_id: int = None,
+    force: bool = False,
+    top_k: Optional[int] = None,
+    min_prescore: Optional[float] = None,
     db: Session = Depends(get_db),
     x_openai_key: Optional[str] = Header(None)
 ):
@@ -93,54 +155,353 @@ def score_all_candidates(
     if not jd:
         raise HTTPException(status_code=404, detail="No Job Description found")
     
-    # Get resumes for this JD
-    resumes = db.query(Resume).filter(Resume.job_description_id == jd.id).all()
-    
-    scored_count = 0
-    for resume in resumes:
-        if not resume.parsed_json:
-            continue
-            
-        # Score
-        score_data = score_candidate_with_ai(resume.parsed_json, jd.parsed_json, api_key=x_openai_key)
-        
-        # Update DB
-        resume.score_json = score_data
-        resume.verdict = score_data.get("verdict", "Unknown")
-        scored_count += 1
-    
-    db.commit()
-    return {"message": f"Scored {scored_count} candidates against JD: {jd.role_title}"}
+    # Only new or stale scores are recomputed unless force=true.
+    # top_k / min_prescore send only the locally pre-screened shortlist to the LLM.
+    job = create_scoring_job(db, jd, api_key=x_openai_key, force=force, top_k=top_k, min_prescore=min_prescore)
+    if job.total == 0:
+        job.status = "completed"
+        db.commit()
+    else:
+        # Scoring runs in the background; poll /score/jobs/{id} for progress
+        enqueue_scoring_job(job.id, api_key=x_openai_key)
+    return {
+        "message": f"Scoring {job.total} candidates against JD: {jd.role_title} ({job.skipped} already up to date, {job.screened_out} screened out)",
+        "job_id": job.id,
+        "status": job.status,
+    }
+
+@router.post("/score/matrix")
+def score_matrix(
+    jd_ids: List[int] = Query([]),
+    resume_ids: List[int] = Query([]),
+    force: bool = False,
+    top_roles: Optional[int] = None,
+    min_prescore: Optional[float] = None,
+    db: Session = Depends(get_db),
+    x_openai_key: Optional[str] = Header(None)
+):
+    """
+    Matches the resume pool (all resumes, or resume_ids) against many JDs (all,
+    or jd_ids) in one job. Every pair is pre-scored locally; only each resume's
+    top_roles best pairs (and/or those >= min_prescore) are scored by the LLM.
+    Results are in /matches/best; poll /score/jobs/{id} for progress.
+    """
+    query = db.query(JobDescription)
+    if jd_ids:
+        query = query.filter(JobDescription.id.in_(jd_ids))
+    jds = query.order_by(JobDescription.id).all()
+    if not jds:
+        raise HTTPException(status_code=404, detail="No Job Description found")
+
+    job = create_matrix_job(
+        db, jds, api_key=x_openai_key, force=force, top_roles=top_roles, min_prescore=min_prescore,
+        resume_ids=resume_ids or None,
+    )
+    if job.total == 0:
+        job.status = "completed"
+        db.commit()
+    else:
+        enqueue_scoring_job(job.id, api_key=x_openai_key)
+    return {
+        "message": f"Scoring {job.total} resume/JD pairs across {len(jds)} JDs ({job.skipped} already up to date, {job.screened_out} screened out)",
+        "job_id": job.id,
+        "status": job.status,
+    }
+
+@router.get("/score/jobs/{job_id}")
+def get_scoring_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    x_openai_key: Optional[str] = Header(None)
+):
+    job = db.query(ScoringJob).filter(ScoringJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Scoring job not found")
+    # Worker died mid-job (e.g. server restart); pick it up again from where it stopped
+    if is_stale(job):
+        enqueue_scoring_job(job.id, api_key=x_openai_key)
+    return get_job_progress(job)
+
+@router.get("/parse-cache/stats")
+def parse_cache_stats(db: Session = Depends(get_db)):
+    return get_parse_cache_stats(db)
+
+# Columns returned by /analysis; raw_text is never loaded for listings
+ANALYSIS_COLUMNS = [
+    Resume.id, Resume.job_description_id, Resume.filename, Resume.parsed_json,
+    Resume.score_json, Resume.score, Resume.verdict, Resume.timestamp,
+]
+
+@router.get("/extraction/metrics")
+def extraction_metrics():
+    return get_extraction_metrics()
 
 @router.get("/analysis")
-def get_analysis(jd_id: int = None, db: Session = Depends(get_db)):
-    query = db.query(Resume)
+async def get_analysis(
+    response: Response,
+    jd_id: int = None,
+    verdict: Optional[List[str]] = Query(None),
+    min_experience: Optional[float] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    db=Depends(get_read_db)
+):
+    """
+    Candidates ranked by score, best first, optionally filtered by verdict and
+    minimum years of experience. Pass the X-Next-Cursor response header back
+    as `cursor` for the next page (or use offset).
+    """
+    query = select(*ANALYSIS_COLUMNS)
     if jd_id:
-        query = query.filter(Resume.job_description_id == jd_id)
-        
-    resumes = query.all()
-    # Sort by score descending
-    sorted_resumes = sorted(resumes, key=lambda r: r.score_json.get("score", 0), reverse=True)
-    return sorted_resumes
+        query = query.where(Resume.job_description_id == jd_id)
+    if verdict:
+        query = query.where(Resume.verdict.in_(verdict))
+    if min_experience is not None:
+        query = query.where(Resume.total_experience_years >= min_experience)
+    if cursor:
+        try:
+            cursor_score, cursor_id = cursor.split(":")
+            cursor_score, cursor_id = float(cursor_score), int(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Keyset: rows after (score, id) in ORDER BY score DESC, id ASC
+        query = query.where(or_(
+            Resume.score < cursor_score,
+            and_(Resume.score == cursor_score, Resume.id > cursor_id),
+        ))
+    elif offset:
+        query = query.offset(offset)
+
+    rows = (await execute(db, query.order_by(Resume.score.desc(), Resume.id.asc()).limit(limit + 1))).all()
+    page = rows[:limit]
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = f"{page[-1].score}:{page[-1].id}"
+    return [dict(row._mapping) for row in page]
+
+class ResumeSummary(BaseModel):
+    id: int
+    job_description_id: Optional[int] = None
+    filename: Optional[str] = None
+    name: Optional[str] = None
+    score: float = 0
+    verdict: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    candidate_id: Optional[int] = None
 
-@router.get("/jds")
-def get_jds(db: Session = Depends(get_db)):
-    return db.query(JobDescription).order_by(JobDescription.timestamp.desc()).all()
+class RoleMatch(BaseModel):
+    jd_id: int
+    role_title: Optional[str] = None
+    status: Optional[str] = None
+    score: Optional[float] = None
+    verdict: Optional[str] = None
+    prescore: float = 0
 
-@router.get("/resumes")
-def get_resumes(db: Session = Depends(get_db)):
-    return db.query(Resume).all()
+class CandidateRoles(BaseModel):
+    resume_id: int
+    name: Optional[str] = None
+    candidate_id: Optional[int] = None
+    roles: List[RoleMatch]
+
+class JobDescriptionSummary(BaseModel):
+    id: int
+    role_title: Optional[str] = None
+    filename: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+def etag_response(request: Request, items: list) -> Response:
+    """JSON response with an ETag; answers 304 when the client already has this exact list."""
+    content = jsonable_encoder(items)
+    body = json.dumps(content, separators=(",", ":"), sort_keys=True)
+    etag = f'W/"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=content, headers={"ETag": etag})
+
+@router.get("/jds", response_model=List[JobDescriptionSummary])
+async def get_jds(request: Request, db=Depends(get_read_db)):
+    rows = (await execute(db, select(
+        JobDescription.id, JobDescription.role_title, JobDescription.filename, JobDescription.timestamp
+    ).order_by(JobDescription.timestamp.desc()))).all()
+    return etag_response(request, [JobDescriptionSummary(**row._mapping) for row in rows])
+
+@router.get("/resumes", response_model=List[ResumeSummary])
+async def get_resumes(request: Request, jd_id: int = None, db=Depends(get_read_db)):
+    # Only the name is read out of parsed_json, in SQL
+    query = select(
+        Resume.id, Resume.job_description_id, Resume.filename,
+        Resume.parsed_json["name"].as_string().label("name"),
+        Resume.score, Resume.verdict, Resume.timestamp, Resume.candidate_id,
+    )
+    if jd_id:
+        query = query.where(Resume.job_description_id == jd_id)
+    rows = (await execute(db, query.order_by(Resume.id))).all()
+    return etag_response(request, [ResumeSummary(**row._mapping) for row in rows])
+
+@router.get("/matches/best", response_model=List[CandidateRoles])
+async def best_roles(
+    jd_ids: List[int] = Query([]),
+    roles: int = Query(1, ge=1, le=20),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db=Depends(get_read_db)
+):
+    """
+    The best roles for each candidate from matrix scoring (/score/matrix):
+    AI-scored matches first by score, then the rest by local pre-score.
+    Candidates are ordered by their best match.
+    """
+    rank = func.row_number().over(
+        partition_by=ResumeMatch.resume_id,
+        order_by=(
+            case((ResumeMatch.status == "scored", 0), else_=1),
+            ResumeMatch.score.desc(), ResumeMatch.prescore.desc(), ResumeMatch.job_description_id,
+        ),
+    )
+    ranked = select(
+        ResumeMatch.resume_id, ResumeMatch.job_description_id, ResumeMatch.status,
+        ResumeMatch.score, ResumeMatch.verdict, ResumeMatch.prescore, rank.label("rank"),
+    )
+    if jd_ids:
+        ranked = ranked.where(ResumeMatch.job_description_id.in_(jd_ids))
+    ranked = ranked.subquery()
+
+    best = (await execute(db, select(ranked.c.resume_id).where(ranked.c.rank == 1).order_by(
+        case((ranked.c.status == "scored", 0), else_=1),
+        ranked.c.score.desc(), ranked.c.prescore.desc(), ranked.c.resume_id,
+    ).limit(limit).offset(offset))).scalars().all()
+    if not best:
+        return []
+
+    rows = (await execute(db, select(
+        ranked, JobDescription.role_title,
+        Resume.parsed_json["name"].as_string().label("name"), Resume.candidate_id,
+    ).join(JobDescription, JobDescription.id == ranked.c.job_description_id).join(
+        Resume, Resume.id == ranked.c.resume_id
+    ).where(ranked.c.resume_id.in_(best), ranked.c.rank <= roles).order_by(ranked.c.rank))).all()
+
+    entries = {resume_id: None for resume_id in best}
+    for row in rows:
+        if entries[row.resume_id] is None:
+            entries[row.resume_id] = CandidateRoles(resume_id=row.resume_id, name=row.name, candidate_id=row.candidate_id, roles=[])
+        entries[row.resume_id].roles.append(RoleMatch(
+            jd_id=row.job_description_id, role_title=row.role_title, status=row.status,
+            score=row.score, verdict=row.verdict, prescore=row.prescore,
+        ))
+    return [entry for entry in entries.values() if entry is not None]
+
+class ResumeSearchResult(ResumeSummary):
+    relevance: float
+
+@router.get("/resumes/search")
+def search_resume_text(
+    q: str = "",
+    skills: List[str] = Query([]),
+    jd_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over resumes. `q` takes keywords and "quoted phrases";
+    `skills` (repeatable or comma-separated) filters on canonical skills. All
+    must match. Results are ranked by relevance (newest first when the query
+    matches too much of the pool to rank, see "ranked"); page with offset/limit.
+    """
+    skills = [skill.strip() for value in skills for skill in value.split(",") if skill.strip()]
+    if not q.strip() and not skills:
+        raise HTTPException(status_code=400, detail="Provide q or skills")
+    started = time.perf_counter()
+    try:
+        found = search_resumes(db, q, skills, jd_id=jd_id, limit=limit, offset=offset)
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    rows = {row.id: row for row in db.query(
+        Resume.id, Resume.job_description_id, Resume.filename,
+        Resume.parsed_json["name"].as_string().label("name"),
+        Resume.score, Resume.verdict, Resume.timestamp, Resume.candidate_id,
+    ).filter(Resume.id.in_([resume_id for resume_id, _ in found["hits"]]))} if found["hits"] else {}
+    results = [
+        ResumeSearchResult(**rows[resume_id]._mapping, relevance=round(relevance, 4))
+        for resume_id, relevance in found["hits"] if resume_id in rows
+    ]
+    return {
+        "q": q,
+        "skills": skills,
+        "total": found["total"],
+        "ranked": found["ranked"],
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results,
+        "next_offset": offset + limit if found["has_more"] else None,
+    }
+
+class SearchResult(ResumeSummary):
+    similarity: float
+
+@router.get("/search")
+def search_candidates(
+    jd_id: int,
+    limit: int = Query(20, ge=1, le=200),
+    same_jd: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Top candidates for a JD by skill-embedding similarity, across the whole
+    resume pool (or only the JD's own resumes with same_jd=true). No LLM call.
+    """
+    jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if not jd:
+        raise HTTPException(status_code=404, detail="JD not found")
+
+    started = time.perf_counter()
+    embeddings.index.refresh(db)
+    hits = embeddings.index.search(embeddings.embed_jd(jd.parsed_json), limit, jd_id=jd_id if same_jd else None)
+
+    rows = {row.id: row for row in db.query(
+        Resume.id, Resume.job_description_id, Resume.filename,
+        Resume.parsed_json["name"].as_string().label("name"),
+        Resume.score, Resume.verdict, Resume.timestamp, Resume.candidate_id,
+    ).filter(Resume.id.in_([resume_id for resume_id, _ in hits]))} if hits else {}
+    results = [
+        SearchResult(**rows[resume_id]._mapping, similarity=round(similarity, 4))
+        for resume_id, similarity in hits if resume_id in rows
+    ]
+    return {"jd_id": jd_id, "took_ms": round((time.perf_counter() - started) * 1000, 2), "results": results}
 
 @router.get("/resumes/{resume_id}")
-def get_resume(resume_id: int, db: Session = Depends(get_db)):
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+async def get_resume(resume_id: int, db=Depends(get_read_db)):
+    resume = (await execute(db, select(Resume).options(
+        undefer(Resume.raw_text), undefer(Resume.parsed_json)
+    ).where(Resume.id == resume_id))).scalars().first()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     return resume
 
+@router.get("/candidates/{candidate_id}")
+async def get_candidate(candidate_id: int, db=Depends(get_read_db)):
+    """A candidate and every resume linked to them, across uploads and JDs, newest first."""
+    candidate = (await execute(db, select(Candidate).where(Candidate.id == candidate_id))).scalars().first()
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    rows = (await execute(db, select(
+        Resume.id, Resume.job_description_id, Resume.filename,
+        Resume.parsed_json["name"].as_string().label("name"),
+        Resume.score, Resume.verdict, Resume.timestamp, Resume.candidate_id,
+    ).where(Resume.candidate_id == candidate_id).order_by(Resume.id.desc()))).all()
+    return {
+        "id": candidate.id,
+        "name": candidate.name,
+        "email": candidate.email,
+        "created_at": candidate.created_at,
+        "resumes": [ResumeSummary(**row._mapping) for row in rows],
+    }
+
 @router.get("/jd")
-def get_jd(db: Session = Depends(get_db)):
-    jd = db.query(JobDescription).order_by(JobDescription.timestamp.desc()).first()
+async def get_jd(db=Depends(get_read_db)):
+    jd = (await execute(db, select(JobDescription).options(
+        undefer(JobDescription.raw_text)
+    ).order_by(JobDescription.timestamp.desc()).limit(1))).scalars().first()
     if not jd:
         return {"message": "No JD uploaded yet"}
     return jd
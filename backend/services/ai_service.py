@@ -1,92 +1,264 @@
 import os
+import re
 import json
 from pathlib import Path
+from typing import List, Optional
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from .llm_clients import registry, make_http_clients, invoke_with_retry, ainvoke_with_retry, LLM_TIMEOUT_SECONDS
+from .llm_schemas import ParsedResume, ParsedJD, CandidateScore, BatchCandidateScore
+from .fake_llm import FakeChatModel, FAKE_LLM_MODEL
 
 # Load .env from backend directory
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+OPENAI_MODEL = "gpt-4o-mini"
+GEMINI_MODEL = "gemini-3-flash-preview"
+
+# Bump when the resume parsing prompt changes so cached parses are not reused
+RESUME_PROMPT_VERSION = "2"
+# Bump when the scoring prompt changes so existing scores are treated as stale
+SCORING_PROMPT_VERSION = "1"
+
+# Fields of a parsed resume that matter for scoring; contact details are left out of batch prompts
+PROFILE_FIELDS = ["name", "total_experience_years", "skills", "job_titles", "education", "summary"]
+# Extra calls made for a document whose output still fails validation after repair
+LLM_SCHEMA_RETRIES = int(os.getenv("LLM_SCHEMA_RETRIES", "1"))
+
+def compact_json(data) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def compact_profile(resume_json: dict) -> dict:
+    return {key: resume_json[key] for key in PROFILE_FIELDS if resume_json.get(key) not in (None, "", [], {})}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for batch budgeting."""
+    return len(text) // 4 + 1
+
+def get_provider(api_key: str = None):
+    """Returns the provider name get_llm() would pick for this key, or None."""
+    provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    if provider == "fake":
+        return "fake"
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    if provider == "gemini" and gemini_key:
+        return "gemini"
+
+    openai_key = api_key or os.getenv("OPENAI_API_KEY")
+    if openai_key and not openai_key.startswith("sk-placeholder"):
+        return "openai"
+
+    if gemini_key:
+        return "gemini"
+    return None
+
+def get_model_name(api_key: str = None):
+    """Returns the model get_llm() would use for this key, or None."""
+    return {"openai": OPENAI_MODEL, "gemini": GEMINI_MODEL, "fake": FAKE_LLM_MODEL}.get(get_provider(api_key))
+
+def _gemini_llm(gemini_key: str):
+    def build():
+        # Retries are handled by invoke_with_retry()/ainvoke_with_retry(), not the SDK
+        llm = ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL, google_api_key=gemini_key, temperature=0,
+            max_retries=0, timeout=LLM_TIMEOUT_SECONDS,
+        )
+        return llm, []
+    return registry.get("gemini", GEMINI_MODEL, gemini_key, build, pinned=gemini_key == os.getenv("GEMINI_API_KEY"))
+
+def _openai_llm(openai_key: str):
+    def build():
+        # Explicit keep-alive pools so connections are reused across calls
+        http_client, http_async_client = make_http_clients()
+        llm = ChatOpenAI(
+            model=OPENAI_MODEL, api_key=openai_key, temperature=0,
+            http_client=http_client, http_async_client=http_async_client,
+            max_retries=0, timeout=LLM_TIMEOUT_SECONDS,
+        )
+        return llm, [http_client.close]
+    return registry.get("openai", OPENAI_MODEL, openai_key, build, pinned=openai_key == os.getenv("OPENAI_API_KEY"))
+
+def _fake_llm():
+    # One shared instance, held in the registry so it gets the same concurrency slots as real clients
+    return registry.get("fake", FAKE_LLM_MODEL, "", lambda: (FakeChatModel(), []), pinned=True)
+
 def get_llm(api_key: str = None):
+    """
+    Returns a chat model for the configured provider. Clients are cached per
+    provider, model and key, so connection pools stay warm between calls.
+    LLM_PROVIDER=fake answers offline (services/fake_llm.py), for load and regression tests.
+    """
     provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    if provider == "fake":
+        return _fake_llm()
     
     # If provider is explicitly set to gemini, try it first
     if provider == "gemini":
         gemini_key = os.getenv("GEMINI_API_KEY")
         if gemini_key:
-            return ChatGoogleGenerativeAI(model="gemini-3-flash-preview", google_api_key=gemini_key, temperature=0)
+            return _gemini_llm(gemini_key)
             
     # Default / OpenAI path
     openai_key = api_key or os.getenv("OPENAI_API_KEY")
     if openai_key and not openai_key.startswith("sk-placeholder"):
         try:
-            return ChatOpenAI(model="gpt-4o-mini", api_key=openai_key, temperature=0)
+            return _openai_llm(openai_key)
         except:
             pass
             
     # Fallback to Gemini if OpenAI failed or wasn't selected but is available
     gemini_key = os.getenv("GEMINI_API_KEY")
     if gemini_key:
-        return ChatGoogleGenerativeAI(model="gemini-3-flash-preview", google_api_key=gemini_key, temperature=0)
+        return _gemini_llm(gemini_key)
         
     return None
 
-def parse_resume_with_ai(text: str, api_key: str = None) -> dict:
+class LLMOutputError(ValueError):
+    """The model's answer could not be turned into a valid result."""
+
+def json_mode(llm):
+    """Asks the provider for a syntactically valid JSON object instead of free text."""
+    if isinstance(llm, ChatOpenAI):
+        return llm.bind(response_format={"type": "json_object"})
+    if isinstance(llm, ChatGoogleGenerativeAI):
+        return llm.bind(response_mime_type="application/json")
+    return llm
+
+def _close_truncated(text: str) -> str:
+    """Closes strings, arrays and objects left open by a truncated answer."""
+    stack, in_string, escaped = [], False, False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "[{":
+            stack.append("]" if char == "[" else "}")
+        elif char in "]}" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    text = re.sub(r"[,:]\s*$", "", text.rstrip())
+    return text + "".join(reversed(stack))
+
+def repair_json(text: str):
     """
-    Parses resume text using AI to extract structured data.
+    Parses model output as JSON, fixing the usual near misses: markdown fences,
+    prose around the JSON, smart quotes, trailing commas and truncation.
+    Raises ValueError if it still does not parse.
     """
-    llm = get_llm(api_key)
-    if not llm:
-        return {"error": "No valid AI API key configured (OpenAI or Gemini)"}
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON found in model output")
+    text = text[min(starts):]
+    end = max(text.rfind("}"), text.rfind("]"))
+    candidates = [text[:end + 1]] if end >= 0 else []
+    candidates.append(text)
+    for candidate in candidates:
+        candidate = candidate.replace("\u201c", '"').replace("\u201d", '"')
+        candidate = re.sub(r",\s*([}\]])", r"\1", candidate)
+        for attempt in (candidate, _close_truncated(candidate)):
+            try:
+                return json.loads(attempt)
+            except ValueError:
+                continue
+    raise ValueError("Model output is not valid JSON")
+
+def validate_output(content: str, schema) -> dict:
+    return schema.model_validate(repair_json(content)).model_dump()
 
+def _correction(messages: list, content: str, error: Exception) -> list:
+    """Conversation for a targeted retry: the invalid answer plus what was wrong with it."""
+    return messages + [
+        AIMessage(content=content),
+        HumanMessage(content=f"That output was invalid ({str(error)[:500]}). Return only the corrected JSON."),
+    ]
+
+def _validation_rounds(messages: list, schema):
+    """
+    The validate-and-correct loop shared by structured_call() and
+    astructured_call(), which only differ in how they call the model: yields
+    the conversation to send, is sent the model's answer, and returns the
+    validated result (as StopIteration.value). Only an answer that fails
+    validation is retried (up to LLM_SCHEMA_RETRIES), with the error fed back
+    to the model. Raises LLMOutputError.
+    """
+    for attempt in range(LLM_SCHEMA_RETRIES + 1):
+        content = yield messages
+        try:
+            return validate_output(content, schema)
+        except ValueError as e:
+            error = e
+            messages = _correction(messages, content, e)
+    raise LLMOutputError(f"Invalid model output: {str(error)[:200]}")
+
+def structured_call(llm, messages: list, schema) -> dict:
+    """Calls the model in JSON mode and validates the answer against a Pydantic schema."""
+    rounds = _validation_rounds(messages, schema)
+    messages = next(rounds)
+    while True:
+        content = invoke_with_retry(json_mode(llm), messages, client=llm).content
+        try:
+            messages = rounds.send(content)
+        except StopIteration as done:
+            return done.value
+
+async def astructured_call(llm, messages: list, schema) -> dict:
+    rounds = _validation_rounds(messages, schema)
+    messages = next(rounds)
+    while True:
+        content = (await ainvoke_with_retry(json_mode(llm), messages, client=llm)).content
+        try:
+            messages = rounds.send(content)
+        except StopIteration as done:
+            return done.value
+
+def resume_messages(text: str, with_experience: bool = True) -> list:
+    """
+    Email, phone, links and (when dates were found) experience come from
+    parser.extract_local_fields(), so the prompt only asks for fields that
+    need understanding. Callers pass text already fitted to a token budget
+    by compaction.compact_resume_text().
+    """
+    experience_field = "\n    - total_experience_years (number)" if with_experience else ""
     prompt = f"""
     You are an expert ATS parser. Extract the following fields from the resume text below and return them as a valid JSON object.
     
     Fields to extract:
-    - name (string)
-    - email (string)
-    - phone (string)
-    - total_experience_years (number)
+    - name (string){experience_field}
     - skills (object with keys: technical, domain, tools, soft_skills - each a list of strings)
     - job_titles (list of strings)
     - education (list of objects with degree, institution, year)
     - summary (string, rewrite to 3 lines max)
     
     Resume Text:
-    {text[:10000]}
+    {text}
     
     Return ONLY valid JSON.
     """
-    
-    try:
-        messages = [
-            SystemMessage(content="You are a precise data extraction assistant. Output only JSON."),
-            HumanMessage(content=prompt)
-        ]
-        response = llm.invoke(messages)
-        content = response.content
-        # Clean up markdown code blocks if present
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-            
-        return json.loads(content)
-    except Exception as e:
-        print(f"Error parsing resume with AI: {e}")
-        return {}
-
-def parse_jd_with_ai(text: str, api_key: str = None) -> dict:
-    """
-    Parses JD text using AI to extract requirements.
-    """
-    llm = get_llm(api_key)
-    if not llm:
-        return {"error": "No valid AI API key configured"}
+    return [
+        SystemMessage(content="You are a precise data extraction assistant. Output only JSON."),
+        HumanMessage(content=prompt)
+    ]
 
+def jd_messages(text: str) -> list:
     prompt = f"""
     You are an expert Recruiter. Extract the following fields from the Job Description text below and return them as a valid JSON object.
     
@@ -105,40 +277,20 @@ def parse_jd_with_ai(text: str, api_key: str = None) -> dict:
     
     Return ONLY valid JSON.
     """
-    
-    try:
-        messages = [
-            SystemMessage(content="You are a precise data extraction assistant. Output only JSON."),
-            HumanMessage(content=prompt)
-        ]
-        response = llm.invoke(messages)
-        content = response.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-            
-        return json.loads(content)
-    except Exception as e:
-        print(f"Error parsing JD with AI: {e}")
-        return {}
-
-def score_candidate_with_ai(resume_json: dict, jd_json: dict, api_key: str = None) -> dict:
-    """
-    Scores a candidate against a JD using AI.
-    """
-    llm = get_llm(api_key)
-    if not llm:
-        return {"error": "No valid AI API key configured"}
+    return [
+        SystemMessage(content="You are a precise data extraction assistant. Output only JSON."),
+        HumanMessage(content=prompt)
+    ]
 
+def score_messages(resume_json: dict, jd_json: dict) -> list:
     prompt = f"""
     You are an expert HR Recruiter. Evaluate the candidate based on the Job Description.
     
     Job Description:
-    {json.dumps(jd_json, indent=2)}
+    {compact_json(jd_json)}
     
     Candidate Profile:
-    {json.dumps(resume_json, indent=2)}
+    {compact_json(resume_json)}
     
     Task:
     1. Calculate a match score (0-100) based on:
@@ -160,20 +312,146 @@ def score_candidate_with_ai(resume_json: dict, jd_json: dict, api_key: str = Non
     - red_flags (list)
     - reasoning (string)
     """
+    return [
+        SystemMessage(content="You are a fair and precise recruiter. Output only JSON."),
+        HumanMessage(content=prompt)
+    ]
+
+def batch_score_messages(resume_jsons: List[dict], jd_json: dict) -> list:
+    candidates = "\n".join(
+        f"[{i}] {compact_json(compact_profile(resume_json))}" for i, resume_json in enumerate(resume_jsons)
+    )
+    prompt = f"""
+    You are an expert HR Recruiter. Evaluate EACH candidate independently against the Job Description.
+    
+    Job Description:
+    {compact_json(jd_json)}
     
+    Candidates (one per line, prefixed with their index):
+    {candidates}
+    
+    For each candidate:
+    1. Calculate a match score (0-100) based on:
+       - Skills Match (45%)
+       - Experience Match (25%)
+       - Domain/Industry Match (20%)
+       - Seniority/Role Fit (10%)
+    2. Determine a Verdict: "Highly Relevant", "Relevant", "Borderline", "Not Relevant".
+    3. List Missing Skills.
+    4. List Matching Skills.
+    5. Identify Red Flags (if any).
+    6. Provide a brief 2-sentence reasoning.
+    
+    Return ONLY a valid JSON object {{"results": [...]}} whose array has exactly {len(resume_jsons)} objects, one per candidate, with keys:
+    - index (number, the candidate's index)
+    - score (number)
+    - verdict (string)
+    - missing_skills (list)
+    - matching_skills (list)
+    - red_flags (list)
+    - reasoning (string)
+    """
+    return [
+        SystemMessage(content="You are a fair and precise recruiter. Output only JSON."),
+        HumanMessage(content=prompt)
+    ]
+
+def batch_results(content: str, count: int) -> List[Optional[dict]]:
+    """
+    Matches batch entries to candidates by index. Entries that are missing,
+    duplicated or fail validation stay None so callers can retry them singly.
+    """
+    data = repair_json(content)
+    entries = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("Expected a list of results")
+    results = [None] * count
+    for entry in entries:
+        try:
+            score = BatchCandidateScore.model_validate(entry).model_dump()
+        except ValueError:
+            continue
+        index = score.pop("index")
+        if 0 <= index < count and results[index] is None:
+            results[index] = score
+    return results
+
+def parse_resume_with_ai(text: str, api_key: str = None, with_experience: bool = True) -> dict:
+    """
+    Parses resume text using AI to extract structured data.
+    Returns {"error": ...} if the model never produced a valid result.
+    """
+    llm = get_llm(api_key)
+    if not llm:
+        return {"error": "No valid AI API key configured (OpenAI or Gemini)"}
     try:
-        messages = [
-            SystemMessage(content="You are a fair and precise recruiter. Output only JSON."),
-            HumanMessage(content=prompt)
-        ]
-        response = llm.invoke(messages)
-        content = response.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-            
-        return json.loads(content)
+        return structured_call(llm, resume_messages(text, with_experience), ParsedResume)
+    except Exception as e:
+        print(f"Error parsing resume with AI: {e}")
+        return {"error": str(e) or type(e).__name__}
+
+def parse_jd_with_ai(text: str, api_key: str = None) -> dict:
+    """
+    Parses JD text using AI to extract requirements.
+    """
+    llm = get_llm(api_key)
+    if not llm:
+        return {"error": "No valid AI API key configured"}
+    try:
+        return structured_call(llm, jd_messages(text), ParsedJD)
+    except Exception as e:
+        print(f"Error parsing JD with AI: {e}")
+        return {"error": str(e) or type(e).__name__}
+
+def score_candidate_with_ai(resume_json: dict, jd_json: dict, api_key: str = None) -> dict:
+    """
+    Scores a candidate against a JD using AI.
+    """
+    llm = get_llm(api_key)
+    if not llm:
+        return {"error": "No valid AI API key configured"}
+    try:
+        return structured_call(llm, score_messages(resume_json, jd_json), CandidateScore)
     except Exception as e:
         print(f"Error scoring candidate with AI: {e}")
-        return {}
+        return {"error": str(e) or type(e).__name__}
+
+def score_candidates_batch_with_ai(resume_jsons: List[dict], jd_json: dict, api_key: str = None) -> List[Optional[dict]]:
+    """
+    Scores several candidates against one JD in a single AI call.
+    Returns one result per candidate, in order; entries the model got wrong
+    (missing, malformed or out of range) are None so callers can retry them singly.
+    """
+    llm = get_llm(api_key)
+    if not llm:
+        return [{"error": "No valid AI API key configured"} for _ in resume_jsons]
+    try:
+        # Bad entries are retried singly by the caller, so no corrective call here
+        content = invoke_with_retry(json_mode(llm), batch_score_messages(resume_jsons, jd_json), client=llm).content
+        return batch_results(content, len(resume_jsons))
+    except Exception as e:
+        print(f"Error batch scoring candidates with AI: {e}")
+        return [None] * len(resume_jsons)
+
+# Async variants for request handlers: they await the model instead of holding a
+# worker thread, and each attempt is bounded by LLM_TIMEOUT_SECONDS.
+
+async def aparse_resume_with_ai(text: str, api_key: str = None, with_experience: bool = True) -> dict:
+    llm = get_llm(api_key)
+    if not llm:
+        return {"error": "No valid AI API key configured (OpenAI or Gemini)"}
+    try:
+        return await astructured_call(llm, resume_messages(text, with_experience), ParsedResume)
+    except Exception as e:
+        print(f"Error parsing resume with AI: {e!r}")
+        return {"error": str(e) or type(e).__name__}
+
+async def aparse_jd_with_ai(text: str, api_key: str = None) -> dict:
+    llm = get_llm(api_key)
+    if not llm:
+        return {"error": "No valid AI API key configured"}
+    try:
+        return await astructured_call(llm, jd_messages(text), ParsedJD)
+    except Exception as e:
+        print(f"Error parsing JD with AI: {e!r}")
+        return {"error": str(e) or type(e).__name__}
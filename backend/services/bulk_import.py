@@ -0,0 +1,138 @@
+import os
+import asyncio
+import hashlib
+import zipfile
+from collections import deque
+from typing import AsyncIterator, Dict, Any, List
+from fastapi.concurrency import run_in_threadpool
+try:
+    from ..database import SessionLocal
+except ImportError:
+    from database import SessionLocal
+from .extraction import extract_document
+from .ingestion import parse_document, insert_resumes, INGEST_CONCURRENCY
+from .uploads import MAX_UPLOAD_BYTES
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+# Documents in flight between reading and insertion
+IMPORT_PIPELINE_DEPTH = int(os.getenv("IMPORT_PIPELINE_DEPTH", str(INGEST_CONCURRENCY * 2)))
+# Rows written per insert
+IMPORT_INSERT_BATCH = int(os.getenv("IMPORT_INSERT_BATCH", "25"))
+
+def _archive_members(zf: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """Resume files in the archive, skipping folders and OS metadata."""
+    return [
+        info for info in zf.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not os.path.basename(info.filename).startswith(".")
+    ]
+
+def _read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    # Bounded read; declared sizes in the archive can lie
+    with zf.open(info) as member:
+        return member.read(MAX_UPLOAD_BYTES + 1)
+
+async def _process_member(zf, info, seen_hashes: set, api_key: str, session_factory) -> Dict[str, Any]:
+    filename = os.path.basename(info.filename)
+    result = {"filename": filename, "raw_text": "", "parsed_json": {}, "error": None}
+
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        return {**result, "status": "skipped", "error": "Unsupported file type"}
+    if info.file_size > MAX_UPLOAD_BYTES:
+        return {**result, "status": "too_large", "error": "File exceeds the upload limit"}
+
+    content = await run_in_threadpool(_read_member, zf, info)
+    if len(content) > MAX_UPLOAD_BYTES:
+        return {**result, "status": "too_large", "error": "File exceeds the upload limit"}
+
+    digest = hashlib.sha256(content).hexdigest()
+    if digest in seen_hashes:
+        return {**result, "status": "duplicate", "error": "Same file already in this archive"}
+    seen_hashes.add(digest)
+
+    text = await extract_document(filename, content)
+    del content
+    parsed = await parse_document(text, api_key, session_factory)
+    return {**result, "raw_text": text, **parsed}
+
+async def import_zip(
+    archive,
+    jd_id: int,
+    api_key: str = None,
+    session_factory=None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Imports every resume in a ZIP archive (a path or a seekable file object,
+    such as the upload's spooled file), yielding progress events:
+    start, one "file" event per member (in archive order), "saved" after each
+    insert batch, and "done". Members are read one at a time straight from the
+    archive; at most IMPORT_PIPELINE_DEPTH documents are in flight, and
+    byte-identical files are imported once.
+    """
+    session_factory = session_factory or SessionLocal
+    try:
+        zf = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile:
+        yield {"event": "error", "error": "Not a valid ZIP archive"}
+        return
+
+    db = session_factory()
+    counts = {"inserted": 0, "duplicate": 0, "failed": 0, "skipped": 0}
+    members = _archive_members(zf)
+    seen_hashes = set()
+    in_flight = deque()
+    pending_rows = []
+    next_member = 0
+
+    async def flush():
+        ids = await run_in_threadpool(insert_resumes, db, jd_id, pending_rows)
+        event = {
+            "event": "saved",
+            "files": [{"id": resume_id, "filename": row["filename"]} for resume_id, row in zip(ids, pending_rows)],
+        }
+        counts["inserted"] += len(ids)
+        pending_rows.clear()
+        return event
+
+    try:
+        yield {"event": "start", "total": len(members)}
+
+        while next_member < len(members) or in_flight:
+            # Keep the pipeline full, then take results in archive order
+            while next_member < len(members) and len(in_flight) < max(1, IMPORT_PIPELINE_DEPTH):
+                info = members[next_member]
+                in_flight.append(asyncio.ensure_future(
+                    _process_member(zf, info, seen_hashes, api_key, session_factory)
+                ))
+                next_member += 1
+
+            index = next_member - len(in_flight)
+            try:
+                result = await in_flight.popleft()
+            except Exception as e:
+                result = {"filename": os.path.basename(members[index].filename), "raw_text": "",
+                          "parsed_json": {}, "status": "failed", "error": str(e)}
+
+            status = result["status"]
+            yield {"event": "file", "index": index, "filename": result["filename"], "status": status,
+                   "error": result.get("error"), "tokens": result.get("tokens")}
+
+            if status in ("duplicate", "skipped", "too_large"):
+                counts["duplicate" if status == "duplicate" else "skipped"] += 1
+                continue
+            if status in ("failed", "empty"):
+                counts["failed"] += 1
+            pending_rows.append(result)
+            if len(pending_rows) >= IMPORT_INSERT_BATCH:
+                yield await flush()
+
+        if pending_rows:
+            yield await flush()
+        yield {"event": "done", "total": len(members), **counts}
+    finally:
+        # Client went away mid-import: stop outstanding work
+        for task in in_flight:
+            task.cancel()
+        zf.close()
+        db.close()
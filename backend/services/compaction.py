@@ -0,0 +1,181 @@
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+from .ai_service import OPENAI_MODEL, estimate_tokens
+
+# Token budget for the resume text sent to the parsing prompt
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "2500"))
+# A line seen at the top or bottom of at least this share of pages is a header/footer
+HEADER_FOOTER_MIN_SHARE = float(os.getenv("HEADER_FOOTER_MIN_SHARE", "0.5"))
+# Lines at each edge of a page checked for headers/footers
+HEADER_FOOTER_LINES = 3
+
+# Sections in the order they are kept when a resume is over budget
+SECTION_PRIORITY = [
+    "summary", "skills", "experience", "education", "projects",
+    "certifications", "achievements", "publications", "languages",
+    "interests", "references", "declaration",
+]
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "professional summary", "objective", "career objective", "about me"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "competencies", "technologies", "tech stack"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "qualifications", "academic qualifications"],
+    "projects": ["projects", "key projects", "personal projects"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments"],
+    "publications": ["publications", "papers"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies", "hobbies and interests", "extracurricular activities"],
+    "references": ["references"],
+    "declaration": ["declaration", "personal details", "personal information"],
+}
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_PAGE_NUMBER = re.compile(r"^(page\s*)?-?\s*\d+\s*(of\s*\d+)?\s*-?$", re.IGNORECASE)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """The model's tokenizer, or False if tiktoken or its vocabulary is unavailable."""
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+            except Exception as e:
+                print(f"Tokenizer unavailable ({type(e).__name__}), estimating token counts")
+                _encoding = False
+        return _encoding
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+def _clean_line(line: str) -> str:
+    return re.sub(r"[ \t]+", " ", line).strip()
+
+def _line_key(line: str) -> str:
+    return re.sub(r"\d+", "#", line.lower())
+
+def strip_headers_footers(pages: List[List[str]]) -> List[List[str]]:
+    """Drops page numbers and lines repeated at the top or bottom of most pages."""
+    # Pages with almost no text are content, not header + footer
+    bodies = [lines for lines in pages if len(lines) > 2]
+    if len(bodies) >= 2:
+        edge_counts = Counter()
+        for lines in bodies:
+            edges = lines[:HEADER_FOOTER_LINES] + lines[-HEADER_FOOTER_LINES:]
+            edge_counts.update({_line_key(line) for line in edges})
+        threshold = max(2, len(bodies) * HEADER_FOOTER_MIN_SHARE)
+        repeated = {key for key, count in edge_counts.items() if count >= threshold}
+    else:
+        repeated = set()
+
+    stripped = []
+    for lines in pages:
+        keep = []
+        for i, line in enumerate(lines):
+            at_edge = i < HEADER_FOOTER_LINES or i >= len(lines) - HEADER_FOOTER_LINES
+            if at_edge and (_PAGE_NUMBER.match(line) or (len(lines) > 2 and _line_key(line) in repeated)):
+                continue
+            keep.append(line)
+        stripped.append(keep)
+    return stripped
+
+def dedup_lines(lines: List[str]) -> List[str]:
+    """Removes repeated lines of three or more words; short lines (headings, skills) are kept."""
+    seen = set()
+    result = []
+    for line in lines:
+        if len(line.split()) >= 3:
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        result.append(line)
+    return result
+
+def _heading(line: str):
+    normalized = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    if len(line) <= 40 and normalized in _HEADING_LOOKUP:
+        return _HEADING_LOOKUP[normalized]
+    return None
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """Splits lines at recognised headings; text before the first heading is the "header" (name, contact)."""
+    sections = [("header", [])]
+    for line in lines:
+        section = _heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+def _rank(section: str) -> int:
+    return -1 if section == "header" else SECTION_PRIORITY.index(section)
+
+def fit_budget(sections: List[Tuple[str, List[str]]], budget: int) -> List[Tuple[str, List[str]]]:
+    """
+    Keeps whole sections in priority order while they fit, then fills what is
+    left of the budget with the leading lines of the sections that did not.
+    Output keeps the original order.
+    """
+    order = sorted(range(len(sections)), key=lambda i: _rank(sections[i][0]))
+    kept = {}
+    remaining = budget
+    for i in order:
+        tokens = count_tokens("\n".join(sections[i][1])) + 1
+        if tokens <= remaining:
+            kept[i] = sections[i][1]
+            remaining -= tokens
+    for i in order:
+        if i in kept:
+            continue
+        partial = []
+        for line in sections[i][1]:
+            cost = count_tokens(line) + 1
+            if cost > remaining:
+                break
+            partial.append(line)
+            remaining -= cost
+        # A lone heading without content is not worth sending
+        if len(partial) > 1 or (partial and sections[i][0] == "header"):
+            kept[i] = partial
+    return [(sections[i][0], kept[i]) for i in sorted(kept)]
+
+def compact_resume_text(text: str, budget: int = None) -> Dict[str, Any]:
+    """
+    Prepares extracted resume text for the parsing prompt: normalizes
+    whitespace, strips repeated page headers/footers and page numbers,
+    removes duplicate lines and, if still over `budget` tokens
+    (RESUME_TOKEN_BUDGET), keeps the most informative sections.
+    Returns {"text", "original_tokens", "tokens", "tokens_saved"}.
+    """
+    budget = budget or RESUME_TOKEN_BUDGET
+    original_tokens = count_tokens(text)
+    text = unicodedata.normalize("NFKC", text)
+
+    pages = [[_clean_line(line) for line in page.splitlines()] for page in text.split("\f")]
+    pages = [[line for line in page if line] for page in pages]
+    lines = [line for page in strip_headers_footers(pages) for line in page]
+    lines = dedup_lines(lines)
+
+    compacted = "\n".join(lines)
+    if count_tokens(compacted) > budget:
+        compacted = "\n".join(line for _, body in fit_budget(split_sections(lines), budget) for line in body)
+
+    tokens = count_tokens(compacted)
+    return {
+        "text": compacted,
+        "original_tokens": original_tokens,
+        "tokens": tokens,
+        "tokens_saved": max(original_tokens - tokens, 0),
+    }
@@ -8,8 +8,10 @@ from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 try:
     from backend.services.ai_service import get_llm
+    from backend.services.llm_clients import ainvoke_with_retry
 except ImportError:
     from services.ai_service import get_llm
+    from services.llm_clients import ainvoke_with_retry
 
 # --- State Definition ---
 class AgentState(TypedDict):
@@ -124,7 +126,7 @@ async def analyst_node(state: AgentState):
     
     chain = prompt | llm | JsonOutputParser()
     try:
-        final_profile = await chain.ainvoke({"competitor": competitor, "results": results})
+        final_profile = await ainvoke_with_retry(chain, {"competitor": competitor, "results": results}, client=llm)
         return {"final_profile": final_profile}
     except Exception as e:
         print(f"Analyst Error: {e}")
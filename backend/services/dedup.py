@@ -0,0 +1,301 @@
+import os
+import re
+import zlib
+import hashlib
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
+try:
+    from ..database import SessionLocal
+    from ..models import Resume, Candidate, CandidateKey, ResumeBand
+except ImportError:
+    from database import SessionLocal
+    from models import Resume, Candidate, CandidateKey, ResumeBand
+
+# MinHash signature length; split into DEDUP_BANDS bands for the LSH index
+DEDUP_NUM_PERM = 128
+DEDUP_BANDS = 16
+# Words per shingle when comparing resume texts
+DEDUP_SHINGLE_WORDS = 3
+# Estimated Jaccard similarity (of word shingles) above which two texts belong to the same candidate
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.8"))
+# Above this the texts are the same resume (a re-export or a typo fix) and the parse is reused
+DEDUP_REUSE_THRESHOLD = float(os.getenv("DEDUP_REUSE_THRESHOLD", "0.95"))
+# Most LSH candidates verified per lookup, by number of shared bands
+DEDUP_MAX_CANDIDATES = 50
+DEDUP_BACKFILL_CHUNK = 500
+# Resume.parse_status values of parses made by the LLM; only these are reused for copies
+REUSABLE_PARSE_STATUSES = ("parsed", "cached", "reused")
+
+_ROWS_PER_BAND = DEDUP_NUM_PERM // DEDUP_BANDS
+# With 16 bands of 8 rows, pairs at 0.8 similarity share a band 95% of the
+# time (99.9% at 0.9), and pairs below 0.5 are looked at in about 6% of lookups
+# Hash functions for the permutations: multiply-shift, (a * x + b) mod 2**64 keeping the
+# high 32 bits, with random odd a; fixed seed so stored signatures stay comparable
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(0, 1 << 63, size=DEDUP_NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 63, size=DEDUP_NUM_PERM, dtype=np.uint64)
+_WORD_RE = re.compile(r"\w+")
+_CHUNK = 2048
+
+def _words(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _WORD_RE.findall(text)
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (uint32[DEDUP_NUM_PERM]) of the text's word shingles; None for very short texts."""
+    words = _words(text)
+    if len(words) < DEDUP_SHINGLE_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + DEDUP_SHINGLE_WORDS]) for i in range(len(words) - DEDUP_SHINGLE_WORDS + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    minimum = np.full(DEDUP_NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for start in range(0, len(hashes), _CHUNK):
+            chunk = hashes[start:start + _CHUNK, None]
+            minimum = np.minimum(minimum, ((chunk * _PERM_A + _PERM_B) >> np.uint64(32)).min(axis=0))
+    return minimum.astype(np.uint32)
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype(np.uint32).tobytes()
+
+def from_bytes(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.uint32)
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+def bands(sig: np.ndarray) -> List[int]:
+    """LSH band keys: one signed 64-bit hash per band, stored in resume_lsh_bands."""
+    keys = []
+    for band in range(DEDUP_BANDS):
+        rows = sig[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+def find_duplicates(db, sigs: dict, threshold: float = None, reusable_only: bool = False) -> Dict[object, tuple]:
+    """
+    Looks up near-duplicates of each signature ({ref: signature}) through the
+    LSH bands: one indexed IN query for all of them, then the candidates
+    sharing the most bands are verified on their full signatures. Returns
+    {ref: (resume id, similarity)} for the refs whose closest stored resume
+    reaches the threshold (DEDUP_SIMILARITY_THRESHOLD). With reusable_only,
+    only resumes with an LLM parse (REUSABLE_PARSE_STATUSES) are considered.
+    """
+    threshold = DEDUP_SIMILARITY_THRESHOLD if threshold is None else threshold
+    sigs = {ref: sig for ref, sig in sigs.items() if sig is not None}
+    if not sigs:
+        return {}
+    ref_bands = {ref: bands(sig) for ref, sig in sigs.items()}
+    owners = {}
+    for band, resume_id in db.query(ResumeBand.band, ResumeBand.resume_id).filter(
+        ResumeBand.band.in_({band for keys in ref_bands.values() for band in keys})
+    ):
+        owners.setdefault(band, []).append(resume_id)
+
+    shortlist = {}
+    for ref, keys in ref_bands.items():
+        shared = Counter(resume_id for band in keys for resume_id in owners.get(band, ()))
+        shortlist[ref] = [resume_id for resume_id, _ in shared.most_common(DEDUP_MAX_CANDIDATES)]
+    candidate_ids = {resume_id for ids in shortlist.values() for resume_id in ids}
+    if not candidate_ids:
+        return {}
+    query = db.query(Resume.id, Resume.minhash).filter(Resume.id.in_(candidate_ids), Resume.minhash.isnot(None))
+    if reusable_only:
+        query = query.filter(Resume.parse_status.in_(REUSABLE_PARSE_STATUSES))
+    stored = {row.id: from_bytes(row.minhash) for row in query}
+
+    found = {}
+    for ref, ids in shortlist.items():
+        scored = [(similarity(sigs[ref], stored[resume_id]), resume_id) for resume_id in ids if resume_id in stored]
+        if scored:
+            best, resume_id = max(scored)
+            if best >= threshold:
+                found[ref] = (resume_id, best)
+    return found
+
+def reusable_parses(db, texts: Dict[str, str], contacts: Dict[str, dict] = None) -> Dict[str, dict]:
+    """
+    LLM parses of stored copies (DEDUP_REUSE_THRESHOLD) of the given texts ({ref: text}), so
+    they need not go to the LLM again; failed and local-only parses are never reused, nor
+    is the parse of a copy whose email or phone differs from the text's own (`contacts`,
+    {ref: fields with "email" and "phone"}): that is someone else on the same template.
+    Returns {ref: {"resume_id", "similarity", "parsed_json"}}.
+    """
+    found = find_duplicates(
+        db, {ref: signature(text) for ref, text in texts.items()}, threshold=DEDUP_REUSE_THRESHOLD, reusable_only=True
+    )
+    if not found:
+        return {}
+    parses = dict(db.query(Resume.id, Resume.parsed_json).filter(
+        Resume.id.in_({resume_id for resume_id, _ in found.values()})
+    ).all())
+    contacts = contacts or {}
+    return {
+        ref: {"resume_id": resume_id, "similarity": round(score, 4), "parsed_json": parses[resume_id]}
+        for ref, (resume_id, score) in found.items()
+        if parses.get(resume_id) and not contacts_conflict(contacts.get(ref), parses[resume_id])
+    }
+
+def normalize_name(name) -> Optional[str]:
+    """Lowercase ASCII name with its words sorted, so "Doe, Jane" and "Jane Doe" agree."""
+    if not isinstance(name, str):
+        return None
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    words = sorted(re.findall(r"[a-z]+", name))
+    return " ".join(words) if len(words) >= 2 else None
+
+def identity_keys(parsed_json: dict) -> List[str]:
+    """
+    Normalized identity keys of a parsed resume, strongest first: the email on
+    its own, then the phone number together with the name (a phone number
+    alone may be a shared office or agency line).
+    """
+    parsed_json = parsed_json or {}
+    keys = []
+    email = parsed_json.get("email")
+    if isinstance(email, str) and "@" in email:
+        keys.append(f"email:{email.strip().lower()}")
+    phone = re.sub(r"\D", "", str(parsed_json.get("phone") or ""))[-10:]
+    name = normalize_name(parsed_json.get("name"))
+    if len(phone) >= 7 and name:
+        keys.append(f"phone:{phone}:{name}")
+    return keys
+
+def contact_details(parsed_json: dict) -> dict:
+    """Normalized email and phone (last 10 digits) of a parsed resume; None where missing."""
+    parsed_json = parsed_json or {}
+    email = parsed_json.get("email")
+    phone = re.sub(r"\D", "", str(parsed_json.get("phone") or ""))[-10:]
+    return {
+        "email": email.strip().lower() if isinstance(email, str) and "@" in email else None,
+        "phone": phone if len(phone) >= 7 else None,
+    }
+
+def contacts_conflict(a: dict, b: dict) -> bool:
+    """True when two resumes give different emails or phone numbers, so their texts are not the same person's."""
+    a, b = contact_details(a), contact_details(b)
+    return any(a[field] and b[field] and a[field] != b[field] for field in ("email", "phone"))
+
+def assign_candidates(db, resumes: List[Resume]):
+    """
+    Links flushed resumes to candidates, in id order: to the candidate owning
+    one of their identity keys, else to the candidate of a near-duplicate text
+    (stored earlier or earlier in this batch) whose email and phone do not
+    contradict theirs, else to a new candidate. Stores
+    each resume's signature, its LSH bands unless it is a copy of a resume
+    already indexed (an LLM-parsed copy of a local-only parse is indexed, so
+    later copies can reuse it), and the candidates' new identity keys. Runs in
+    the caller's transaction; does not commit.
+    """
+    resumes = sorted(resumes, key=lambda resume: resume.id)
+    sigs = {resume.id: signature(resume.raw_text) for resume in resumes}
+    for resume in resumes:
+        if sigs[resume.id] is not None:
+            resume.minhash = to_bytes(sigs[resume.id])
+    keys = {resume.id: identity_keys(resume.parsed_json) for resume in resumes}
+    owners = dict(db.query(CandidateKey.key, CandidateKey.candidate_id).filter(
+        CandidateKey.key.in_({key for resume_keys in keys.values() for key in resume_keys})
+    ).all())
+    found = find_duplicates(db, sigs)
+    # Contact details of every possible original, to tell a copy from someone else on the same template
+    parses = {resume.id: resume.parsed_json for resume in resumes}
+    stored_ids = {resume_id for resume_id, _ in found.values()} - set(parses)
+    if stored_ids:
+        parses.update(db.query(Resume.id, Resume.parsed_json).filter(Resume.id.in_(stored_ids)).all())
+    found = {
+        resume_id: match for resume_id, match in found.items()
+        if not contacts_conflict(parses[resume_id], parses.get(match[0]))
+    }
+    reusable = {resume.id for resume in resumes if resume.parse_status in REUSABLE_PARSE_STATUSES}
+    # Reusable resumes that already have a reusable stored copy
+    covered = set(find_duplicates(
+        db, {resume_id: sigs[resume_id] for resume_id in reusable}, threshold=DEDUP_REUSE_THRESHOLD, reusable_only=True
+    ))
+    # Earlier resumes of the same batch are matched through an in-memory band table
+    duplicates, batch_bands = {}, {}
+    for resume_id, sig in sigs.items():
+        if sig is None:
+            continue
+        resume_bands = bands(sig)
+        best = found.get(resume_id)
+        shared = Counter(other for band in resume_bands for other in batch_bands.get(band, ()))
+        for other, _ in shared.most_common(DEDUP_MAX_CANDIDATES):
+            if contacts_conflict(parses[resume_id], parses[other]):
+                continue
+            score = similarity(sig, sigs[other])
+            if score >= DEDUP_SIMILARITY_THRESHOLD and (best is None or score > best[1]):
+                best = (other, score)
+            if score >= DEDUP_REUSE_THRESHOLD and other in reusable:
+                covered.add(resume_id)
+        if best:
+            duplicates[resume_id] = best[0]
+        # Copies stay out of the index, so re-uploads of one document do not pile
+        # up in its bands; the indexed original stands for them in every lookup.
+        # The first LLM parse of a document only known from local parses is kept
+        if best and best[1] >= DEDUP_REUSE_THRESHOLD and (resume_id not in reusable or resume_id in covered):
+            continue
+        for band in resume_bands:
+            batch_bands.setdefault(band, []).append(resume_id)
+    db.bulk_insert_mappings(ResumeBand, [
+        {"band": band, "resume_id": resume_id} for band, ids in batch_bands.items() for resume_id in ids
+    ])
+    stored_candidates = dict(db.query(Resume.id, Resume.candidate_id).filter(
+        Resume.id.in_(set(duplicates.values()) - set(sigs))
+    ).all()) if duplicates else {}
+    candidate_of = {}
+
+    new_keys = {}
+    for resume in resumes:
+        candidate_id = next((owners[key] for key in keys[resume.id] if key in owners), None)
+        if candidate_id is None and resume.id in duplicates:
+            original = duplicates[resume.id]
+            candidate_id = candidate_of.get(original) or stored_candidates.get(original)
+        if candidate_id is None:
+            parsed_json = resume.parsed_json or {}
+            candidate = Candidate(
+                name=parsed_json.get("name") if isinstance(parsed_json.get("name"), str) else None,
+                email=resume.email,
+            )
+            db.add(candidate)
+            db.flush()
+            candidate_id = candidate.id
+        resume.candidate_id = candidate_of[resume.id] = candidate_id
+        for key in keys[resume.id]:
+            if key not in owners:
+                owners[key] = new_keys[key] = candidate_id
+
+    if new_keys:
+        try:
+            with db.begin_nested():
+                db.add_all([CandidateKey(key=key, candidate_id=candidate_id) for key, candidate_id in new_keys.items()])
+        except IntegrityError:
+            # A concurrent upload claimed some of these keys first; the resumes
+            # keep their candidate and later uploads follow the stored keys
+            pass
+
+def backfill_candidates(session_factory=None, chunk_size: int = DEDUP_BACKFILL_CHUNK) -> int:
+    """Links resumes stored before deduplication existed to candidates, oldest first. Returns rows linked."""
+    db = (session_factory or SessionLocal)()
+    linked = 0
+    try:
+        while True:
+            resumes = db.query(Resume).options(undefer(Resume.raw_text), undefer(Resume.parsed_json)).filter(
+                Resume.candidate_id.is_(None)
+            ).order_by(Resume.id).limit(chunk_size).all()
+            if not resumes:
+                break
+            assign_candidates(db, resumes)
+            db.commit()
+            linked += len(resumes)
+            db.expunge_all()
+        if linked:
+            print(f"Linked {linked} resumes to candidates")
+        return linked
+    finally:
+        db.close()
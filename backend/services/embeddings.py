@@ -0,0 +1,234 @@
+import os
+import time
+import zlib
+import threading
+import numpy as np
+from typing import List, Optional, Tuple
+from sqlalchemy import or_
+try:
+    from ..database import SessionLocal
+    from ..models import Resume
+except ImportError:
+    from database import SessionLocal
+    from models import Resume
+from .prescorer import candidate_skills, term_list
+
+# "hashed" (offline, default) or "sentence-transformers" (needs the package and EMBEDDING_MODEL)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashed").lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# Dimensions of the hashed n-gram vectors
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+# Rows re-embedded per commit when stored vectors are missing or from another backend
+EMBEDDING_BACKFILL_CHUNK = 500
+# Ids skipped when appending to the index (a transaction that commits after a higher
+# id, on Postgres) are looked up again for this long; at most this many are tracked
+EMBEDDING_INDEX_GAP_SECONDS = 300
+EMBEDDING_INDEX_MAX_GAPS = 10000
+
+class HashedNgramEmbedder:
+    """
+    Character trigram + whole-term features hashed into a fixed-size signed
+    vector. Needs no model download, and similar spellings ("postgres",
+    "postgresql") land close together.
+    """
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashed-3gram-{dim}"
+
+    def _features(self, term: str):
+        padded = f"#{term}#"
+        yield term, 2.0
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3], 1.0
+
+    def embed_terms(self, terms: List[str]) -> np.ndarray:
+        """One unit vector per term."""
+        vectors = np.zeros((len(terms), self.dim), dtype=np.float32)
+        for row, term in enumerate(terms):
+            for feature, weight in self._features(term):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += weight if h & 0x80000000 else -weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"[:64]
+
+    def embed_terms(self, terms: List[str]) -> np.ndarray:
+        if not terms:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return self.model.encode(terms, normalize_embeddings=True).astype(np.float32)
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def get_embedder():
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if EMBEDDING_BACKEND == "sentence-transformers":
+                try:
+                    _embedder = SentenceTransformerEmbedder()
+                except Exception as e:
+                    print(f"Embedding model unavailable ({e}), using hashed n-gram vectors")
+            if _embedder is None:
+                _embedder = HashedNgramEmbedder()
+        return _embedder
+
+def embed_skill_set(terms: List[str], weights: Optional[List[float]] = None) -> np.ndarray:
+    """Weighted mean of the term vectors, unit length (all zeros for no terms)."""
+    embedder = get_embedder()
+    if not terms:
+        return np.zeros(embedder.dim, dtype=np.float32)
+    vectors = embedder.embed_terms(terms)
+    if weights is not None:
+        vectors = vectors * np.asarray(weights, dtype=np.float32)[:, None]
+    vector = vectors.sum(axis=0)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm > 0 else vector).astype(np.float32)
+
+def embed_resume(parsed_json: dict) -> np.ndarray:
+    return embed_skill_set(sorted(candidate_skills(parsed_json)))
+
+def embed_jd(jd_json: dict) -> np.ndarray:
+    """Required skills and mandatory keywords count fully, nice-to-haves at half weight."""
+    jd_json = jd_json or {}
+    weights = {}
+    for key, weight in (("good_to_have_skills", 0.5), ("required_skills", 1.0), ("mandatory_keywords", 1.0)):
+        for term in term_list(jd_json.get(key)):
+            weights[term] = weight
+    return embed_skill_set(list(weights), list(weights.values()))
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    return vector.astype(np.float32).tobytes()
+
+def embedding_columns(parsed_json: dict) -> dict:
+    """Column values storing a resume's embedding, for inserts and updates."""
+    return {"embedding": to_bytes(embed_resume(parsed_json)), "embedding_model": get_embedder().name}
+
+def backfill_embeddings(db) -> int:
+    """Embeds resumes with no stored vector or one from a different backend. Returns rows updated."""
+    model = get_embedder().name
+    updated = 0
+    while True:
+        rows = db.query(Resume.id, Resume.parsed_json).filter(
+            (Resume.embedding_model.is_(None)) | (Resume.embedding_model != model)
+        ).order_by(Resume.id).limit(EMBEDDING_BACKFILL_CHUNK).all()
+        if not rows:
+            return updated
+        db.bulk_update_mappings(Resume, [{"id": row.id, **embedding_columns(row.parsed_json)} for row in rows])
+        db.commit()
+        updated += len(rows)
+
+class EmbeddingIndex:
+    """
+    All resume vectors as one (n x dim) float32 matrix kept in memory, so a
+    JD is ranked against the whole pool with a single matrix-vector product.
+    load() reads every row (at startup); refresh() only appends the rows
+    inserted since, found on the primary key, so a search after an upload
+    costs as much as the upload's rows.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dim = None
+        self._size = 0
+        self._last_id = 0
+        # Ids skipped by an append (not committed yet, or rolled back): {id: first seen}
+        self._gaps = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._jd_ids = np.zeros(0, dtype=np.int64)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def load(self, db):
+        """Embeds any resume without a current vector, then reloads the whole index."""
+        backfill_embeddings(db)
+        with self._lock:
+            self._dim, self._size, self._last_id, self._gaps = get_embedder().dim, 0, 0, {}
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._jd_ids = np.zeros(0, dtype=np.int64)
+            self._matrix = np.zeros((0, self._dim), dtype=np.float32)
+        self.refresh(db)
+
+    def refresh(self, db):
+        """Appends resumes stored since the last refresh."""
+        embedder = get_embedder()
+        now = time.monotonic()
+        with self._lock:
+            last_id = self._last_id
+            self._gaps = {gap: seen for gap, seen in self._gaps.items() if now - seen < EMBEDDING_INDEX_GAP_SECONDS}
+            gaps = list(self._gaps)
+        new_rows = Resume.id > last_id
+        rows = db.query(Resume.id, Resume.job_description_id, Resume.embedding).filter(
+            or_(new_rows, Resume.id.in_(gaps)) if gaps else new_rows,
+            Resume.embedding_model == embedder.name,
+        ).order_by(Resume.id).all()
+        if not rows:
+            return
+        with self._lock:
+            if self._dim is None:
+                self._dim = embedder.dim
+            # Another request may have appended some of these meanwhile
+            rows = [row for row in rows if row.id > self._last_id or row.id in self._gaps]
+            if not rows:
+                return
+            found = {row.id for row in rows}
+            for gap in found & set(self._gaps):
+                del self._gaps[gap]
+            top = max(found)
+            if top > self._last_id:
+                skipped = set(range(self._last_id + 1, top)) - found if top - self._last_id <= EMBEDDING_INDEX_MAX_GAPS else ()
+                self._gaps.update((gap, now) for gap in skipped)
+                self._last_id = top
+            self._append(
+                np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows)),
+                np.fromiter((row.job_description_id or 0 for row in rows), dtype=np.int64, count=len(rows)),
+                np.frombuffer(b"".join(row.embedding for row in rows), dtype=np.float32).reshape(len(rows), self._dim),
+            )
+
+    def _append(self, ids: np.ndarray, jd_ids: np.ndarray, vectors: np.ndarray):
+        """Writes rows after the last one, doubling the buffers when full. Caller holds the lock."""
+        needed = self._size + len(ids)
+        if needed > len(self._ids):
+            capacity = max(needed, 2 * len(self._ids), 1024)
+            grown_ids = np.zeros(capacity, dtype=np.int64)
+            grown_jd_ids = np.zeros(capacity, dtype=np.int64)
+            grown_matrix = np.zeros((capacity, self._dim), dtype=np.float32)
+            if self._size:
+                grown_ids[:self._size] = self._ids[:self._size]
+                grown_jd_ids[:self._size] = self._jd_ids[:self._size]
+                grown_matrix[:self._size] = self._matrix[:self._size]
+            self._ids, self._jd_ids, self._matrix = grown_ids, grown_jd_ids, grown_matrix
+        self._ids[self._size:needed] = ids
+        self._jd_ids[self._size:needed] = jd_ids
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
+
+    def search(self, query: np.ndarray, top_k: int, jd_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(resume id, cosine similarity) of the top_k closest resumes, best first."""
+        # Views of the filled part; later appends only write past it or into new buffers
+        with self._lock:
+            size = self._size
+            ids, jd_ids, matrix = self._ids[:size], self._jd_ids[:size], self._matrix[:size]
+        if not size:
+            return []
+        scores = matrix @ query
+        if jd_id is not None:
+            scores = np.where(jd_ids == jd_id, scores, -np.inf)
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+index = EmbeddingIndex()
+
+def load_index(session_factory=None):
+    """Backfills missing vectors and loads the in-memory index; run at startup, off the request path."""
+    db = (session_factory or SessionLocal)()
+    try:
+        index.load(db)
+    finally:
+        db.close()
@@ -0,0 +1,149 @@
+import os
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+from fastapi.concurrency import run_in_threadpool
+from .parser import extract_text
+
+# Number of processes used for PDF/DOCX text extraction
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+# Per-document limits; a document over the time limit returns the pages read so far
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "20"))
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "30"))
+# Extra time the caller waits beyond the worker's own deadline before giving up on a document
+EXTRACT_GRACE_SECONDS = float(os.getenv("EXTRACT_GRACE_SECONDS", "10"))
+# How workers are started. Forking a server process that already runs threads
+# can copy locks held by other threads into the child, so fork is not the default
+EXTRACT_START_METHOD = os.getenv(
+    "EXTRACT_START_METHOD", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# How often a queued document is checked for having been picked up by a worker
+EXTRACT_QUEUE_POLL_SECONDS = 0.05
+# Documents of one batch handed to the pool at a time; file-object sources are
+# only read into memory when handed over
+EXTRACT_IN_FLIGHT = int(os.getenv("EXTRACT_IN_FLIGHT", str(2 * EXTRACT_WORKERS)))
+
+_pool = None
+_lock = threading.Lock()
+_outstanding = set()
+_counters = {"submitted": 0, "completed": 0, "failed": 0, "abandoned": 0, "pool_restarts": 0}
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context(EXTRACT_START_METHOD)
+            )
+        return _pool
+
+def restart_pool(pool: ProcessPoolExecutor):
+    """
+    Kills the workers of a pool with a stuck (or crashed) worker and puts a new
+    pool in its place; a page that hangs inside the PDF library cannot be
+    interrupted any other way. Documents still running in the old pool fail
+    with BrokenProcessPool and are retried by extract_document().
+    """
+    global _pool
+    with _lock:
+        if _pool is not pool:
+            return  # Already replaced after another document's timeout
+        _pool = None
+        _counters["pool_restarts"] += 1
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pool():
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def submit_document(pool: ProcessPoolExecutor, filename: str, source):
+    """Queues one document and returns a concurrent.futures.Future for its text."""
+    future = pool.submit(extract_text, filename, source, EXTRACT_MAX_PAGES, EXTRACT_TIMEOUT_SECONDS)
+    with _lock:
+        _outstanding.add(future)
+        _counters["submitted"] += 1
+    future.add_done_callback(_on_done)
+    return future
+
+def _on_done(future):
+    with _lock:
+        _outstanding.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            _counters["failed"] += 1
+        else:
+            _counters["completed"] += 1
+
+async def _result(future) -> str:
+    """Waits for an extraction; its deadline starts when a worker picks it up, not while it is queued."""
+    waiter = asyncio.wrap_future(future)
+    while not future.running():
+        done, _ = await asyncio.wait({waiter}, timeout=EXTRACT_QUEUE_POLL_SECONDS)
+        if done:
+            return waiter.result()
+    return await asyncio.wait_for(waiter, timeout=EXTRACT_TIMEOUT_SECONDS + EXTRACT_GRACE_SECONDS)
+
+def read_source(source):
+    """Bytes of a file-object source (such as an upload's spooled file); paths and bytes pass through."""
+    if hasattr(source, "read"):
+        source.seek(0)
+        return source.read()
+    return source
+
+async def extract_document(filename: str, source) -> str:
+    """Extracts one document in the process pool; returns "" if it failed or got stuck."""
+    if hasattr(source, "read"):
+        # Workers cannot open another process's temp file, so the bytes are sent over
+        source = await run_in_threadpool(read_source, source)
+    for attempt in range(2):
+        pool = get_pool()
+        try:
+            return await _result(submit_document(pool, filename, source))
+        except asyncio.TimeoutError:
+            # The worker is stuck inside a single page; only killing it frees the slot
+            with _lock:
+                _counters["abandoned"] += 1
+            print(f"Extraction of {filename} did not finish in time, skipping")
+            restart_pool(pool)
+            return ""
+        except BrokenProcessPool:
+            # The pool was restarted for another document, or a worker crashed; try once on a new pool
+            restart_pool(pool)
+            if attempt:
+                print(f"Extraction of {filename} failed: the worker process died")
+        except Exception as e:
+            print(f"Error extracting {filename}: {e}")
+            return ""
+    return ""
+
+async def extract_documents(filenames: List[str], sources: list) -> List[str]:
+    """
+    Extracts text from all documents across the process pool, at most
+    EXTRACT_IN_FLIGHT at a time. Sources are file paths, bytes or seekable
+    file objects (e.g. UploadFile.file). Results are returned in input order;
+    failed documents yield "".
+    """
+    slots = asyncio.Semaphore(max(1, EXTRACT_IN_FLIGHT))
+
+    async def extract(filename: str, source) -> str:
+        async with slots:
+            return await extract_document(filename, source)
+
+    return list(await asyncio.gather(*(extract(name, source) for name, source in zip(filenames, sources))))
+
+def get_metrics() -> dict:
+    with _lock:
+        running = sum(1 for future in _outstanding if future.running())
+        return {
+            "workers": EXTRACT_WORKERS,
+            "queue_depth": len(_outstanding) - running,
+            "running": running,
+            **_counters,
+        }
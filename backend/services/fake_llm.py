@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+# Offline stand-in for the LLM (LLM_PROVIDER=fake), for load and regression tests.
+# Answers are canned JSON derived from the prompt alone, so reruns give identical
+# results; only the simulated latency and errors are random.
+
+FAKE_LLM_MODEL = "fake-chat"
+# Latency distribution of one call: "lognormal" (long tail, like real providers), "uniform" or "constant"
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal").lower()
+# Median latency of one call
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))
+# Sigma of log(latency) for lognormal; for uniform, the +/- share of the median
+FAKE_LLM_LATENCY_SPREAD = float(os.getenv("FAKE_LLM_LATENCY_SPREAD", "0.5"))
+# Added per 1000 prompt tokens, so batched calls take longer than single ones
+FAKE_LLM_MS_PER_1K_TOKENS = float(os.getenv("FAKE_LLM_MS_PER_1K_TOKENS", "100"))
+# Share of calls failing with a retryable 429 or 503 (after their latency)
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+# Seed for latencies and errors; unset draws a new sequence per process
+FAKE_LLM_SEED = os.getenv("FAKE_LLM_SEED")
+
+# Skills recognised in resume and JD texts
+FAKE_SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "angular", "node", "django", "flask",
+    "fastapi", "spring", "sql", "postgresql", "mysql", "mongodb", "redis", "aws", "azure", "gcp",
+    "docker", "kubernetes", "terraform", "kafka", "spark", "pandas", "tensorflow", "pytorch",
+    "go", "rust", "c++", "git", "linux", "graphql", "excel", "tableau",
+]
+_SKILL_RES = [(skill, re.compile(r"(?<![\w+])" + re.escape(skill) + r"(?![\w+])")) for skill in FAKE_SKILLS]
+_CANDIDATE_LINE = re.compile(r"^\s*\[(\d+)\]\s*(\{.*\})\s*$", re.MULTILINE)
+_JSON_AFTER = r"{}:\s*\n\s*(\{{.*\}})\s*$"
+
+class FakeLLMError(Exception):
+    """Simulated provider failure; carries a status code, so it is retried like a real one."""
+    def __init__(self, status_code: int):
+        super().__init__(f"Simulated LLM error {status_code}")
+        self.status_code = status_code
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+def _skills_in(text: str) -> List[str]:
+    text = text.lower()
+    return [skill for skill, pattern in _SKILL_RES if pattern.search(text)]
+
+def _first_line(text: str, default: str) -> str:
+    for line in text.splitlines():
+        words = re.findall(r"[A-Za-z][A-Za-z.'-]*", line)
+        if words:
+            return " ".join(words[:4])
+    return default
+
+def _json_after(label: str, prompt: str) -> dict:
+    match = re.search(_JSON_AFTER.format(re.escape(label)), prompt, re.MULTILINE)
+    try:
+        return json.loads(match.group(1)) if match else {}
+    except ValueError:
+        return {}
+
+def _section(prompt: str, start: str, end: str) -> str:
+    """Text between two prompt markers (the document embedded in an extraction prompt)."""
+    _, _, rest = prompt.partition(start)
+    return rest.rsplit(end, 1)[0] if rest else ""
+
+def fake_resume(text: str) -> dict:
+    h = _digest(text)
+    skills = _skills_in(text) or [FAKE_SKILLS[h % len(FAKE_SKILLS)]]
+    return {
+        "name": _first_line(text, f"Candidate {h % 10000}"),
+        "total_experience_years": h % 15,
+        "skills": {"technical": skills, "domain": [], "tools": [], "soft_skills": ["communication"]},
+        "job_titles": ["Software Engineer"],
+        "education": [{"degree": "B.Tech", "institution": "State University", "year": str(2000 + h % 24)}],
+        "summary": "Synthetic profile generated offline.",
+    }
+
+def fake_jd(text: str) -> dict:
+    h = _digest(text)
+    skills = _skills_in(text) or [FAKE_SKILLS[h % len(FAKE_SKILLS)]]
+    return {
+        "role_title": _first_line(text, "Software Engineer"),
+        "department": "Engineering",
+        "required_skills": skills[:8],
+        "good_to_have_skills": skills[8:],
+        "minimum_experience_years": h % 8,
+        "domain": "Software",
+        "location": "Remote",
+        "mandatory_keywords": [],
+    }
+
+def _profile_skills(profile: dict) -> set:
+    skills = profile.get("skills") or {}
+    if isinstance(skills, dict):
+        skills = [skill for values in skills.values() if isinstance(values, list) for skill in values]
+    return {str(skill).lower() for skill in skills} if isinstance(skills, list) else set()
+
+def fake_score(profile: dict, jd: dict, key: str) -> dict:
+    """Score driven by skill overlap plus a stable per-pair offset, so rankings are plausible."""
+    required = [str(skill).lower() for skill in jd.get("required_skills") or []]
+    have = _profile_skills(profile)
+    matching = [skill for skill in required if skill in have]
+    missing = [skill for skill in required if skill not in have]
+    overlap = len(matching) / len(required) if required else 0.5
+    score = min(100, round(20 + 70 * overlap + _digest(key) % 11))
+    verdict = ("Highly Relevant" if score >= 80 else "Relevant" if score >= 60
+               else "Borderline" if score >= 40 else "Not Relevant")
+    return {
+        "score": score, "verdict": verdict, "missing_skills": missing, "matching_skills": matching,
+        "red_flags": [], "reasoning": f"Matches {len(matching)} of {len(required)} required skills.",
+    }
+
+def fake_answer(prompt: str) -> str:
+    """Canned JSON for the prompts built in ai_service, recognised by their wording."""
+    if "Candidates (one per line" in prompt:
+        jd = _json_after("Job Description", prompt)
+        results = []
+        for index, line in _CANDIDATE_LINE.findall(prompt):
+            try:
+                profile = json.loads(line)
+            except ValueError:
+                profile = {}
+            results.append({"index": int(index), **fake_score(profile, jd, line + json.dumps(jd))})
+        return json.dumps({"results": results})
+    if "Evaluate the candidate" in prompt:
+        jd, profile = _json_after("Job Description", prompt), _json_after("Candidate Profile", prompt)
+        return json.dumps(fake_score(profile, jd, prompt))
+    if "Job Description text below" in prompt:
+        return json.dumps(fake_jd(_section(prompt, "JD Text:", "Return ONLY valid JSON.")))
+    if "resume text below" in prompt:
+        return json.dumps(fake_resume(_section(prompt, "Resume Text:", "Return ONLY valid JSON.")))
+    return "{}"
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers offline with fake_answer() after a simulated
+    latency, and fails a configurable share of calls with retryable errors.
+    Async calls sleep without blocking the event loop.
+    """
+    latency_distribution: str = FAKE_LLM_LATENCY_DISTRIBUTION
+    latency_ms: float = FAKE_LLM_LATENCY_MS
+    latency_spread: float = FAKE_LLM_LATENCY_SPREAD
+    ms_per_1k_tokens: float = FAKE_LLM_MS_PER_1K_TOKENS
+    error_rate: float = FAKE_LLM_ERROR_RATE
+    seed: Optional[int] = int(FAKE_LLM_SEED) if FAKE_LLM_SEED else None
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any):
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _prompt(self, messages: List[BaseMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages if isinstance(m, HumanMessage))
+
+    def _delay(self, prompt: str) -> float:
+        """Seconds this call takes, drawn from the configured distribution."""
+        median = self.latency_ms
+        if self.latency_distribution == "lognormal":
+            median = self._rng.lognormvariate(0, self.latency_spread) * self.latency_ms
+        elif self.latency_distribution == "uniform":
+            median = self._rng.uniform(1 - self.latency_spread, 1 + self.latency_spread) * self.latency_ms
+        return max(0.0, median + self.ms_per_1k_tokens * len(prompt) / 4000) / 1000
+
+    def _result(self, prompt: str) -> ChatResult:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeLLMError(self._rng.choice([429, 503]))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=fake_answer(prompt)))])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = self._prompt(messages)
+        time.sleep(self._delay(prompt))
+        return self._result(prompt)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = self._prompt(messages)
+        await asyncio.sleep(self._delay(prompt))
+        return self._result(prompt)
@@ -3,6 +3,7 @@ import os
 from typing import List, Dict, Any
 from datetime import datetime, date, timedelta
 from .ai_service import get_llm
+from .llm_clients import invoke_with_retry
 
 class GitLabService:
     def __init__(self, token: str, url: str = "https://gitlabproxy.lightinfosys.com"):
@@ -337,7 +338,7 @@ class GitLabService:
                 SystemMessage(content="You are a helpful project manager assistant."),
                 HumanMessage(content=prompt)
             ]
-            response = llm.invoke(messages)
+            response = invoke_with_retry(llm, messages)
             summary = str(response.content)
             
             return {
@@ -613,7 +614,7 @@ class GitLabService:
                     SystemMessage(content="You are a helpful project manager assistant."),
                     HumanMessage(content=prompt)
                 ]
-                response = llm.invoke(messages)
+                response = invoke_with_retry(llm, messages)
                 summary = str(response.content)
             except Exception as e:
                 print(f"Error generating summary: {e}")
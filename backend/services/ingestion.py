@@ -0,0 +1,181 @@
+import os
+import asyncio
+from typing import List, Dict, Any
+from fastapi.concurrency import run_in_threadpool
+try:
+    from ..models import Resume
+except ImportError:
+    from models import Resume
+from .extraction import extract_documents
+from .ai_service import aparse_resume_with_ai, get_provider, get_model_name, RESUME_PROMPT_VERSION
+from .rate_limiter import get_rate_limiter
+from .compaction import compact_resume_text
+from .parser import extract_local_fields, strip_contact_details, guess_name
+from .embeddings import embedding_columns
+from .llm_schemas import years_value
+from .skills import resume_skill_ids
+from .search import index_resumes
+from .dedup import reusable_parses, assign_candidates
+from . import parse_cache
+
+# Number of resumes parsed by the LLM at the same time
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+
+def merge_local_fields(parsed: dict, fields: dict) -> dict:
+    """Rule-based fields take precedence over the LLM's wherever they found something."""
+    merged = dict(parsed)
+    for key, value in fields.items():
+        if value not in (None, "", []) or key not in merged:
+            merged[key] = value
+    return merged
+
+def hot_columns(parsed_json: dict) -> dict:
+    """Resume columns copied out of parsed_json for indexed filtering."""
+    parsed_json = parsed_json or {}
+    email = parsed_json.get("email")
+    return {
+        "email": email.strip().lower() if isinstance(email, str) and "@" in email else None,
+        # Same coercion as the parse schema, so "5+ years" from the cache or a local parse counts too
+        "total_experience_years": years_value(parsed_json.get("total_experience_years")),
+    }
+
+def local_fields(keys: List[str], texts: List[str]) -> Dict[str, dict]:
+    """Rule-based fields of every non-empty text, by cache key."""
+    return {key: extract_local_fields(text) for key, text in zip(keys, texts) if text.strip()}
+
+async def parse_resumes(texts: List[str], api_key: str = None, db=None) -> List[Dict[str, Any]]:
+    """
+    Parses resume texts with the LLM, at most INGEST_CONCURRENCY at a time and
+    within the provider's rate limit. When a db session is given, previously
+    parsed documents are served from the parse cache and new parses are cached.
+    Contact details and experience years are extracted locally and merged in;
+    the rest of the text is compacted to RESUME_TOKEN_BUDGET before it is sent.
+    Without any AI key configured, only the local fields are returned ("local").
+    Near-duplicates of stored resumes reuse that resume's parse ("reused",
+    with its id in "duplicate_of").
+    Returns one entry per text, in order:
+    {"parsed_json": dict, "status": "parsed" | "cached" | "reused" | "local" | "failed" | "empty", "error": str | None,
+     "tokens": {"original_tokens", "tokens", "tokens_saved"} | None (None when no LLM call was made)}
+    """
+    limiter = get_rate_limiter(get_provider(api_key))
+    model = get_model_name(api_key)
+    use_cache = db is not None and model is not None
+
+    keys = [parse_cache.cache_key(text, RESUME_PROMPT_VERSION, model or "") for text in texts]
+    local = await run_in_threadpool(local_fields, keys, texts)
+    cached = {}
+    if use_cache:
+        cached = await run_in_threadpool(parse_cache.get_cached_parses, db, list(local))
+
+    reused = {}
+    if db is not None:
+        # Re-exports and lightly edited copies of a stored resume are not parsed again
+        reused = await run_in_threadpool(reusable_parses, db, {
+            key: text for key, text in zip(keys, texts) if text.strip() and key not in cached
+        }, local)
+
+    semaphore = asyncio.Semaphore(max(1, INGEST_CONCURRENCY))
+
+    async def parse_one(key: str, text: str) -> Dict[str, Any]:
+        if model is None:
+            return {"parsed_json": {"name": guess_name(text)}, "status": "local", "error": None, "tokens": None}
+        compacted = await run_in_threadpool(compact_resume_text, strip_contact_details(text))
+        tokens = {name: compacted[name] for name in ("original_tokens", "tokens", "tokens_saved")}
+        async with semaphore:
+            await limiter.acquire_async()
+            parsed = await aparse_resume_with_ai(
+                compacted["text"], api_key=api_key,
+                with_experience=local[key]["total_experience_years"] is None,
+            )
+        if not parsed or "error" in parsed:
+            return {"parsed_json": {}, "status": "failed", "error": (parsed or {}).get("error", "AI parsing failed"), "tokens": tokens}
+        return {"parsed_json": parsed, "status": "parsed", "error": None, "tokens": tokens}
+
+    # Identical documents within the batch are only sent to the LLM once
+    pending = {}
+    for key, text in zip(keys, texts):
+        if text.strip() and key not in cached and key not in reused:
+            pending.setdefault(key, text)
+
+    fresh = dict(zip(pending.keys(), await asyncio.gather(*(parse_one(key, text) for key, text in pending.items()))))
+
+    if use_cache:
+        # The cache holds the LLM's answer only; local fields are merged on the way out
+        await run_in_threadpool(
+            parse_cache.store_parses,
+            db,
+            {key: result["parsed_json"] for key, result in fresh.items() if result["status"] == "parsed"},
+            RESUME_PROMPT_VERSION,
+            model,
+        )
+
+    results = []
+    for key, text in zip(keys, texts):
+        if not text.strip():
+            results.append({"parsed_json": {}, "status": "empty", "error": "No text could be extracted", "tokens": None})
+            continue
+        if key in cached:
+            result = {"parsed_json": cached[key], "status": "cached", "error": None, "tokens": None}
+        elif key in reused:
+            result = {"parsed_json": reused[key]["parsed_json"], "status": "reused", "error": None, "tokens": None,
+                      "duplicate_of": reused[key]["resume_id"]}
+        else:
+            result = fresh[key]
+        if result["status"] != "failed":
+            result = {**result, "parsed_json": merge_local_fields(result["parsed_json"], local[key])}
+        results.append(result)
+    return results
+
+async def ingest_resumes(filenames: List[str], sources: list, api_key: str = None, db=None) -> List[Dict[str, Any]]:
+    """
+    Runs extraction and parsing for a batch of uploaded files, given as
+    file paths, bytes or the uploads' spooled file objects. Each result carries filename, raw_text,
+    parsed_json, status and error.
+    """
+    texts = await extract_documents(filenames, sources)
+    parsed = await parse_resumes(texts, api_key=api_key, db=db)
+    return [
+        {"filename": name, "raw_text": text, **result}
+        for name, text, result in zip(filenames, texts, parsed)
+    ]
+
+async def parse_document(text: str, api_key: str = None, session_factory=None) -> Dict[str, Any]:
+    """parse_resumes() for a single text, with its own session for the parse cache."""
+    db = session_factory() if session_factory else None
+    try:
+        return (await parse_resumes([text], api_key=api_key, db=db))[0]
+    finally:
+        if db is not None:
+            db.close()
+
+def insert_resumes(db, jd_id: int, results: List[Dict[str, Any]]) -> List[int]:
+    """
+    Inserts ingestion results in a single flush, links them to their
+    candidates and returns their ids in input order.
+    """
+    db_resumes = [
+        Resume(
+            job_description_id=jd_id,
+            filename=result["filename"],
+            raw_text=result["raw_text"],
+            parsed_json=result["parsed_json"],
+            score_json={},  # Placeholder
+            # Failed parses stay visible instead of looking like unscored candidates
+            verdict="Pending" if result["status"] in ("parsed", "cached", "reused", "local") else "Parse Failed",
+            parse_status=result["status"],
+            skill_ids=resume_skill_ids(db, result["parsed_json"]),
+            **hot_columns(result["parsed_json"]),
+            **embedding_columns(result["parsed_json"]),
+        )
+        for result in results
+    ]
+    db.add_all(db_resumes)
+    db.flush()
+    ids = [db_resume.id for db_resume in db_resumes]
+    assign_candidates(db, db_resumes)
+    # Same transaction, so a resume is never stored without being searchable
+    index_resumes(db, [
+        (db_resume.id, jd_id, db_resume.parsed_json, db_resume.raw_text, db_resume.skill_ids) for db_resume in db_resumes
+    ])
+    db.commit()
+    return ids
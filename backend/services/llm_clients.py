@@ -0,0 +1,225 @@
+import os
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+import httpx
+
+# Maximum number of cached clients (one per provider/model/API key)
+LLM_CLIENT_CACHE_SIZE = int(os.getenv("LLM_CLIENT_CACHE_SIZE", "32"))
+# Clients for per-user keys unused for this long are closed
+LLM_CLIENT_IDLE_SECONDS = int(os.getenv("LLM_CLIENT_IDLE_SECONDS", "900"))
+# Concurrent requests allowed through one client
+LLM_CLIENT_MAX_CONCURRENCY = int(os.getenv("LLM_CLIENT_MAX_CONCURRENCY", "16"))
+# Kept-alive HTTP connections per client
+LLM_CLIENT_KEEPALIVE = int(os.getenv("LLM_CLIENT_KEEPALIVE", "20"))
+# Per-attempt deadline for one LLM request
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# Retries after a rate limit (429), server error (5xx), timeout or dropped connection
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+# Backoff before retry n is drawn uniformly from [0, min(MAX, BASE * 2**n)]
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+
+def key_fingerprint(api_key: str) -> str:
+    """Short hash used to tell keys apart without keeping them in the registry key."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+def http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_CLIENT_KEEPALIVE * 2,
+        max_keepalive_connections=LLM_CLIENT_KEEPALIVE,
+        keepalive_expiry=60,
+    )
+
+def make_http_clients():
+    """Sync and async HTTP clients with keep-alive pools, for clients that accept them."""
+    return httpx.Client(limits=http_limits()), httpx.AsyncClient(limits=http_limits())
+
+class _Entry:
+    def __init__(self, client, pinned: bool, closers):
+        self.client = client
+        self.pinned = pinned  # Server-configured keys are never evicted
+        self.closers = closers
+        self.semaphore = threading.BoundedSemaphore(LLM_CLIENT_MAX_CONCURRENCY)
+        self.async_semaphores = weakref.WeakKeyDictionary()  # One per event loop, created on first async use
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        for close in self.closers:
+            try:
+                close()
+            except Exception as e:
+                print(f"Error closing LLM client: {e}")
+
+class LLMClientRegistry:
+    """
+    Reuses chat model clients (and their warm connection pools) across calls.
+    Entries are keyed by (provider, model, key hash); idle per-user entries are
+    evicted least recently used first.
+    """
+    def __init__(self, max_size: int = LLM_CLIENT_CACHE_SIZE, idle_seconds: int = LLM_CLIENT_IDLE_SECONDS):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()
+        self._by_client = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str, api_key: str, factory, pinned: bool = False):
+        """
+        Returns the cached client for this key. On first use factory() builds it
+        and returns (client, closers): callables releasing its resources on eviction.
+        """
+        key = (provider, model, key_fingerprint(api_key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.last_used = time.monotonic()
+                return entry.client
+
+        # Build outside the lock; constructing a client can be slow
+        client, closers = factory()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(client, pinned, list(closers))
+                self._entries[key] = entry
+                self._by_client[id(client)] = entry
+                self._evict(keep=key)
+                return client
+        # Another thread registered the same key first; discard ours
+        _Entry(client, pinned, list(closers)).close()
+        return entry.client
+
+    def _evict(self, keep=None):
+        """Drops idle, unpinned entries that are expired or beyond max_size. Caller holds the lock."""
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            over_size = len(self._entries) > self.max_size
+            expired = now - entry.last_used > self.idle_seconds
+            if key == keep or entry.pinned or entry.in_use or not (over_size or expired):
+                continue
+            del self._entries[key]
+            self._by_client.pop(id(entry.client), None)
+            entry.close()
+
+    @contextmanager
+    def slot(self, client):
+        """Holds one of the client's concurrency slots for the duration of a call."""
+        with self._lock:
+            entry = self._by_client.get(id(client))
+        if entry is None:
+            # Not a registry client (e.g. constructed elsewhere); nothing to bound
+            yield
+            return
+        with entry.semaphore:
+            with self._lock:
+                entry.in_use += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    entry.in_use -= 1
+                    entry.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def aslot(self, client):
+        """slot() for coroutines: waits on an asyncio semaphore instead of blocking the loop."""
+        with self._lock:
+            entry = self._by_client.get(id(client))
+            if entry is not None:
+                loop = asyncio.get_running_loop()
+                semaphore = entry.async_semaphores.get(loop)
+                if semaphore is None:
+                    semaphore = asyncio.Semaphore(LLM_CLIENT_MAX_CONCURRENCY)
+                    entry.async_semaphores[loop] = semaphore
+        if entry is None:
+            yield
+            return
+        async with semaphore:
+            with self._lock:
+                entry.in_use += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    entry.in_use -= 1
+                    entry.last_used = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "clients": len(self._entries),
+                "in_use": sum(entry.in_use for entry in self._entries.values()),
+                "max_size": self.max_size,
+            }
+
+registry = LLMClientRegistry()
+
+def llm_slot(client):
+    return registry.slot(client)
+
+def llm_aslot(client):
+    return registry.aslot(client)
+
+def status_code(error: Exception):
+    """HTTP status carried by a provider SDK error, if any (looks through wrapped causes)."""
+    while error is not None:
+        for value in (
+            getattr(error, "status_code", None),
+            getattr(error, "code", None),
+            getattr(getattr(error, "response", None), "status_code", None),
+        ):
+            if isinstance(value, int) and 100 <= value < 600:
+                return value
+        error = error.__cause__ or error.__context__
+    return None
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if type(error).__name__ in ("APITimeoutError", "APIConnectionError"):
+        return True
+    code = status_code(error)
+    return code is not None and (code == 429 or code >= 500)
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, so clients that failed together do not retry together."""
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def invoke_with_retry(runnable, messages, client=None):
+    """
+    Calls runnable.invoke(messages), retrying transient failures with jittered
+    backoff. `client` is the registry client whose concurrency slot to hold
+    (defaults to the runnable itself).
+    """
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            with llm_slot(client or runnable):
+                return runnable.invoke(messages)
+        except Exception as e:
+            if attempt >= LLM_MAX_RETRIES or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt)
+            print(f"LLM call failed ({e!r}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+async def ainvoke_with_retry(runnable, messages, client=None, timeout: float = None):
+    """invoke_with_retry() for coroutines; each attempt is also cut off after `timeout` seconds."""
+    timeout = timeout or LLM_TIMEOUT_SECONDS
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with llm_aslot(client or runnable):
+                return await asyncio.wait_for(runnable.ainvoke(messages), timeout=timeout)
+        except Exception as e:
+            if attempt >= LLM_MAX_RETRIES or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt)
+            print(f"LLM call failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
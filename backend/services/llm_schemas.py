@@ -0,0 +1,107 @@
+import re
+from typing import Annotated, Any, List, Literal, Optional
+from pydantic import BaseModel, Field, BeforeValidator
+
+VERDICTS = ["Highly Relevant", "Relevant", "Borderline", "Not Relevant"]
+
+# Models answer in many near-miss shapes (numbers for strings, a string for a
+# list, "5+ years" for a number). The validators below coerce those instead of
+# rejecting the whole document; anything still invalid fails validation.
+
+def _to_text(value: Any):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value if item is not None)
+    return value
+
+def _to_list(value: Any):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    if isinstance(value, list):
+        return [str(item) for item in value if item not in (None, "")]
+    return value
+
+def _to_years(value: Any):
+    if isinstance(value, str):
+        match = re.search(r"\d+(?:\.\d+)?", value)
+        return float(match.group()) if match else None
+    return value
+
+def years_value(value: Any) -> Optional[float]:
+    """_to_years() for storage: the number of years, or None when there is none."""
+    value = _to_years(value)
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _to_verdict(value: Any):
+    if isinstance(value, str):
+        normalized = " ".join(value.split()).lower()
+        for verdict in VERDICTS:
+            if verdict.lower() == normalized:
+                return verdict
+    return value
+
+Text = Annotated[Optional[str], BeforeValidator(_to_text)]
+TextList = Annotated[List[str], BeforeValidator(_to_list)]
+Years = Annotated[Optional[float], BeforeValidator(_to_years)]
+
+class Skills(BaseModel):
+    technical: TextList = []
+    domain: TextList = []
+    tools: TextList = []
+    soft_skills: TextList = []
+
+class Education(BaseModel):
+    degree: Text = None
+    institution: Text = None
+    year: Text = None
+
+def _to_skills(value: Any):
+    # A flat skill list is treated as technical skills
+    if isinstance(value, (list, str)):
+        return {"technical": value}
+    return {} if value is None else value
+
+def _to_education(value: Any):
+    if value is None:
+        return []
+    if isinstance(value, (dict, str)):
+        value = [value]
+    if isinstance(value, list):
+        return [{"degree": item} if isinstance(item, str) else item for item in value]
+    return value
+
+class ParsedResume(BaseModel):
+    name: Text = None
+    email: Text = None
+    phone: Text = None
+    total_experience_years: Years = None
+    skills: Annotated[Skills, BeforeValidator(_to_skills)] = Skills()
+    job_titles: TextList = []
+    education: Annotated[List[Education], BeforeValidator(_to_education)] = []
+    summary: Text = None
+
+class ParsedJD(BaseModel):
+    role_title: Text = None
+    department: Text = None
+    required_skills: TextList = []
+    good_to_have_skills: TextList = []
+    minimum_experience_years: Years = None
+    domain: Text = None
+    location: Text = None
+    mandatory_keywords: TextList = []
+
+class CandidateScore(BaseModel):
+    score: float = Field(ge=0, le=100)
+    verdict: Annotated[Literal["Highly Relevant", "Relevant", "Borderline", "Not Relevant"], BeforeValidator(_to_verdict)]
+    missing_skills: TextList = []
+    matching_skills: TextList = []
+    red_flags: TextList = []
+    reasoning: Text = None
+
+class BatchCandidateScore(CandidateScore):
+    index: int
@@ -0,0 +1,96 @@
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy.exc import IntegrityError
+try:
+    from ..models import ParseCache
+except ImportError:
+    from models import ParseCache
+
+# Eviction limits for cached resume parses
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "10000"))
+PARSE_CACHE_MAX_AGE_DAYS = int(os.getenv("PARSE_CACHE_MAX_AGE_DAYS", "30"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Process-wide counters, reported by /parse-cache/stats
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+def _count(name: str, amount: int = 1):
+    if amount:
+        with _stats_lock:
+            _stats[name] += amount
+
+def normalize_text(text: str) -> str:
+    """Normalizes unicode and collapses whitespace so re-exports of the same CV hash alike."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+def cache_key(text: str, prompt_version: str, model: str) -> str:
+    payload = f"{prompt_version}\x00{model}\x00{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_cached_parses(db, keys: List[str]) -> Dict[str, dict]:
+    """Looks up all keys in one query and returns {key: parsed_json} for the hits."""
+    unique_keys = list(set(keys))
+    if not unique_keys:
+        return {}
+    cutoff = datetime.utcnow() - timedelta(days=PARSE_CACHE_MAX_AGE_DAYS)
+    entries = db.query(ParseCache).filter(
+        ParseCache.key.in_(unique_keys), ParseCache.created_at >= cutoff
+    ).all()
+
+    now = datetime.utcnow()
+    for entry in entries:
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = now
+    if entries:
+        db.commit()
+
+    found = {entry.key: entry.parsed_json for entry in entries}
+    _count("hits", sum(1 for key in keys if key in found))
+    _count("misses", sum(1 for key in keys if key not in found))
+    return found
+
+def store_parses(db, parses: Dict[str, dict], prompt_version: str, model: str):
+    """Caches successful parses ({key: parsed_json}) and evicts old entries. Best effort."""
+    if not parses:
+        return
+    now = datetime.utcnow()
+    try:
+        for key, parsed in parses.items():
+            # Column defaults only apply to inserts; a merge over an expired row must renew its age too
+            db.merge(ParseCache(
+                key=key, model=model, prompt_version=prompt_version, parsed_json=parsed, created_at=now, last_used_at=now,
+            ))
+        db.commit()
+        _count("stores", len(parses))
+    except IntegrityError:
+        # Another request cached the same document concurrently
+        db.rollback()
+    evict(db)
+
+def evict(db):
+    """Drops entries older than the max age, then the least recently used beyond the size limit."""
+    cutoff = datetime.utcnow() - timedelta(days=PARSE_CACHE_MAX_AGE_DAYS)
+    removed = db.query(ParseCache).filter(ParseCache.created_at < cutoff).delete(synchronize_session=False)
+
+    overflow = db.query(ParseCache).count() - PARSE_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = [row.key for row in db.query(ParseCache.key).order_by(ParseCache.last_used_at.asc()).limit(overflow)]
+        removed += db.query(ParseCache).filter(ParseCache.key.in_(oldest)).delete(synchronize_session=False)
+    db.commit()
+    _count("evictions", removed)
+
+def get_stats(db) -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["entries"] = db.query(ParseCache).count()
+    return stats
@@ -1,23 +1,43 @@
 import io
-from pdfminer.high_level import extract_text as extract_text_pdf
+import re
+import time
+from datetime import date
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTTextContainer
 import docx
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract text from PDF bytes."""
+def open_source(source):
+    """Opens raw bytes or a file path as a binary file object."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return open(source, "rb")
+
+def extract_text_from_pdf(source, max_pages: int = 0, timeout: float = None) -> str:
+    """
+    Extract text from PDF bytes or a file path, page by page.
+    Stops after max_pages (0 = all) or once timeout seconds have passed,
+    returning the text of the pages read so far.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    pages = []
     try:
         # pdfminer.six expects a file-like object or path
-        # We can use io.BytesIO
-        with io.BytesIO(file_bytes) as f:
-            text = extract_text_pdf(f)
-        return text
+        with open_source(source) as f:
+            for page in extract_pages(f, maxpages=max_pages):
+                pages.append("".join(
+                    element.get_text() for element in page if isinstance(element, LTTextContainer)
+                ))
+                if deadline and time.monotonic() > deadline:
+                    print(f"PDF extraction timed out after {len(pages)} pages, returning partial text")
+                    break
     except Exception as e:
         print(f"Error extracting PDF: {e}")
-        return ""
+    return "\f".join(pages)
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extract text from DOCX bytes."""
+def extract_text_from_docx(source) -> str:
+    """Extract text from DOCX bytes or a file path."""
     try:
-        with io.BytesIO(file_bytes) as f:
+        with open_source(source) as f:
             doc = docx.Document(f)
             text = "\n".join([para.text for para in doc.paragraphs])
         return text
@@ -25,14 +45,160 @@ def extract_text_from_docx(file_bytes: bytes) -> str:
         print(f"Error extracting DOCX: {e}")
         return ""
 
-def extract_text(filename: str, file_bytes: bytes) -> str:
-    """Main entry point for text extraction based on file extension."""
+def extract_text(filename: str, source, max_pages: int = 0, timeout: float = None) -> str:
+    """
+    Main entry point for text extraction based on file extension.
+    `source` is either the file bytes or a path to the file on disk.
+    """
     filename = filename.lower()
     if filename.endswith('.pdf'):
-        return extract_text_from_pdf(file_bytes)
+        return extract_text_from_pdf(source, max_pages=max_pages, timeout=timeout)
     elif filename.endswith('.docx'):
-        return extract_text_from_docx(file_bytes)
+        return extract_text_from_docx(source)
     elif filename.endswith('.txt'):
-        return file_bytes.decode('utf-8', errors='ignore')
+        with open_source(source) as f:
+            return f.read().decode('utf-8', errors='ignore')
     else:
         return ""
+
+# --- Rule-based field extraction ---
+# Contact details and experience dates are found with regexes, so the LLM
+# only has to handle the fields that need understanding.
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s,;()<>]+"
+    r"|(?:linkedin\.com|github\.com|gitlab\.com|behance\.net|dribbble\.com|medium\.com|stackoverflow\.com)/[^\s,;()<>]+",
+    re.IGNORECASE,
+)
+# Digit runs with common separators on one line; _is_phone() checks the digit count
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d \t().-]{7,18}\d(?![\w/])")
+# Labels of identity, account and document numbers, which are as long as phone numbers
+ID_LABEL_RE = re.compile(
+    r"(?:\b(?:id|passport|account|acct|a/c|aadhaa?r|ssn|pan|isbn|order|invoice|ref|reference|roll|"
+    r"registration|reg|licen[cs]e|policy|serial)\b(?:\W{0,2}(?:no|num|number)\b)?|#)\W{0,3}$",
+    re.IGNORECASE,
+)
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*'?\d{{2,4}}|\d{{1,2}}\s*[/.-]\s*\d{{4}}|\d{{4}})"
+_PRESENT = r"(?:present|current|now|till\s+date|to\s+date|ongoing|today)"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|till|until)\s*(?P<end>{_DATE}|{_PRESENT})",
+    re.IGNORECASE,
+)
+# Lines with these words describe study, not work
+_EDUCATION_RE = re.compile(
+    r"\b(?:university|college|school|institute|academy|bachelor|master|b\.?\s?(?:sc|tech|e|a)|m\.?\s?(?:sc|tech|s|a|ba)|ph\.?d|degree|diploma|gpa|cgpa)\b",
+    re.IGNORECASE,
+)
+
+def _parse_month(value: str, today: date):
+    """Months since year 0 for a date such as "Jan 2019", "03/2019", "2019" or "present"."""
+    value = value.strip().lower()
+    if re.fullmatch(_PRESENT, value):
+        return today.year * 12 + today.month - 1
+    match = re.fullmatch(rf"({_MONTH})\s*'?(\d{{2,4}})", value)
+    if match:
+        year = int(match.group(2))
+        year = year + 2000 if year < 100 and year + 2000 <= today.year else (year + 1900 if year < 100 else year)
+        return year * 12 + _MONTHS[match.group(1)[:3]] - 1
+    match = re.fullmatch(r"(\d{1,2})\s*[/.-]\s*(\d{4})", value)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return int(match.group(2)) * 12 + int(match.group(1)) - 1
+    if re.fullmatch(r"\d{4}", value):
+        return int(value) * 12
+    return None
+
+def experience_years(text: str, today: date = None):
+    """
+    Total years of work experience from date ranges in the text, with
+    overlapping roles counted once. Ranges on education lines are ignored.
+    Returns None if no usable range is found.
+    """
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+    spans = []
+    for line in text.splitlines():
+        if _EDUCATION_RE.search(line):
+            continue
+        for match in DATE_RANGE_RE.finditer(line):
+            start, end = _parse_month(match.group("start"), today), _parse_month(match.group("end"), today)
+            if start is None or end is None or start > end or start < 1950 * 12:
+                continue
+            # A year-only end date covers that whole year
+            if re.fullmatch(r"\d{4}", match.group("end").strip()):
+                end += 11
+            spans.append((start, min(end, now) + 1))
+    if not spans:
+        return None
+
+    months, current_start, current_end = 0, None, None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    months += current_end - current_start
+    return round(months / 12, 1)
+
+def _is_phone(candidate: str) -> bool:
+    digits = re.sub(r"\D", "", candidate)
+    # Date ranges ("2015 - 2019") and runs of years look like numbers too
+    return (
+        9 <= len(digits) <= 15
+        and not DATE_RANGE_RE.fullmatch(candidate.strip())
+        and not re.fullmatch(r"(?:(?:19|20)\d\d[\s.-]*)+", candidate.strip())
+    )
+
+def _is_phone_match(match) -> bool:
+    """_is_phone() for a PHONE_RE match that is not labelled as an ID number on its line."""
+    line_start = match.string.rfind("\n", 0, match.start()) + 1
+    return _is_phone(match.group()) and not ID_LABEL_RE.search(match.string[line_start:match.start()])
+
+def _phones(text: str) -> list:
+    phones = []
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group().strip()
+        if _is_phone_match(match) and candidate not in phones:
+            phones.append(candidate)
+    return phones
+
+def guess_name(text: str):
+    """First line that looks like a person's name (2-4 capitalised words), used when no LLM is available."""
+    for line in text.splitlines()[:10]:
+        line = line.strip()
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(re.fullmatch(r"[A-Z][a-zA-Z.'-]*", word) for word in words):
+            return line
+    return None
+
+def extract_local_fields(text: str) -> dict:
+    """
+    Fields found without the LLM: email, phone, links and
+    total_experience_years (None where nothing was found).
+    """
+    emails = list(dict.fromkeys(EMAIL_RE.findall(text)))
+    links = list(dict.fromkeys(
+        url.rstrip(".") for url in URL_RE.findall(text) if not EMAIL_RE.search(url)
+    ))
+    phones = _phones(EMAIL_RE.sub(" ", URL_RE.sub(" ", text)))
+    return {
+        "email": emails[0] if emails else None,
+        "phone": phones[0] if phones else None,
+        "links": links,
+        "total_experience_years": experience_years(text),
+    }
+
+def strip_contact_details(text: str) -> str:
+    """Removes emails, links and phone numbers, which the LLM no longer needs to see."""
+    text = EMAIL_RE.sub("", URL_RE.sub("", text))
+    text = PHONE_RE.sub(lambda match: "" if _is_phone_match(match) else match.group(), text)
+    # Drop separator debris such as " |  | " left on contact lines
+    return re.sub(r"^[\s|,;•·/-]+$", "", text, flags=re.MULTILINE)
@@ -0,0 +1,230 @@
+import re
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+# Weights of the local pre-score components (sum to 1)
+REQUIRED_SKILLS_WEIGHT = 0.45
+GOOD_TO_HAVE_WEIGHT = 0.10
+EXPERIENCE_WEIGHT = 0.25
+MANDATORY_WEIGHT = 0.20
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9+#]")
+
+def normalize_term(term) -> str:
+    """Lowercases and drops punctuation/spaces so "React.js" and "react js" compare equal."""
+    return _NON_ALNUM_RE.sub("", str(term).lower())
+
+def raw_skills(parsed_json: dict) -> List[str]:
+    """Flattens the parsed skills (dict of lists or a plain list) as written by the parser."""
+    skills = (parsed_json or {}).get("skills") or []
+    if isinstance(skills, dict):
+        skills = [s for group in skills.values() if isinstance(group, list) for s in group]
+    elif not isinstance(skills, list):
+        skills = [skills]
+    return [str(s) for s in skills if s]
+
+def candidate_skills(parsed_json: dict) -> set:
+    """The parsed skills as a set of normalized terms."""
+    return {normalize_term(s) for s in raw_skills(parsed_json) if normalize_term(s)}
+
+def candidate_text(parsed_json: dict) -> str:
+    """Skills, titles and summary as one normalized string, used for keyword hits."""
+    parsed_json = parsed_json or {}
+    parts = sorted(candidate_skills(parsed_json))
+    parts += [normalize_term(t) for t in parsed_json.get("job_titles") or []]
+    parts.append(normalize_term(parsed_json.get("summary") or ""))
+    return " ".join(parts)
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def term_list(values) -> List[str]:
+    """Normalized, de-duplicated terms from a JD list field (or a single value)."""
+    if not isinstance(values, list):
+        values = [values] if values else []
+    return list(dict.fromkeys(t for t in (normalize_term(v) for v in values) if t))
+
+def _membership(term_sets: List[set], terms: list) -> np.ndarray:
+    """Boolean matrix (candidates x terms): candidate i has term j."""
+    matrix = np.zeros((len(term_sets), len(terms)), dtype=bool)
+    index = {term: j for j, term in enumerate(terms)}
+    for i, term_set in enumerate(term_sets):
+        hits = [index[t] for t in term_set if t in index]
+        matrix[i, hits] = True
+    return matrix
+
+def prescore_candidates(
+    resume_jsons: List[dict],
+    jd_json: dict,
+    resume_skill_ids: Optional[List[Optional[list]]] = None,
+    jd_skill_ids: Optional[dict] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Scores all candidates against a JD at once, without any LLM call.
+    Returns arrays aligned with resume_jsons: required_overlap, good_to_have_overlap,
+    experience_fit and mandatory_hits (all 0-1) and score (0-100).
+
+    When canonical skill ids are given for the JD and every resume, skill
+    overlap is computed on the ids (aliases and misspellings already merged)
+    instead of on normalized strings.
+    """
+    jd_json = jd_json or {}
+    n = len(resume_jsons)
+    mandatory = term_list(jd_json.get("mandatory_keywords"))
+    if jd_skill_ids and resume_skill_ids is not None and all(ids is not None for ids in resume_skill_ids):
+        required = list(dict.fromkeys(jd_skill_ids.get("required") or []))
+        good_to_have = list(dict.fromkeys(jd_skill_ids.get("good_to_have") or []))
+        skill_sets = [set(ids) for ids in resume_skill_ids]
+    else:
+        required = term_list(jd_json.get("required_skills"))
+        good_to_have = term_list(jd_json.get("good_to_have_skills"))
+        skill_sets = [candidate_skills(r) for r in resume_jsons]
+
+    def overlap(terms: list) -> np.ndarray:
+        if not terms:
+            return np.ones(n)
+        return _membership(skill_sets, terms).mean(axis=1)
+
+    required_overlap = overlap(required)
+    good_to_have_overlap = overlap(good_to_have)
+
+    # Mandatory keywords may appear anywhere in skills, titles or summary
+    if mandatory:
+        texts = np.array([candidate_text(r) for r in resume_jsons] or [""], dtype=str)[:n]
+        hits = np.char.find(texts[:, None], np.array(mandatory, dtype=str)[None, :]) >= 0
+        mandatory_hits = hits.mean(axis=1)
+    else:
+        mandatory_hits = np.ones(n)
+
+    years = np.array([_to_float((r or {}).get("total_experience_years")) for r in resume_jsons])
+    min_years = _to_float(jd_json.get("minimum_experience_years"))
+    experience_fit = np.clip(years / min_years, 0.0, 1.0) if min_years > 0 else np.ones(n)
+
+    score = 100.0 * (
+        REQUIRED_SKILLS_WEIGHT * required_overlap
+        + GOOD_TO_HAVE_WEIGHT * good_to_have_overlap
+        + EXPERIENCE_WEIGHT * experience_fit
+        + MANDATORY_WEIGHT * mandatory_hits
+    )
+    return {
+        "required_overlap": required_overlap,
+        "good_to_have_overlap": good_to_have_overlap,
+        "experience_fit": experience_fit,
+        "mandatory_hits": mandatory_hits,
+        "score": np.round(score, 1),
+    }
+
+def prescore_matrix(
+    resume_jsons: List[dict],
+    jd_jsons: List[dict],
+    resume_skill_ids: Optional[List[Optional[list]]] = None,
+    jd_skill_ids: Optional[List[Optional[dict]]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    prescore_candidates() for every (resume, JD) pair in one pass. Returns
+    (resumes x JDs) arrays of the same components; column j equals the
+    result of prescore_candidates() for jd_jsons[j].
+
+    Terms of all JDs share one membership matrix, so each component is a
+    single matrix product instead of one scan of the pool per JD.
+    """
+    n, m = len(resume_jsons), len(jd_jsons)
+    jd_jsons = [jd_json or {} for jd_json in jd_jsons]
+    jd_skill_ids = jd_skill_ids or [None] * m
+    use_ids = resume_skill_ids is not None and all(ids is not None for ids in resume_skill_ids)
+
+    # Per JD, its skills as ("id", skill id) or ("term", normalized string) keys
+    required, good_to_have = [], []
+    for jd_json, ids in zip(jd_jsons, jd_skill_ids):
+        if ids and use_ids:
+            required.append([("id", t) for t in dict.fromkeys(ids.get("required") or [])])
+            good_to_have.append([("id", t) for t in dict.fromkeys(ids.get("good_to_have") or [])])
+        else:
+            required.append([("term", t) for t in term_list(jd_json.get("required_skills"))])
+            good_to_have.append([("term", t) for t in term_list(jd_json.get("good_to_have_skills"))])
+    universe = list(dict.fromkeys(key for keys in required + good_to_have for key in keys))
+    needs_terms = any(kind == "term" for kind, _ in universe)
+    skill_sets = []
+    for i, resume_json in enumerate(resume_jsons):
+        keys = {("id", t) for t in (resume_skill_ids[i] or [])} if use_ids else set()
+        if needs_terms:
+            keys |= {("term", t) for t in candidate_skills(resume_json)}
+        skill_sets.append(keys)
+    membership = _membership(skill_sets, universe).astype(float)
+
+    def fraction(hits: np.ndarray, term_lists: List[list], index: dict) -> np.ndarray:
+        """Share of each JD's terms the candidate has (1 when the JD lists none)."""
+        indicator = np.zeros((len(index), m))
+        for j, terms in enumerate(term_lists):
+            indicator[[index[t] for t in terms], j] = 1.0
+        counts = indicator.sum(axis=0)
+        return np.where(counts > 0, (hits @ indicator) / np.maximum(counts, 1), 1.0)
+
+    skill_index = {key: u for u, key in enumerate(universe)}
+    required_overlap = fraction(membership, required, skill_index)
+    good_to_have_overlap = fraction(membership, good_to_have, skill_index)
+
+    # Mandatory keywords may appear anywhere in skills, titles or summary
+    mandatory = [term_list(jd_json.get("mandatory_keywords")) for jd_json in jd_jsons]
+    keywords = list(dict.fromkeys(t for terms in mandatory for t in terms))
+    if keywords and n:
+        texts = np.array([candidate_text(r) for r in resume_jsons], dtype=str)
+        keyword_hits = (np.char.find(texts[:, None], np.array(keywords, dtype=str)[None, :]) >= 0).astype(float)
+    else:
+        keyword_hits = np.zeros((n, len(keywords)))
+    mandatory_hits = fraction(keyword_hits, mandatory, {t: k for k, t in enumerate(keywords)})
+
+    years = np.array([_to_float((r or {}).get("total_experience_years")) for r in resume_jsons]).reshape(n, 1)
+    min_years = np.array([_to_float(jd_json.get("minimum_experience_years")) for jd_json in jd_jsons]).reshape(1, m)
+    ratio = np.divide(years, min_years, out=np.ones((n, m)), where=min_years > 0)
+    experience_fit = np.where(min_years > 0, np.clip(ratio, 0.0, 1.0), 1.0)
+
+    score = 100.0 * (
+        REQUIRED_SKILLS_WEIGHT * required_overlap
+        + GOOD_TO_HAVE_WEIGHT * good_to_have_overlap
+        + EXPERIENCE_WEIGHT * experience_fit
+        + MANDATORY_WEIGHT * mandatory_hits
+    )
+    return {
+        "required_overlap": required_overlap,
+        "good_to_have_overlap": good_to_have_overlap,
+        "experience_fit": experience_fit,
+        "mandatory_hits": mandatory_hits,
+        "score": np.round(score, 1),
+    }
+
+def shortlist_mask(scores: np.ndarray, top_k: Optional[int] = None, min_score: Optional[float] = None) -> np.ndarray:
+    """Boolean mask of candidates worth sending to the LLM: the top_k scores and/or those >= min_score."""
+    mask = np.ones(len(scores), dtype=bool)
+    if min_score is not None:
+        mask &= scores >= min_score
+    if top_k is not None and top_k < mask.sum():
+        # Highest scores among those still in; stable so ties keep upload order
+        candidates = np.flatnonzero(mask)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        mask = np.zeros(len(scores), dtype=bool)
+        mask[order[:max(top_k, 0)]] = True
+    return mask
+
+def top_roles_mask(scores: np.ndarray, top_roles: Optional[int] = None, min_score: Optional[float] = None) -> np.ndarray:
+    """
+    Boolean (resumes x JDs) mask of the pairs worth sending to the LLM: each
+    resume's top_roles JDs by pre-score and/or the pairs >= min_score.
+    """
+    mask = np.ones(scores.shape, dtype=bool)
+    if min_score is not None:
+        mask &= scores >= min_score
+    if top_roles is not None and top_roles < scores.shape[1]:
+        # Best JDs per resume among those still in; stable so ties keep JD order
+        order = np.argsort(-np.where(mask, scores, -np.inf), axis=1, kind="stable")[:, :max(top_roles, 0)]
+        best = np.zeros(scores.shape, dtype=bool)
+        np.put_along_axis(best, order, True, axis=1)
+        mask &= best
+    return mask
+
+def prescore_summary(components: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+    """The pre-score components of candidate i as plain JSON-friendly values."""
+    return {key: round(float(values[i]), 3) for key, values in components.items()}
@@ -0,0 +1,54 @@
+import os
+import time
+import asyncio
+import threading
+
+# Requests per minute allowed per provider. Override with e.g. OPENAI_RPM=3000.
+DEFAULT_RPM = {
+    "openai": 500,
+    "gemini": 60,
+}
+
+class RateLimiter:
+    """
+    Spaces out calls so that no more than `rate_per_minute` start in any minute.
+    Thread-safe; callers block in acquire() (or await acquire_async()) until their slot comes up.
+    """
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute and rate_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _reserve(self) -> float:
+        """Claims the next free slot and returns how long to wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Returns the shared limiter for a provider ("openai", "gemini", ...)."""
+    provider = (provider or "default").lower()
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rpm = float(os.getenv(f"{provider.upper()}_RPM", DEFAULT_RPM.get(provider, 0)))
+            limiter = RateLimiter(rpm)
+            _limiters[provider] = limiter
+        return limiter
@@ -0,0 +1,103 @@
+import os
+import time
+from datetime import datetime
+from typing import List, Dict, Any
+try:
+    from ..models import Resume, ResumeMatch, ScoringJob, ScoringJobItem
+except ImportError:
+    from models import Resume, ResumeMatch, ScoringJob, ScoringJobItem
+
+# Scoring results buffered before they are written (one executemany per table, then a commit)
+SCORING_WRITE_BATCH_SIZE = int(os.getenv("SCORING_WRITE_BATCH_SIZE", "200"))
+# Buffered results are also written once the oldest is this old, so progress stays visible
+SCORING_WRITE_INTERVAL_SECONDS = float(os.getenv("SCORING_WRITE_INTERVAL_SECONDS", "2"))
+
+class JobSuperseded(Exception):
+    """Another worker claimed the job (this one was taken for dead); stop without writing."""
+
+def score_value(score_json: dict) -> float:
+    """The numeric score stored in Resume.score for ranking."""
+    try:
+        return float((score_json or {}).get("score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+class ScoreResultsWriter:
+    """
+    Buffers the results of a scoring job and writes them in batches: the
+    resume rows (or, for matrix jobs, resume_matches rows), and job items with
+    one executemany UPDATE each, the job's
+    counters and heartbeat with one UPDATE, then a commit. Nothing is loaded
+    into the session's identity map, so memory stays flat however large the
+    job, and every commit leaves the job resumable from where it stopped.
+    """
+    def __init__(self, db, job_id: int, batch_size: int = None, interval: float = None, worker_token: str = None):
+        self.db = db
+        self.job_id = job_id
+        self.worker_token = worker_token
+        self.batch_size = max(1, batch_size or SCORING_WRITE_BATCH_SIZE)
+        self.interval = SCORING_WRITE_INTERVAL_SECONDS if interval is None else interval
+        self._resumes: List[Dict[str, Any]] = []
+        self._matches: List[Dict[str, Any]] = []
+        self._items: List[Dict[str, Any]] = []
+        self._done = 0
+        self._failed = 0
+        self._oldest = None
+        self.flushes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def add_result(self, item_id: int, resume_id: int, score_json: dict, jd_id: int = None):
+        """Stores the score on the resume, or on its match with jd_id when given (matrix jobs)."""
+        result = {"score_json": score_json, "score": score_value(score_json), "verdict": score_json.get("verdict", "Unknown")}
+        if jd_id is None:
+            self._resumes.append({"id": resume_id, **result})
+        else:
+            self._matches.append({
+                "resume_id": resume_id, "job_description_id": jd_id, **result,
+                "status": "scored", "updated_at": datetime.utcnow(),
+            })
+        self._add_item({"id": item_id, "status": "done", "error": None})
+        self._done += 1
+
+    def add_failure(self, item_id: int, error: str):
+        self._add_item({"id": item_id, "status": "failed", "error": error})
+        self._failed += 1
+
+    def _add_item(self, mapping: dict):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        self._items.append(mapping)
+        if len(self._items) >= self.batch_size or time.monotonic() - self._oldest >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes and commits everything buffered; also refreshes the job's heartbeat.
+        With a worker_token, raises JobSuperseded (writing nothing) once the job
+        has been claimed by another worker.
+        """
+        job = self.db.query(ScoringJob).filter(ScoringJob.id == self.job_id)
+        if self.worker_token is not None:
+            job = job.filter(ScoringJob.worker_token == self.worker_token)
+        # The job row goes first: it is the row another worker's claim would have changed
+        claimed = job.update({
+            ScoringJob.done: ScoringJob.done + self._done,
+            ScoringJob.failed: ScoringJob.failed + self._failed,
+            ScoringJob.heartbeat_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        if self.worker_token is not None and not claimed:
+            self.db.rollback()
+            raise JobSuperseded(f"Scoring job {self.job_id} was claimed by another worker")
+        if self._resumes:
+            self.db.bulk_update_mappings(Resume, self._resumes)
+        if self._matches:
+            self.db.bulk_update_mappings(ResumeMatch, self._matches)
+        if self._items:
+            self.db.bulk_update_mappings(ScoringJobItem, self._items)
+        self.db.commit()
+        self._resumes, self._matches, self._items = [], [], []
+        self._done = self._failed = 0
+        self._oldest = None
+        self.flushes += 1
@@ -0,0 +1,501 @@
+import os
+import json
+import uuid
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional
+from sqlalchemy import or_, and_
+try:
+    from ..database import SessionLocal
+    from ..models import Resume, JobDescription, ScoringJob, ScoringJobItem, ResumeMatch
+except ImportError:
+    from database import SessionLocal
+    from models import Resume, JobDescription, ScoringJob, ScoringJobItem, ResumeMatch
+from .ai_service import (
+    score_candidate_with_ai, score_candidates_batch_with_ai, get_provider, get_model_name,
+    compact_json, compact_profile, estimate_tokens, SCORING_PROMPT_VERSION,
+)
+from .rate_limiter import get_rate_limiter
+from .prescorer import prescore_candidates, shortlist_mask, prescore_summary, prescore_matrix, top_roles_mask
+from .results_writer import ScoreResultsWriter, JobSuperseded, score_value
+
+# Number of scoring jobs that can run at the same time in this process
+SCORING_JOB_WORKERS = int(os.getenv("SCORING_JOB_WORKERS", "2"))
+# Number of candidates scored concurrently within one job
+SCORING_CONCURRENCY = int(os.getenv("SCORING_CONCURRENCY", "8"))
+# Candidates packed into one AI scoring call (1 disables batching)
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "5"))
+# Approximate prompt tokens allowed for candidate profiles in one batch
+SCORING_BATCH_TOKEN_BUDGET = int(os.getenv("SCORING_BATCH_TOKEN_BUDGET", "12000"))
+# A running job with no heartbeat for this long is treated as orphaned (crashed worker)
+SCORING_JOB_STALE_SECONDS = int(os.getenv("SCORING_JOB_STALE_SECONDS", "300"))
+# How often a worker refreshes its job's heartbeat, whether or not any item has finished
+SCORING_JOB_HEARTBEAT_SECONDS = float(os.getenv("SCORING_JOB_HEARTBEAT_SECONDS", "30"))
+# Roles per candidate sent to the LLM by matrix scoring, best pre-scores first
+MATRIX_TOP_ROLES = int(os.getenv("MATRIX_TOP_ROLES", "3"))
+
+_job_pool = None
+_job_pool_lock = threading.Lock()
+
+def get_job_pool() -> ThreadPoolExecutor:
+    global _job_pool
+    with _job_pool_lock:
+        if _job_pool is None:
+            _job_pool = ThreadPoolExecutor(max_workers=SCORING_JOB_WORKERS, thread_name_prefix="scoring-job")
+        return _job_pool
+
+def json_hash(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def scoring_fingerprint(resume_json: dict, jd_json: dict, model: str) -> str:
+    """Identifies the inputs a score was computed from; a changed fingerprint means the score is stale."""
+    return pair_fingerprint(json_hash(resume_json), json_hash(jd_json), model)
+
+def pair_fingerprint(resume_hash: str, jd_hash: str, model: str) -> str:
+    """scoring_fingerprint() from precomputed json_hash() values, for scoring many pairs."""
+    payload = f"{resume_hash}:{jd_hash}:{SCORING_PROMPT_VERSION}:{model or ''}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def backfill_resume_scores(session_factory=None, chunk_size: int = 500):
+    """Fills Resume.score from score_json for rows scored before the column existed."""
+    db = (session_factory or SessionLocal)()
+    try:
+        last_id = 0
+        while True:
+            rows = db.query(Resume.id, Resume.score_json).filter(Resume.id > last_id).order_by(Resume.id).limit(chunk_size).all()
+            if not rows:
+                break
+            db.bulk_update_mappings(Resume, [{"id": row.id, "score": score_value(row.score_json)} for row in rows])
+            db.commit()
+            last_id = rows[-1].id
+    finally:
+        db.close()
+
+def make_batches(profiles: List[dict], batch_size: int, token_budget: int) -> List[List[int]]:
+    """
+    Groups profile indexes into batches of at most batch_size whose combined
+    estimated tokens stay within token_budget. An oversized profile gets its own batch.
+    """
+    batches, current, current_tokens = [], [], 0
+    for i, profile in enumerate(profiles):
+        tokens = estimate_tokens(compact_json(compact_profile(profile)))
+        if current and (len(current) >= batch_size or current_tokens + tokens > token_budget):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def create_scoring_job(
+    db,
+    jd: JobDescription,
+    api_key: str = None,
+    force: bool = False,
+    top_k: Optional[int] = None,
+    min_prescore: Optional[float] = None,
+) -> ScoringJob:
+    """
+    Creates a queued job with one item per parsed resume of the JD whose score
+    is missing or stale. With force=True every parsed resume is rescored.
+
+    If top_k or min_prescore is given, all candidates are first pre-scored
+    locally and only the shortlist goes to the LLM; the rest are stored with
+    their pre-score and verdict "Screened Out".
+    """
+    model = get_model_name(api_key)
+    rows = db.query(Resume.id, Resume.parsed_json, Resume.score_json, Resume.skill_ids).filter(
+        Resume.job_description_id == jd.id, Resume.parsed_json.isnot(None)
+    ).order_by(Resume.id).all()
+    # Resumes whose parse failed have nothing to score
+    rows = [row for row in rows if row.parsed_json]
+
+    stale = [
+        force or (row.score_json or {}).get("fingerprint") != scoring_fingerprint(row.parsed_json, jd.parsed_json, model)
+        for row in rows
+    ]
+
+    screened_out = []
+    if rows and (top_k is not None or min_prescore is not None):
+        components = prescore_candidates(
+            [row.parsed_json for row in rows], jd.parsed_json,
+            resume_skill_ids=[row.skill_ids for row in rows], jd_skill_ids=jd.skill_ids,
+        )
+        shortlist = shortlist_mask(components["score"], top_k=top_k, min_score=min_prescore)
+        for i, row in enumerate(rows):
+            if stale[i] and not shortlist[i]:
+                prescore = prescore_summary(components, i)
+                screened_out.append({
+                    "id": row.id,
+                    "score_json": {
+                        # Pre-scores are not on the AI scale; keep these below AI-scored candidates
+                        "score": 0,
+                        "verdict": "Screened Out",
+                        "prescore": prescore,
+                        "reasoning": "Not shortlisted by the local pre-screen; not scored by AI.",
+                    },
+                    "score": 0,
+                    "verdict": "Screened Out",
+                })
+                stale[i] = False
+        if screened_out:
+            db.bulk_update_mappings(Resume, screened_out)
+
+    resume_ids = [row.id for row, is_stale_row in zip(rows, stale) if is_stale_row]
+    job = ScoringJob(
+        job_description_id=jd.id,
+        status="queued",
+        total=len(resume_ids),
+        skipped=len(rows) - len(resume_ids) - len(screened_out),
+        screened_out=len(screened_out),
+    )
+    db.add(job)
+    db.flush()
+    db.add_all([ScoringJobItem(job_id=job.id, resume_id=resume_id) for resume_id in resume_ids])
+    db.commit()
+    db.refresh(job)
+    return job
+
+def create_matrix_job(
+    db,
+    jds: List[JobDescription],
+    api_key: str = None,
+    force: bool = False,
+    top_roles: Optional[int] = None,
+    min_prescore: Optional[float] = None,
+    resume_ids: Optional[List[int]] = None,
+) -> ScoringJob:
+    """
+    Creates a queued matrix job that matches the resume pool (every parsed
+    resume, or resume_ids) against all given JDs at once. Every (resume, JD)
+    pair is pre-scored locally in one vectorized pass and stored in
+    resume_matches; only each resume's top_roles (MATRIX_TOP_ROLES) pairs,
+    and/or those with pre-score >= min_prescore, get a job item for the LLM.
+
+    Pairs whose match already holds a current score are skipped unless
+    force=True, as are pairs of a resume and its own JD whose current score
+    can be copied from the resume.
+    """
+    model = get_model_name(api_key)
+    top_roles = MATRIX_TOP_ROLES if top_roles is None and min_prescore is None else top_roles
+    jds = [jd for jd in jds if jd.parsed_json]
+    query = db.query(
+        Resume.id, Resume.job_description_id, Resume.parsed_json, Resume.score_json, Resume.skill_ids
+    ).filter(Resume.parsed_json.isnot(None))
+    if resume_ids is not None:
+        query = query.filter(Resume.id.in_(resume_ids))
+    rows = [row for row in query.order_by(Resume.id).all() if row.parsed_json]
+
+    job = ScoringJob(job_description_id=None, mode="matrix", status="queued")
+    db.add(job)
+    db.flush()
+    if not rows or not jds:
+        db.commit()
+        db.refresh(job)
+        return job
+
+    components = prescore_matrix(
+        [row.parsed_json for row in rows], [jd.parsed_json for jd in jds],
+        resume_skill_ids=[row.skill_ids for row in rows], jd_skill_ids=[jd.skill_ids for jd in jds],
+    )
+    scores = components["score"]
+    shortlist = top_roles_mask(scores, top_roles=top_roles, min_score=min_prescore)
+
+    jd_ids = [jd.id for jd in jds]
+    existing = {
+        (match.resume_id, match.job_description_id): match
+        for match in db.query(
+            ResumeMatch.resume_id, ResumeMatch.job_description_id, ResumeMatch.status, ResumeMatch.prescore,
+            ResumeMatch.score_json["fingerprint"].as_string().label("fingerprint"),
+        ).filter(ResumeMatch.job_description_id.in_(jd_ids))
+    }
+    jd_hashes = [json_hash(jd.parsed_json) for jd in jds]
+
+    inserts, updates, items = [], [], []
+    skipped = 0
+    now = datetime.utcnow()
+    for i, row in enumerate(rows):
+        resume_hash = json_hash(row.parsed_json) if shortlist[i].any() else None
+        for j, jd_id in enumerate(jd_ids):
+            match = existing.get((row.id, jd_id))
+            mapping = {"resume_id": row.id, "job_description_id": jd_id, "prescore": float(scores[i, j]), "updated_at": now}
+            if shortlist[i, j]:
+                fingerprint = pair_fingerprint(resume_hash, jd_hashes[j], model)
+                own_score = row.score_json or {}
+                if not force and match is not None and match.status == "scored" and match.fingerprint == fingerprint:
+                    skipped += 1
+                elif not force and row.job_description_id == jd_id and own_score.get("fingerprint") == fingerprint:
+                    # Already scored against this JD by /score; copy instead of asking again
+                    mapping.update(score_json=own_score, score=score_value(own_score),
+                                   verdict=own_score.get("verdict", "Unknown"), status="scored")
+                    skipped += 1
+                else:
+                    mapping["status"] = "pending"
+                    items.append({"job_id": job.id, "resume_id": row.id, "job_description_id": jd_id})
+            elif match is None or match.status != "scored":
+                mapping["status"] = "screened_out"
+            if match is None:
+                inserts.append(mapping)
+            elif ("score_json" in mapping or match.prescore != mapping["prescore"]
+                  or mapping.get("status", match.status) != match.status):
+                updates.append(mapping)
+
+    db.bulk_insert_mappings(ResumeMatch, inserts)
+    db.bulk_update_mappings(ResumeMatch, updates)
+    db.bulk_insert_mappings(ScoringJobItem, items)
+    job.total = len(items)
+    job.skipped = skipped
+    job.screened_out = int(scores.size - shortlist.sum())
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_job_progress(job: ScoringJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "jd_id": job.job_description_id,
+        "mode": job.mode or "jd",
+        "status": job.status,
+        "total": job.total,
+        "done": job.done,
+        "failed": job.failed,
+        "skipped": job.skipped,
+        "screened_out": job.screened_out,
+        "remaining": max(job.total - job.done - job.failed, 0),
+        "error": job.error,
+        "created_at": job.created_at,
+        "heartbeat_at": job.heartbeat_at,
+    }
+
+def is_stale(job: ScoringJob) -> bool:
+    cutoff = datetime.utcnow() - timedelta(seconds=SCORING_JOB_STALE_SECONDS)
+    return job.status == "running" and (job.heartbeat_at is None or job.heartbeat_at < cutoff)
+
+def claim_job(db, job_id: int) -> Optional[str]:
+    """
+    Atomically marks a job as running and returns the new worker token, or None.
+    Succeeds only for queued jobs or running jobs whose worker stopped sending
+    heartbeats; the previous worker's writes are refused from then on.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=SCORING_JOB_STALE_SECONDS)
+    token = uuid.uuid4().hex
+    claimed = db.query(ScoringJob).filter(
+        ScoringJob.id == job_id,
+        or_(
+            ScoringJob.status == "queued",
+            and_(ScoringJob.status == "running", ScoringJob.heartbeat_at < cutoff),
+        ),
+    ).update(
+        {"status": "running", "heartbeat_at": datetime.utcnow(), "worker_token": token}, synchronize_session=False
+    )
+    db.commit()
+    return token if claimed == 1 else None
+
+class JobHeartbeat(threading.Thread):
+    """
+    Refreshes a claimed job's heartbeat every SCORING_JOB_HEARTBEAT_SECONDS on
+    its own session, so a job stuck in one slow LLM call is not taken for dead.
+    Sets `lost` when the job turns out to be claimed by another worker.
+    """
+    def __init__(self, session_factory, job_id: int, worker_token: str, interval: float = None):
+        super().__init__(name=f"scoring-job-{job_id}-heartbeat", daemon=True)
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.worker_token = worker_token
+        self.interval = interval or SCORING_JOB_HEARTBEAT_SECONDS
+        self.lost = threading.Event()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            db = self.session_factory()
+            try:
+                beat = db.query(ScoringJob).filter(
+                    ScoringJob.id == self.job_id, ScoringJob.worker_token == self.worker_token
+                ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                # A missed beat is not fatal; the stale window allows several
+                print(f"Heartbeat of scoring job {self.job_id} failed: {e}")
+                db.rollback()
+                continue
+            finally:
+                db.close()
+            if not beat:
+                self.lost.set()
+                return
+
+    def stop(self):
+        self._stopped.set()
+
+def run_scoring_job(
+    job_id: int,
+    api_key: str = None,
+    score_fn: Optional[Callable[..., dict]] = None,
+    session_factory=None,
+    batch_score_fn: Optional[Callable[..., List[Optional[dict]]]] = None,
+    batch_size: Optional[int] = None,
+):
+    """
+    Scores every pending item of a job. Candidates are sent to the AI in
+    batches of up to `batch_size` (SCORING_BATCH_SIZE), each batch against one
+    JD (matrix jobs group their pairs by JD); entries a batch call fails to
+    return are retried one by one. Results are written in bulk by a
+    ScoreResultsWriter that commits every SCORING_WRITE_BATCH_SIZE results (or
+    SCORING_WRITE_INTERVAL_SECONDS), so a restarted job only scores what is
+    still pending. A JobHeartbeat keeps the claim alive during slow calls; if
+    the job is claimed by another worker anyway, this one stops writing.
+
+    `score_fn`, `batch_score_fn` and `session_factory` default to
+    score_candidate_with_ai, score_candidates_batch_with_ai and SessionLocal;
+    pass stubs and a test session factory to run a job in-process.
+    """
+    score_fn = score_fn or score_candidate_with_ai
+    batch_score_fn = batch_score_fn or score_candidates_batch_with_ai
+    batch_size = batch_size or SCORING_BATCH_SIZE
+    session_factory = session_factory or SessionLocal
+    db = session_factory()
+    token = heartbeat = None
+    try:
+        token = claim_job(db, job_id)
+        if not token:
+            print(f"Scoring job {job_id} is already running or finished, skipping")
+            return
+        heartbeat = JobHeartbeat(session_factory, job_id, token)
+        heartbeat.start()
+        owned = db.query(ScoringJob).filter(ScoringJob.id == job_id, ScoringJob.worker_token == token)
+
+        job = db.query(ScoringJob).filter(ScoringJob.id == job_id).first()
+        matrix = job.mode == "matrix"
+        if not matrix and not db.query(JobDescription.id).filter(JobDescription.id == job.job_description_id).first():
+            owned.update({"status": "failed", "error": "Job Description no longer exists"}, synchronize_session=False)
+            db.commit()
+            return
+
+        # Plain rows, not ORM objects: results are written back in bulk by the writer
+        items = db.query(ScoringJobItem.id, ScoringJobItem.resume_id, ScoringJobItem.job_description_id).filter(
+            ScoringJobItem.job_id == job_id, ScoringJobItem.status == "pending"
+        ).all()
+        resumes = dict(
+            db.query(Resume.id, Resume.parsed_json).filter(Resume.id.in_({item.resume_id for item in items}))
+        ) if items else {}
+        jd_ids = {item.job_description_id for item in items} if matrix else {job.job_description_id}
+        jd_jsons = dict(db.query(JobDescription.id, JobDescription.parsed_json).filter(JobDescription.id.in_(jd_ids)))
+        model = get_model_name(api_key)
+        limiter = get_rate_limiter(get_provider(api_key))
+        writer = ScoreResultsWriter(db, job_id, worker_token=token)
+
+        def check_claim():
+            if heartbeat.lost.is_set():
+                raise JobSuperseded(f"Scoring job {job_id} was claimed by another worker")
+
+        def score_one(resume_json: dict, jd_json: dict) -> dict:
+            check_claim()
+            limiter.acquire()
+            return score_fn(resume_json, jd_json, api_key=api_key)
+
+        def score_group(resume_jsons: List[dict], jd_json: dict) -> List[dict]:
+            check_claim()
+            if len(resume_jsons) == 1:
+                return [score_one(resume_jsons[0], jd_json)]
+            limiter.acquire()
+            try:
+                results = batch_score_fn(resume_jsons, jd_json, api_key=api_key)
+            except Exception as e:
+                print(f"Batch scoring failed, falling back to single scoring: {e}")
+                results = [None] * len(resume_jsons)
+            return [result if result is not None else score_one(resume_json, jd_json)
+                    for result, resume_json in zip(results, resume_jsons)]
+
+        by_jd = {}
+        for item in items:
+            jd_id = item.job_description_id if matrix else job.job_description_id
+            parsed_json = resumes.get(item.resume_id)
+            if jd_id not in jd_jsons:
+                writer.add_failure(item.id, "Job Description no longer exists")
+                continue
+            if not parsed_json:
+                writer.add_failure(item.id, "Resume missing or not parsed")
+                continue
+            # Fingerprint the inputs as sent, in case the resume changes mid-job
+            by_jd.setdefault(jd_id, []).append(
+                (item, parsed_json, scoring_fingerprint(parsed_json, jd_jsons[jd_id], model))
+            )
+        resumes = None
+
+        # LLM calls run in worker threads; all DB writes stay on this thread
+        with ThreadPoolExecutor(max_workers=max(1, SCORING_CONCURRENCY)) as pool:
+            futures = {}
+            for jd_id, scorable in by_jd.items():
+                batches = make_batches([parsed for _, parsed, _ in scorable], max(1, batch_size), SCORING_BATCH_TOKEN_BUDGET)
+                for batch in batches:
+                    future = pool.submit(score_group, [scorable[i][1] for i in batch], jd_jsons[jd_id])
+                    futures[future] = (jd_id, [scorable[i] for i in batch])
+
+            try:
+                for future in as_completed(futures):
+                    jd_id, group = futures.pop(future)
+                    check_claim()
+                    try:
+                        group_results = future.result()
+                    except JobSuperseded:
+                        raise
+                    except Exception as e:
+                        group_results = [{"error": str(e)}] * len(group)
+
+                    for (item, _, fingerprint), score_data in zip(group, group_results):
+                        if not score_data or "error" in score_data:
+                            writer.add_failure(item.id, (score_data or {}).get("error", "AI scoring failed"))
+                        else:
+                            score_data["fingerprint"] = fingerprint
+                            writer.add_result(item.id, item.resume_id, score_data, jd_id=jd_id if matrix else None)
+            except JobSuperseded:
+                # Queued groups are dropped; running ones stop before their next call
+                for future in futures:
+                    future.cancel()
+                raise
+
+        writer.flush()
+        if not owned.update({"status": "completed", "heartbeat_at": datetime.utcnow()}, synchronize_session=False):
+            raise JobSuperseded(f"Scoring job {job_id} was claimed by another worker")
+        db.commit()
+        db.refresh(job)
+        print(f"Scoring job {job_id} finished: {job.done} done, {job.failed} failed")
+    except JobSuperseded as e:
+        print(f"{e}; stopping this worker")
+        db.rollback()
+    except Exception as e:
+        print(f"Scoring job {job_id} crashed: {e}")
+        db.rollback()
+        if token:
+            db.query(ScoringJob).filter(ScoringJob.id == job_id, ScoringJob.worker_token == token).update(
+                {"status": "failed", "error": str(e)}, synchronize_session=False
+            )
+            db.commit()
+    finally:
+        if heartbeat is not None:
+            heartbeat.stop()
+        db.close()
+
+def enqueue_scoring_job(job_id: int, api_key: str = None):
+    """Runs the job on the background worker pool."""
+    get_job_pool().submit(run_scoring_job, job_id, api_key)
+
+def resume_pending_jobs(session_factory=None):
+    """
+    Re-enqueues jobs left queued, or running without a recent heartbeat, by a
+    previous process. The API key of the original request is not persisted, so
+    resumed jobs use the server's configured key.
+    """
+    db = (session_factory or SessionLocal)()
+    try:
+        jobs = db.query(ScoringJob).filter(ScoringJob.status.in_(["queued", "running"])).all()
+        for job in jobs:
+            if job.status == "queued" or is_stale(job):
+                print(f"Resuming scoring job {job.id}")
+                enqueue_scoring_job(job.id)
+    finally:
+        db.close()
@@ -0,0 +1,280 @@
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import undefer
+try:
+    from ..database import SessionLocal, engine
+    from ..models import Resume
+except ImportError:
+    from database import SessionLocal, engine
+    from models import Resume
+from .prescorer import raw_skills
+from .skills import taxonomy
+
+# Queries matching more resumes than this are returned newest first instead of by relevance
+SEARCH_RANK_MAX_MATCHES = int(os.getenv("SEARCH_RANK_MAX_MATCHES", "20000"))
+# Rows indexed per commit when filling the index for existing resumes
+SEARCH_BACKFILL_CHUNK = 500
+
+# Resume search index, one row per resume (rowid / resume_id = resumes.id).
+# SQLite: a contentless FTS5 table, so resume text is not stored twice.
+# Postgres: a weighted tsvector per resume with a GIN index.
+# Canonical skill ids and the JD id are indexed as "sk<id>" / "jd<id>" tags, so
+# skill and JD filters are index lookups too, with no join against resumes.
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+        tags, name, skills, titles, body,
+        content='', tokenize="porter unicode61 tokenchars '+#'"
+    )""",
+]
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS resume_search (
+        resume_id INTEGER PRIMARY KEY REFERENCES resumes(id),
+        document TSVECTOR NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_resume_search_document ON resume_search USING GIN (document)",
+]
+# Column weights for SQLite's bm25(): tags, name, skills, titles, body
+SQLITE_BM25 = "bm25(resume_fts, 0.0, 5.0, 3.0, 2.0, 1.0)"
+POSTGRES_INSERT = """
+    INSERT INTO resume_search (resume_id, document) VALUES (:id,
+        to_tsvector('simple', :tags)
+        || setweight(to_tsvector('english', :name), 'A')
+        || setweight(to_tsvector('english', :skills), 'A')
+        || setweight(to_tsvector('english', :titles), 'B')
+        || setweight(to_tsvector('english', :body), 'D'))
+    ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document
+"""
+
+_QUERY_PART_RE = re.compile(r'"([^"]*)"|(\S+)')
+_TERM_CHARS_RE = re.compile(r"[^\w+#.-]")
+
+class SearchUnavailable(RuntimeError):
+    pass
+
+def dialect(bind) -> Optional[str]:
+    name = bind.dialect.name
+    return name if name in ("sqlite", "postgresql") else None
+
+_ready = {}
+_ready_lock = threading.Lock()
+
+def ensure_search_index(bind=None) -> bool:
+    """
+    Creates the search index if missing, once per engine. Returns False when
+    this database has no full-text support; inserts then skip indexing.
+    """
+    bind = bind or engine
+    bind = getattr(bind, "engine", bind)
+    with _ready_lock:
+        if bind in _ready:
+            return _ready[bind]
+        ddl = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(dialect(bind))
+        if ddl is None:
+            print(f"Full-text search is not supported on {bind.dialect.name}")
+            _ready[bind] = False
+            return False
+        try:
+            with bind.begin() as conn:
+                for statement in ddl:
+                    conn.execute(text(statement))
+            _ready[bind] = True
+        except Exception as e:
+            # e.g. an SQLite build without FTS5
+            print(f"Could not create the search index: {e}")
+            _ready[bind] = False
+        return _ready[bind]
+
+def _create_in_transaction(db, bind) -> bool:
+    """
+    Creates the search index inside the caller's transaction (in a savepoint,
+    so a database without full-text support leaves that transaction usable).
+    Taking a connection of its own would wait on the caller's open write.
+    """
+    ddl = {"sqlite": SQLITE_DDL, "postgresql": POSTGRES_DDL}.get(dialect(bind))
+    if ddl is None:
+        return ensure_search_index(bind)
+    try:
+        with db.begin_nested():
+            for statement in ddl:
+                db.execute(text(statement))
+        return True
+    except Exception as e:
+        print(f"Could not create the search index: {e}")
+        with _ready_lock:
+            _ready[bind] = False
+        return False
+
+def search_document(resume_id: int, jd_id: Optional[int], parsed_json: dict, raw_text: str, skill_ids) -> dict:
+    """Index fields for one resume: parsed name, skills and titles, and the full text as the body."""
+    parsed_json = parsed_json or {}
+    education = parsed_json.get("education") or []
+    education = [
+        " ".join(str(value) for value in item.values() if value) if isinstance(item, dict) else str(item)
+        for item in (education if isinstance(education, list) else [education])
+    ]
+    titles = parsed_json.get("job_titles") or []
+    return {
+        "id": resume_id,
+        "tags": " ".join([f"sk{skill_id}" for skill_id in skill_ids or []] + ([f"jd{jd_id}"] if jd_id else [])),
+        "name": str(parsed_json.get("name") or ""),
+        "skills": ", ".join(raw_skills(parsed_json)),
+        "titles": ", ".join(str(t) for t in (titles if isinstance(titles, list) else [titles])),
+        "body": "\n".join([str(parsed_json.get("summary") or ""), *education, raw_text or ""]),
+    }
+
+def index_resumes(db, rows: Iterable[Tuple[int, Optional[int], dict, str, list]]):
+    """
+    Adds (id, job_description_id, parsed_json, raw_text, skill_ids) rows to the search index in the
+    caller's transaction, so the index is updated together with the insert.
+    """
+    bind = db.get_bind()
+    documents = [search_document(*row) for row in rows]
+    if not documents:
+        return
+    # Until ensure_search_index() has run for this engine (at startup or on the
+    # first search), the index is created here; it is not marked ready, as the
+    # caller may still roll back. Older unindexed resumes are picked up by
+    # backfill_search_index()
+    ready = _ready.get(getattr(bind, "engine", bind))
+    if ready is False or (ready is None and not _create_in_transaction(db, getattr(bind, "engine", bind))):
+        return
+    kind = dialect(bind)
+    if kind == "sqlite":
+        db.execute(text(
+            "INSERT INTO resume_fts (rowid, tags, name, skills, titles, body) "
+            "VALUES (:id, :tags, :name, :skills, :titles, :body)"
+        ), documents)
+    elif kind == "postgresql":
+        db.execute(text(POSTGRES_INSERT), documents)
+
+def _unindexed_ids_query(kind: str) -> str:
+    table, column = ("resume_fts", "rowid") if kind == "sqlite" else ("resume_search", "resume_id")
+    return (
+        f"SELECT id FROM resumes WHERE id > :last_id AND id NOT IN (SELECT {column} FROM {table}) "
+        f"ORDER BY id LIMIT :limit"
+    )
+
+def backfill_search_index(session_factory=None, chunk_size: int = SEARCH_BACKFILL_CHUNK) -> int:
+    """Indexes resumes stored before the search index existed. Returns rows indexed."""
+    db = (session_factory or SessionLocal)()
+    indexed = 0
+    try:
+        if not ensure_search_index(db.get_bind()):
+            return 0
+        kind = dialect(db.get_bind())
+        last_id = 0
+        while True:
+            ids = [row[0] for row in db.execute(
+                text(_unindexed_ids_query(kind)), {"last_id": last_id, "limit": chunk_size}
+            )]
+            if not ids:
+                break
+            rows = db.query(Resume).options(undefer(Resume.raw_text), undefer(Resume.parsed_json)).filter(
+                Resume.id.in_(ids)
+            ).all()
+            index_resumes(db, [
+                (row.id, row.job_description_id, row.parsed_json, row.raw_text, row.skill_ids) for row in rows
+            ])
+            db.commit()
+            indexed += len(rows)
+            last_id = ids[-1]
+        if indexed:
+            print(f"Indexed {indexed} resumes for search")
+        return indexed
+    finally:
+        db.close()
+
+def parse_query(q: str) -> Tuple[List[str], List[str]]:
+    """Splits a query into keywords and "quoted phrases"."""
+    terms, phrases = [], []
+    for phrase, term in _QUERY_PART_RE.findall(q or ""):
+        if phrase.strip():
+            phrases.append(" ".join(phrase.split()))
+        term = _TERM_CHARS_RE.sub("", term).strip(".-")
+        if term:
+            terms.append(term)
+    return terms, phrases
+
+def _fts_string(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+def sqlite_match(terms: List[str], phrases: List[str], tags: List[str]) -> str:
+    """FTS5 MATCH expression; every keyword and phrase is a quoted string, so none is read as an operator."""
+    clauses = []
+    words = [_fts_string(value) for value in terms + phrases]
+    if words:
+        clauses.append("{name skills titles body} : (" + " AND ".join(words) + ")")
+    if tags:
+        clauses.append("tags : (" + " AND ".join(_fts_string(tag) for tag in tags) + ")")
+    return " AND ".join(clauses)
+
+def postgres_query(terms: List[str], phrases: List[str], tags: List[str]) -> Tuple[str, dict]:
+    """tsquery SQL expression and its parameters; user input is only ever bound, never spliced in."""
+    queries, params = [], {}
+    for i, term in enumerate(terms):
+        queries.append(f"plainto_tsquery('english', :term{i})")
+        params[f"term{i}"] = term
+    for i, phrase in enumerate(phrases):
+        queries.append(f"phraseto_tsquery('english', :phrase{i})")
+        params[f"phrase{i}"] = phrase
+    if tags:
+        queries.append("to_tsquery('simple', :tags)")
+        params["tags"] = " & ".join(tags)
+    return " && ".join(queries), params
+
+def search_resumes(
+    db, q: str = "", skills: List[str] = None, jd_id: int = None, limit: int = 20, offset: int = 0
+) -> Dict[str, Any]:
+    """
+    Resumes matching every keyword, phrase and skill, best match first.
+    Skills are resolved through the taxonomy, so "ReactJS" finds resumes listing
+    "React". Returns {"hits": [(resume id, relevance)], "has_more", "total", "ranked"}.
+    """
+    if not ensure_search_index(db.get_bind()):
+        raise SearchUnavailable("Full-text search is not available on this database")
+    kind = dialect(db.get_bind())
+    terms, phrases = parse_query(q)
+    skill_ids = []
+    for skill in skills or []:
+        skill_id = taxonomy.lookup(db, skill)
+        if skill_id is None:
+            # No resume can list a skill the taxonomy has never seen
+            return {"hits": [], "has_more": False, "total": 0, "ranked": True}
+        skill_ids.append(skill_id)
+    if not (terms or phrases or skill_ids):
+        return {"hits": [], "has_more": False, "total": 0, "ranked": True}
+
+    tags = [f"sk{skill_id}" for skill_id in skill_ids]
+    if jd_id is not None:
+        tags.append(f"jd{jd_id}")
+    params = {"limit": limit + 1, "offset": offset}
+
+    if kind == "sqlite":
+        params["match"] = sqlite_match(terms, phrases, tags)
+        source, match, relevance, newest = "resume_fts", "resume_fts MATCH :match", f"-{SQLITE_BM25}", "rowid DESC"
+        id_column = "rowid"
+    else:
+        query, query_params = postgres_query(terms, phrases, tags)
+        params.update(query_params)
+        source = f"resume_search CROSS JOIN (SELECT {query} AS query) q"
+        match, relevance, newest = "document @@ q.query", "ts_rank(document, q.query)", "resume_id DESC"
+        id_column = "resume_id"
+
+    # Scoring every match costs more than the index lookup; a query matching
+    # most of the pool ("engineer") is returned newest first instead
+    matches = db.execute(text(f"SELECT count(*) FROM {source} WHERE {match}"), params).scalar()
+    ranked = matches <= SEARCH_RANK_MAX_MATCHES
+    order = f"relevance DESC, {id_column}" if ranked else newest
+    rows = db.execute(text(
+        f"SELECT {id_column}, {relevance} AS relevance FROM {source} WHERE {match} "
+        f"ORDER BY {order} LIMIT :limit OFFSET :offset"
+    ), params).all()
+    return {
+        "hits": [(row[0], float(row[1])) for row in rows[:limit]],
+        "has_more": len(rows) > limit,
+        "total": matches,
+        "ranked": ranked,
+    }
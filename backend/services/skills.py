@@ -0,0 +1,268 @@
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+try:
+    from ..database import SessionLocal
+    from ..models import Skill, SkillAlias, Resume, JobDescription
+except ImportError:
+    from database import SessionLocal
+    from models import Skill, SkillAlias, Resume, JobDescription
+from .prescorer import normalize_term, raw_skills
+
+# Minimum trigram Jaccard similarity for a misspelling to map onto a known skill
+SKILL_FUZZY_THRESHOLD = float(os.getenv("SKILL_FUZZY_THRESHOLD", "0.55"))
+# Shorter keys ("go", "c#", "sql") only match exactly; trigrams say little about them
+SKILL_FUZZY_MIN_LENGTH = 5
+# A misspelling adds or drops a character or two; bigger length gaps are different skills
+SKILL_FUZZY_MAX_LENGTH_GAP = 2
+
+# Canonical skills and their common spellings; the table grows with every new
+# skill seen, so this only has to cover the spellings that normalization alone
+# does not merge ("React.js" and "react js" already normalize alike)
+SEED_SKILLS = {
+    "JavaScript": ["js", "javascript", "ecmascript", "es6"],
+    "TypeScript": ["ts", "typescript"],
+    "React": ["react", "reactjs", "reactjsx"],
+    "React Native": ["reactnative"],
+    "Angular": ["angular", "angularjs", "angular2"],
+    "Vue.js": ["vue", "vuejs", "vue3"],
+    "Node.js": ["node", "nodejs"],
+    "Next.js": ["nextjs"],
+    "Express": ["express", "expressjs"],
+    "Python": ["python", "python3", "py"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Java": ["java", "corejava", "java8"],
+    "Spring": ["spring", "springframework"],
+    "Spring Boot": ["springboot"],
+    "C#": ["c#", "csharp"],
+    ".NET": ["net", "dotnet", "aspnet", "netcore", "aspnetcore"],
+    "C++": ["c++", "cpp"],
+    "Go": ["go", "golang"],
+    "Ruby on Rails": ["rails", "rubyonrails", "ror"],
+    "PHP": ["php"],
+    "SQL": ["sql"],
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql"],
+    "Microsoft SQL Server": ["sqlserver", "mssql", "mssqlserver", "microsoftsqlserver"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic", "elk"],
+    "Amazon Web Services": ["aws", "amazonwebservices"],
+    "Microsoft Azure": ["azure", "microsoftazure"],
+    "Google Cloud Platform": ["gcp", "googlecloud", "googlecloudplatform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "CI/CD": ["cicd", "continuousintegration", "continuousdelivery"],
+    "Git": ["git"],
+    "GitHub": ["github"],
+    "GitLab": ["gitlab"],
+    "Linux": ["linux", "unix"],
+    "REST APIs": ["rest", "restapi", "restapis", "restful", "restfulapis"],
+    "GraphQL": ["graphql"],
+    "Machine Learning": ["ml", "machinelearning"],
+    "Deep Learning": ["dl", "deeplearning"],
+    "Natural Language Processing": ["nlp", "naturallanguageprocessing"],
+    "Large Language Models": ["llm", "llms", "largelanguagemodels", "genai", "generativeai"],
+    "TensorFlow": ["tensorflow", "tf"],
+    "PyTorch": ["pytorch", "torch"],
+    "scikit-learn": ["scikitlearn", "sklearn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Apache Spark": ["spark", "apachespark", "pyspark"],
+    "Apache Kafka": ["kafka", "apachekafka"],
+    "Tableau": ["tableau"],
+    "Power BI": ["powerbi"],
+    "Microsoft Excel": ["excel", "msexcel", "microsoftexcel", "advancedexcel"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Agile": ["agile", "scrum", "agilescrum"],
+    "Project Management": ["projectmanagement"],
+    "Communication": ["communication", "communicationskills"],
+    "Leadership": ["leadership", "teamleadership"],
+}
+
+def trigrams(key: str) -> set:
+    padded = f"#{key}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SkillTaxonomy:
+    """
+    In-memory view of the skills tables: an alias -> skill id hash index plus
+    a trigram index over the aliases for misspellings. Unknown skills are added
+    to the tables as new canonical skills, so every skill gets a stable id.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._aliases: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._trigrams: Dict[str, set] = {}
+        self._gram_counts: Dict[str, int] = {}
+
+    def _index(self, key: str, skill_id: int):
+        self._aliases[key] = skill_id
+        if len(key) >= SKILL_FUZZY_MIN_LENGTH:
+            grams = trigrams(key)
+            self._gram_counts[key] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(key)
+
+    def load(self, db, force: bool = False):
+        with self._lock:
+            if self._loaded and not force:
+                return
+        _seed(db)
+        aliases = db.query(SkillAlias.key, SkillAlias.skill_id).all()
+        names = db.query(Skill.id, Skill.name).all()
+        with self._lock:
+            self._aliases, self._names, self._trigrams, self._gram_counts = {}, dict(names), {}, {}
+            for key, skill_id in aliases:
+                self._index(key, skill_id)
+            self._loaded = True
+
+    def name(self, skill_id: int) -> Optional[str]:
+        with self._lock:
+            return self._names.get(skill_id)
+
+    def match(self, key: str) -> Optional[int]:
+        """Skill id for a normalized key: exact alias first, then the closest alias by trigram Jaccard."""
+        return self._match(key)[0]
+
+    def _match(self, key: str):
+        """match() plus whether the key is a known alias, read under one lock."""
+        with self._lock:
+            skill_id = self._aliases.get(key)
+            if skill_id is not None:
+                return skill_id, True
+            if len(key) < SKILL_FUZZY_MIN_LENGTH:
+                return None, False
+            grams = trigrams(key)
+            shared = Counter(alias for gram in grams for alias in self._trigrams.get(gram, ()))
+            best, best_score = None, SKILL_FUZZY_THRESHOLD
+            for alias, count in shared.items():
+                if abs(len(alias) - len(key)) > SKILL_FUZZY_MAX_LENGTH_GAP:
+                    continue
+                score = count / (len(grams) + self._gram_counts[alias] - count)
+                if score >= best_score:
+                    best, best_score = alias, score
+            return (self._aliases[best] if best else None), False
+
+    def lookup(self, db, term: str) -> Optional[int]:
+        """Skill id for one free-text skill without adding anything to the tables."""
+        self.load(db)
+        key = normalize_term(term)
+        return self.match(key) if key else None
+
+    def resolve(self, db, terms: List[str]) -> List[int]:
+        """
+        Canonical skill ids for free-text skills, de-duplicated in input order.
+        Fuzzy matches are stored as new aliases and unknown skills as new
+        skills (in their own transaction), so later lookups are exact.
+        """
+        self.load(db)
+        ids, new_aliases, new_skills = [], {}, {}
+        for term in terms:
+            key = normalize_term(term)
+            if not key:
+                continue
+            skill_id, known = self._match(key)
+            if skill_id is None:
+                new_skills.setdefault(key, term.strip())
+                continue
+            if not known:
+                new_aliases[key] = skill_id
+            ids.append(skill_id)
+        if new_aliases or new_skills:
+            created = self._store(db, new_aliases, new_skills)
+            ids += [created[normalize_term(term)] for term in terms if normalize_term(term) in created]
+        return list(dict.fromkeys(ids))
+
+    def _store(self, db, new_aliases: Dict[str, int], new_skills: Dict[str, str]) -> Dict[str, int]:
+        """Writes new aliases/skills; returns {key: id} for the new skills."""
+        session = Session(bind=db.get_bind())
+        try:
+            created = {}
+            for key, name in new_skills.items():
+                skill = Skill(name=name)
+                session.add(skill)
+                session.flush()
+                created[key] = skill.id
+            session.add_all(
+                [SkillAlias(key=key, skill_id=skill_id) for key, skill_id in {**new_aliases, **created}.items()]
+            )
+            session.commit()
+        except IntegrityError:
+            # Another process added some of these first; pick up its ids
+            session.rollback()
+            self.load(session, force=True)
+            return {key: self.match(key) for key in new_skills if self.match(key) is not None}
+        finally:
+            session.close()
+        with self._lock:
+            for key, skill_id in {**new_aliases, **created}.items():
+                self._index(key, skill_id)
+            for key, skill_id in created.items():
+                self._names[skill_id] = new_skills[key]
+        return created
+
+taxonomy = SkillTaxonomy()
+
+def _seed(db):
+    """Adds any SEED_SKILLS missing from the tables."""
+    if db.query(SkillAlias.key).limit(1).first() is not None:
+        return
+    session = Session(bind=db.get_bind())
+    try:
+        for name, aliases in SEED_SKILLS.items():
+            skill = Skill(name=name)
+            session.add(skill)
+            session.flush()
+            keys = {normalize_term(name), *aliases}
+            session.add_all([SkillAlias(key=key, skill_id=skill.id) for key in keys if key])
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+    finally:
+        session.close()
+
+def resume_skill_ids(db, parsed_json: dict) -> List[int]:
+    return taxonomy.resolve(db, raw_skills(parsed_json))
+
+def jd_skill_ids(db, jd_json: dict) -> dict:
+    jd_json = jd_json or {}
+    def terms(key):
+        values = jd_json.get(key) or []
+        return [str(v) for v in (values if isinstance(values, list) else [values]) if v]
+    return {
+        "required": taxonomy.resolve(db, terms("required_skills")),
+        "good_to_have": taxonomy.resolve(db, terms("good_to_have_skills")),
+    }
+
+def backfill_skill_ids(session_factory=None, chunk_size: int = 500):
+    """Fills skill_ids for resumes and JDs stored before the taxonomy existed."""
+    db = (session_factory or SessionLocal)()
+    try:
+        for jd in db.query(JobDescription).filter(JobDescription.skill_ids.is_(None)).all():
+            jd.skill_ids = jd_skill_ids(db, jd.parsed_json)
+        db.commit()
+        last_id = 0
+        while True:
+            rows = db.query(Resume.id, Resume.parsed_json).filter(
+                Resume.id > last_id, Resume.skill_ids.is_(None)
+            ).order_by(Resume.id).limit(chunk_size).all()
+            if not rows:
+                break
+            db.bulk_update_mappings(Resume, [
+                {"id": row.id, "skill_ids": resume_skill_ids(db, row.parsed_json)} for row in rows
+            ])
+            db.commit()
+            last_id = rows[-1].id
+    finally:
+        db.close()
@@ -0,0 +1,71 @@
+import os
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+# Largest single upload accepted
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# Largest archive accepted by the bulk import endpoint
+MAX_ARCHIVE_BYTES = int(os.getenv("MAX_ARCHIVE_BYTES", str(500 * 1024 * 1024)))
+# Largest request body accepted elsewhere, e.g. all files of one resume upload together
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Body limits of the single-file upload routes; other routes get MAX_REQUEST_BYTES
+REQUEST_LIMITS = {
+    "/upload/jd": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    "/upload/resumes/zip": MAX_ARCHIVE_BYTES + MULTIPART_OVERHEAD_BYTES,
+}
+
+class UploadTooLarge(ValueError):
+    def __init__(self, filename: str, max_bytes: int = None):
+        max_bytes = max_bytes or MAX_UPLOAD_BYTES
+        super().__init__(f"{filename} exceeds the {max_bytes / (1024 * 1024):g}MB upload limit")
+        self.filename = filename
+
+def request_too_large(max_bytes: int) -> str:
+    return f"Request body exceeds the {max_bytes / (1024 * 1024):g}MB limit"
+
+class RequestSizeLimitMiddleware:
+    """
+    Answers 413 to request bodies over the limit for their path before the
+    multipart parser spools any of them: at once when Content-Length is too
+    large, or as soon as a body sent without one passes the limit.
+    """
+    def __init__(self, app, max_bytes: int = None, limits: dict = None):
+        self.app = app
+        self.max_bytes = max_bytes or MAX_REQUEST_BYTES
+        self.limits = REQUEST_LIMITS if limits is None else limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_bytes = self.limits.get(scope["path"], self.max_bytes)
+        length = Headers(scope=scope).get("content-length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            response = JSONResponse({"detail": request_too_large(max_bytes)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Re-raised by FastAPI's body parsing and answered by the exception handlers
+                    raise HTTPException(status_code=413, detail=request_too_large(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+def check_upload_sizes(files, max_bytes: int = None):
+    """Rejects oversized files before anything is extracted from them."""
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    for upload in files:
+        if upload.size is not None and upload.size > max_bytes:
+            raise UploadTooLarge(upload.filename, max_bytes)
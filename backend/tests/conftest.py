@@ -0,0 +1,39 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Read by the backend modules at import: no real database or model latency in tests
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["FAKE_LLM_LATENCY_MS"] = "0"
+os.environ["FAKE_LLM_MS_PER_1K_TOKENS"] = "0"
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from database import make_engine, upgrade_database  # noqa: E402
+import models  # noqa: E402,F401
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a fresh SQLite database migrated to head."""
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    upgrade_database(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+@pytest.fixture
+def no_llm(monkeypatch):
+    """No provider configured: resumes only get the local parse."""
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """The offline stand-in (services/fake_llm.py) answers every LLM call."""
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
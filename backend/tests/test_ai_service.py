@@ -0,0 +1,75 @@
+import asyncio
+import json
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from services.ai_service import (
+    repair_json, validate_output, batch_results, structured_call, astructured_call, LLMOutputError,
+)
+from services.llm_schemas import ParsedResume, ParsedJD, CandidateScore
+
+SCORE = {"score": 81, "verdict": "Relevant", "missing_skills": [], "matching_skills": ["python"], "red_flags": [], "reasoning": "Fits."}
+
+@pytest.mark.parametrize("text", [
+    '{"a": [1, 2]}',
+    '```json\n{"a": [1, 2]}\n```',
+    'Here is the result:\n{"a": [1, 2]}\nLet me know if you need more.',
+    '{"a": [1, 2,],}',
+    '{"a": [1, 2',
+    '{“a”: [1, 2]}',
+])
+def test_repair_json_fixes_near_misses(text):
+    assert repair_json(text) == {"a": [1, 2]}
+
+def test_repair_json_closes_truncated_strings():
+    assert repair_json('{"name": "Jane", "summary": "Backend eng') == {"name": "Jane", "summary": "Backend eng"}
+
+@pytest.mark.parametrize("text", ["", "no json here", "{'a': 1"])
+def test_repair_json_gives_up_with_value_error(text):
+    with pytest.raises(ValueError):
+        repair_json(text)
+
+def test_validate_output_coerces_loose_shapes():
+    resume = validate_output(json.dumps({
+        "name": "Jane", "total_experience_years": "5+ years", "skills": ["Python", "SQL"],
+        "job_titles": "Engineer, Lead", "education": "B.Tech",
+    }), ParsedResume)
+    assert resume["total_experience_years"] == 5.0
+    assert resume["skills"]["technical"] == ["Python", "SQL"]
+    assert resume["job_titles"] == ["Engineer", "Lead"]
+    assert resume["education"][0]["degree"] == "B.Tech"
+    assert validate_output('{"minimum_experience_years": "3-5 yrs"}', ParsedJD)["minimum_experience_years"] == 3.0
+    assert validate_output(json.dumps({**SCORE, "verdict": " highly  relevant"}), CandidateScore)["verdict"] == "Highly Relevant"
+
+def test_validate_output_rejects_invalid_scores():
+    with pytest.raises(ValueError):
+        validate_output(json.dumps({**SCORE, "score": 140}), CandidateScore)
+    with pytest.raises(ValueError):
+        validate_output(json.dumps({**SCORE, "verdict": "Maybe"}), CandidateScore)
+
+def test_batch_results_keeps_only_valid_entries_by_index():
+    content = json.dumps({"results": [
+        {**SCORE, "index": 2},
+        {**SCORE, "index": 0, "score": 40},
+        {**SCORE, "index": 0, "score": 99},  # duplicate: the first one wins
+        {**SCORE, "index": 5},  # out of range
+        {**SCORE, "index": 1, "verdict": "Maybe"},  # invalid
+    ]})
+    results = batch_results(content, 3)
+    assert [result and result["score"] for result in results] == [40, None, 81]
+    assert "index" not in results[0]
+    # A bare list is accepted too
+    assert batch_results(json.dumps([{**SCORE, "index": 0}]), 1)[0]["score"] == 81
+    with pytest.raises(ValueError):
+        batch_results('{"results": "none"}', 1)
+
+def test_structured_call_retries_only_invalid_output():
+    llm = FakeListChatModel(responses=['{"score": 150, "verdict": "Relevant"}', json.dumps(SCORE)])
+    assert structured_call(llm, [], CandidateScore)["score"] == 81
+
+    llm = FakeListChatModel(responses=["not json"] * 3)
+    with pytest.raises(LLMOutputError):
+        structured_call(llm, [], CandidateScore)
+
+def test_astructured_call_repairs_and_retries():
+    llm = FakeListChatModel(responses=["Sure!", "```json\n" + json.dumps(SCORE)])
+    assert asyncio.run(astructured_call(llm, [], CandidateScore))["verdict"] == "Relevant"
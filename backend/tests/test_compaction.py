@@ -0,0 +1,55 @@
+from services.compaction import compact_resume_text, count_tokens
+
+def section(heading: str, lines: int, word: str) -> list:
+    return [heading] + [f"{word} line {n} with enough words to cost some tokens" for n in range(lines)]
+
+def resume(**sizes) -> str:
+    lines = ["Jane Doe", "jane@example.com | +1 555 123 4567"]
+    for heading, count in sizes.items():
+        lines += section(heading.capitalize(), count, heading)
+    return "\n".join(lines)
+
+def test_under_budget_resume_passes_through_unchanged():
+    text = resume(summary=2, skills=3, experience=10, education=2, interests=2)
+    result = compact_resume_text(text, budget=count_tokens(text) + 10)
+    assert result["text"] == text
+    assert result["tokens"] == result["original_tokens"] and result["tokens_saved"] == 0
+
+def test_over_budget_resume_keeps_the_required_sections():
+    text = resume(summary=2, skills=3, experience=12, education=2, projects=15, interests=10, references=10)
+    required = resume(summary=2, skills=3, experience=12, education=2)
+    budget = count_tokens(required) + 80
+    result = compact_resume_text(text, budget=budget)
+    assert result["tokens"] <= budget < result["original_tokens"]
+    assert result["tokens_saved"] == result["original_tokens"] - result["tokens"]
+    lines = result["text"].splitlines()
+    # Header, summary, skills, experience and education whole and in their original order
+    assert lines[:len(required.splitlines())] == required.splitlines()
+    # What is left of the budget goes to the leading lines of the next section
+    rest = lines[len(required.splitlines()):]
+    assert rest[0] == "Projects" and 1 < len(rest) < 16
+    assert "Interests" not in lines and "References" not in lines
+
+def test_section_over_the_budget_is_cut_to_its_leading_lines():
+    text = resume(summary=1, experience=200)
+    budget = 300
+    result = compact_resume_text(text, budget=budget)
+    assert result["tokens"] <= budget
+    lines = result["text"].splitlines()
+    assert lines[:5] == text.splitlines()[:5]
+    assert lines[-1] == text.splitlines()[len(lines) - 1]
+
+def test_page_headers_footers_and_repeated_lines_are_dropped_first():
+    pages = [
+        ["Jane Doe - Resume", "jane@example.com", company, f"Built the {company} billing service on Postgres",
+         "Owned the on-call rotation for the team", f"Left {company} for a bigger role", "Confidential", f"Page {n} of 3"]
+        for n, company in enumerate(["Acme", "Beta", "Gamma"], 1)
+    ]
+    text = "\f".join("\n".join(page) for page in pages)
+    result = compact_resume_text(text, budget=1000)
+    assert result["text"].splitlines() == [
+        "Acme", "Built the Acme billing service on Postgres", "Owned the on-call rotation for the team", "Left Acme for a bigger role",
+        "Beta", "Built the Beta billing service on Postgres", "Left Beta for a bigger role",
+        "Gamma", "Built the Gamma billing service on Postgres", "Left Gamma for a bigger role",
+    ]
+    assert result["tokens_saved"] > 0
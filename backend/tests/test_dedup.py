@@ -0,0 +1,75 @@
+import asyncio
+import random
+from models import JobDescription, Resume
+from services import dedup
+from services.ingestion import parse_resumes, insert_resumes
+
+WORDS = ("python django postgres kubernetes docker aws terraform kafka react typescript led built "
+         "designed migrated scaled services platform team latency pipeline data api billing search").split()
+
+def resume_text(seed: int, words: int = 250) -> str:
+    rng = random.Random(seed)
+    body = " ".join(rng.choice(WORDS) for _ in range(words))
+    return f"Jane Doe\njane.doe{seed}@example.com\nSkills: Python, Django, AWS\n{body}\n"
+
+def upload(db, texts):
+    jd = db.query(JobDescription).first()
+    if jd is None:
+        jd = JobDescription(role_title="Engineer", filename="jd.txt", parsed_json={"required_skills": ["python"]})
+        db.add(jd)
+        db.commit()
+    results = asyncio.run(parse_resumes(texts, db=db))
+    ids = insert_resumes(db, jd.id, [
+        {"filename": f"{i}.txt", "raw_text": text, **result} for i, (text, result) in enumerate(zip(texts, results))
+    ])
+    return ids, results
+
+def test_signature_estimates_jaccard():
+    a = dedup.signature(resume_text(1))
+    assert dedup.similarity(a, dedup.signature(resume_text(1))) == 1.0
+    assert dedup.similarity(a, dedup.signature(resume_text(2))) < 0.3
+    edited = resume_text(1).replace("\n", " extra word here\n", 1)
+    assert dedup.similarity(a, dedup.signature(edited)) >= dedup.DEDUP_REUSE_THRESHOLD
+
+def test_identity_keys_normalize_email_phone_and_name():
+    keys = dedup.identity_keys({"email": " Jane@X.com ", "phone": "+1 (555) 123-4567", "name": "Doe, Jane"})
+    assert keys == ["email:jane@x.com", "phone:5551234567:doe jane"]
+    # A phone number without a full name is not an identity
+    assert dedup.identity_keys({"phone": "5551234567", "name": "Jane"}) == []
+
+def test_near_duplicates_share_a_candidate(db, fake_llm):
+    (original,), _ = upload(db, [resume_text(1)])
+    (copy, other), results = upload(db, [resume_text(1).replace("Skills:", "Skills: Go,"), resume_text(2)])
+    assert results[0]["status"] == "reused" and results[0]["duplicate_of"] == original
+    assert results[1]["status"] == "parsed"
+    candidates = dict(db.query(Resume.id, Resume.candidate_id))
+    assert candidates[copy] == candidates[original] != candidates[other]
+
+def test_local_parse_is_not_reused_once_an_llm_is_configured(db, monkeypatch):
+    text = resume_text(3)
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    (local_id,), results = upload(db, [text])
+    assert results[0]["status"] == "local"
+
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
+    (parsed_id,), results = upload(db, [text])
+    assert results[0]["status"] == "parsed"
+    assert results[0]["parsed_json"]["skills"]["technical"]
+    # The LLM parse replaces the local one as the copy later uploads reuse
+    (_,), results = upload(db, [text.replace("Skills:", "Skills: Go,")])
+    assert results[0]["status"] == "reused" and results[0]["duplicate_of"] == parsed_id
+    statuses = dict(db.query(Resume.id, Resume.parse_status))
+    assert statuses[local_id] == "local" and statuses[parsed_id] == "parsed"
+
+def test_same_template_with_different_emails_is_not_linked(db, fake_llm):
+    body = resume_text(4).split("\n", 2)[2]
+    alice, bob, carol = (f"{name}\n{name.lower()}@example.com\n{body}" for name in ("Alice", "Bob", "Carol"))
+    (alice_id,), _ = upload(db, [alice])
+    (bob_id, carol_id), results = upload(db, [bob, carol])
+    # Neither Alice's stored parse nor each other's copy is theirs
+    assert [result["status"] for result in results] == ["parsed", "parsed"]
+    assert results[0]["parsed_json"]["email"] == "bob@example.com"
+    candidates = dict(db.query(Resume.id, Resume.candidate_id))
+    assert len({candidates[alice_id], candidates[bob_id], candidates[carol_id]}) == 3
@@ -0,0 +1,49 @@
+from models import JobDescription, Resume
+from services import embeddings
+
+def add_resumes(db, skill_sets):
+    jd = db.query(JobDescription).first()
+    if jd is None:
+        jd = JobDescription(role_title="Engineer", filename="jd.txt", parsed_json={"required_skills": ["python"]})
+        db.add(jd)
+        db.commit()
+    resumes = []
+    for n, skills in enumerate(skill_sets):
+        parsed = {"name": f"Candidate {n}", "skills": {"technical": skills}}
+        resumes.append(Resume(job_description_id=jd.id, filename=f"{n}.txt", parsed_json=parsed,
+                              **embeddings.embedding_columns(parsed)))
+    db.add_all(resumes)
+    db.commit()
+    return [resume.id for resume in resumes]
+
+def test_load_backfills_and_refresh_appends(db):
+    old = add_resumes(db, [["python", "django"], ["java", "spring"]])
+    db.query(Resume).filter(Resume.id == old[1]).update({"embedding": None, "embedding_model": None})
+    db.commit()
+    index = embeddings.EmbeddingIndex()
+    index.load(db)
+    assert db.get(Resume, old[1]).embedding_model == embeddings.get_embedder().name
+    query = embeddings.embed_jd({"required_skills": ["java", "spring"]})
+    assert index.search(query, 1)[0][0] == old[1]
+
+    new = add_resumes(db, [["rust", "go"]])
+    index.refresh(db)
+    # Only the new row is appended; loaded rows are not read again
+    assert index._size == 3 and index._last_id == new[0]
+    assert index.search(embeddings.embed_jd({"required_skills": ["rust", "go"]}), 1)[0][0] == new[0]
+    index.refresh(db)
+    assert index._size == 3
+
+def test_refresh_picks_up_skipped_ids(db):
+    index = embeddings.EmbeddingIndex()
+    first, late, last = add_resumes(db, [["python"], ["java"], ["go"]])
+    # As if the middle row's transaction had not committed when the index was refreshed
+    db.query(Resume).filter(Resume.id == late).update({"embedding_model": "pending"})
+    db.commit()
+    index.refresh(db)
+    assert index._size == 2 and late in index._gaps
+    db.query(Resume).filter(Resume.id == late).update({"embedding_model": embeddings.get_embedder().name})
+    db.commit()
+    index.refresh(db)
+    assert index._size == 3 and not index._gaps
+    assert sorted(index._ids[:index._size]) == [first, late, last]
@@ -0,0 +1,35 @@
+import asyncio
+import time
+import pytest
+from services import extraction
+
+def slow_extract(filename, source, max_pages=0, timeout=None):
+    # Stands in for a page the PDF library never returns from
+    if filename.startswith("hang"):
+        time.sleep(3600)
+    return f"text of {filename}"
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(extraction, "extract_text", slow_extract)
+    monkeypatch.setattr(extraction, "EXTRACT_WORKERS", 2)
+    monkeypatch.setattr(extraction, "EXTRACT_TIMEOUT_SECONDS", 1)
+    # A "running" document may still be waiting for its worker to start under a loaded machine
+    monkeypatch.setattr(extraction, "EXTRACT_GRACE_SECONDS", 3)
+    extraction.shutdown_pool()
+    yield
+    extraction.shutdown_pool()
+
+def test_extracts_in_input_order(pool):
+    names = [f"{i}.pdf" for i in range(5)]
+    assert asyncio.run(extraction.extract_documents(names, [b""] * 5)) == [f"text of {name}" for name in names]
+
+def test_stuck_document_restarts_the_pool(pool):
+    restarts = extraction.get_metrics()["pool_restarts"]
+    names = ["hang.pdf", "a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    texts = asyncio.run(extraction.extract_documents(names, [b""] * len(names)))
+    # Queued documents are not charged for the wait, and ones killed with the pool are retried
+    assert texts == ["", "text of a.pdf", "text of b.pdf", "text of c.pdf", "text of d.pdf"]
+    assert extraction.get_metrics()["pool_restarts"] == restarts + 1
+    # The killed worker's slot is free again
+    assert asyncio.run(extraction.extract_documents(["e.pdf", "f.pdf"], [b"", b""])) == ["text of e.pdf", "text of f.pdf"]
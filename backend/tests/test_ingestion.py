@@ -0,0 +1,35 @@
+import importlib.util
+import os
+from datetime import datetime, timedelta
+import pytest
+from models import ParseCache
+from services import parse_cache
+from services.ingestion import hot_columns
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def migration(name: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND, "migrations", "versions", f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.mark.parametrize("value, years", [
+    (7, 7.0), (2.5, 2.5), ("5+ years", 5.0), ("3-5 yrs", 3.0), ("fresher", None), (None, None), (True, None), ({}, None),
+])
+def test_experience_years_are_coerced_like_the_parse_schema(value, years):
+    assert hot_columns({"total_experience_years": value, "email": " Jane@X.com "}) == {
+        "email": "jane@x.com", "total_experience_years": years,
+    }
+    # The migration that backfilled the column keeps its own copy of the rule
+    assert migration("0002_hot_columns")._years(value) == years
+
+def test_restoring_an_expired_parse_renews_it(db):
+    expired = datetime.utcnow() - timedelta(days=parse_cache.PARSE_CACHE_MAX_AGE_DAYS + 1)
+    db.add(ParseCache(key="k", model="m", prompt_version="1", parsed_json={"name": "Old"}, created_at=expired, last_used_at=expired))
+    db.commit()
+    assert parse_cache.get_cached_parses(db, ["k"]) == {}
+
+    parse_cache.store_parses(db, {"k": {"name": "New"}}, "1", "m")
+    # Not evicted as expired right after being stored, and served again
+    assert parse_cache.get_cached_parses(db, ["k"]) == {"k": {"name": "New"}}
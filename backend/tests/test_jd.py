@@ -0,0 +1,11 @@
+from routers.resume import store_jd
+from services.ai_service import validate_output
+from services.llm_schemas import ParsedJD
+
+def test_jd_without_a_title_is_named_after_its_file(db):
+    # The validated parse always carries role_title, as None when the model gave none
+    parsed = validate_output('{"required_skills": ["python"], "minimum_experience_years": 3}', ParsedJD)
+    assert "role_title" in parsed and parsed["role_title"] is None
+    assert store_jd(db, "backend.txt", "Backend role", parsed).role_title == "backend.txt"
+    parsed = validate_output('{"role_title": "Data Engineer"}', ParsedJD)
+    assert store_jd(db, "data.txt", "Data role", parsed).role_title == "Data Engineer"
@@ -0,0 +1,29 @@
+import importlib
+import sys
+import pytest
+from fastapi.testclient import TestClient
+
+STARTUP = [
+    ("database", "upgrade_database"),
+    ("services.scoring_jobs", "backfill_resume_scores"),
+    ("services.scoring_jobs", "resume_pending_jobs"),
+    ("services.skills", "backfill_skill_ids"),
+    ("services.search", "backfill_search_index"),
+    ("services.dedup", "backfill_candidates"),
+    ("services.embeddings", "load_index"),
+]
+
+def test_startup_work_runs_in_the_lifespan_not_at_import(monkeypatch):
+    # The GitLab and agent routers need their optional clients and an LLM key to import
+    for module in ("gitlab", "langgraph", "langchain_google_genai"):
+        pytest.importorskip(module)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    calls = []
+    for module, name in STARTUP:
+        monkeypatch.setattr(importlib.import_module(module), name, lambda *args, _name=name, **kwargs: calls.append(_name) or [])
+    monkeypatch.delitem(sys.modules, "main", raising=False)
+    import main
+    assert calls == []
+    with TestClient(main.app) as client:
+        assert client.get("/").status_code == 200
+    assert sorted(calls) == sorted(name for _, name in STARTUP if name != "backfill_resume_scores")
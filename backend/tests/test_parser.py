@@ -0,0 +1,78 @@
+from datetime import date
+import pytest
+from services.parser import extract_local_fields, experience_years, strip_contact_details
+from services.llm_schemas import years_value
+
+TODAY = date(2024, 6, 1)
+
+@pytest.mark.parametrize("text, phone", [
+    ("Phone: +1 (555) 123-4567", "+1 (555) 123-4567"),
+    ("Mobile: +91 98765 43210", "+91 98765 43210"),
+    ("London | +44 20 7946 0958 | jane@x.com", "+44 20 7946 0958"),
+    ("Tel +49 30 901820", "+49 30 901820"),
+    ("+33 1 23 45 67 89", "+33 1 23 45 67 89"),
+    ("Phone No.: 9876543210", "9876543210"),
+    ("555.123.4567", "555.123.4567"),
+])
+def test_phone_numbers_are_found(text, phone):
+    assert extract_local_fields(text)["phone"] == phone
+
+@pytest.mark.parametrize("text", [
+    # Years and dates
+    "Acme Corp 2015 - 2019",
+    "Jan 2015 - Dec 2019",
+    "Awards 2010 2012 2014 2016",
+    "DOB 12.05.1990",
+    # Numbers too short or too long for a phone
+    "Zip 12345678",
+    "Employee ID 1234567890123456",
+    # ID numbers as long as a phone number
+    "Passport No: 123456789",
+    "Aadhaar: 1234 5678 9012",
+    "Order #20190315123456",
+    "ISBN 978-3-16-148410-0",
+    "Employee ID: 9876543210",
+])
+def test_numbers_that_are_not_phones(text):
+    assert extract_local_fields(text)["phone"] is None
+    assert strip_contact_details(text) == text
+
+@pytest.mark.parametrize("text, years", [
+    ("Engineer, Acme  Jan 2015 - Dec 2019", 5.0),
+    ("Engineer, Acme  03/2016 - 02/2018", 2.0),
+    ("Engineer, Acme  2016 - 2018", 3.0),
+    # Both end months are included
+    ("Engineer, Acme  Jun '20 - present", 4.1),
+    # Overlapping roles count once
+    ("Engineer, Acme  Jan 2015 - Dec 2019\nLead, Beta  2018 - present", 9.5),
+    # Education lines are not work
+    ("B.Tech, XYZ University 2010 - 2014\nDeveloper, Acme 03/2016 - 02/2018", 2.0),
+    # Stated years and lone dates are not ranges
+    ("10+ years of experience", None),
+    ("Graduated 2012", None),
+    ("Acme 2019 - 2015", None),
+])
+def test_experience_years_from_date_ranges(text, years):
+    assert experience_years(text, today=TODAY) == years
+
+@pytest.mark.parametrize("value, years", [
+    ("10+ years", 10.0),
+    ("3-5 yrs", 3.0),
+    ("2.5 years", 2.5),
+    (7, 7.0),
+    ("fresher", None),
+    (True, None),
+    (None, None),
+])
+def test_stated_years_are_coerced(value, years):
+    assert years_value(value) == years
+
+def test_local_fields_of_a_contact_block():
+    fields = extract_local_fields(
+        "Jane Doe\njane.doe@example.com | +1 555 123 4567 | linkedin.com/in/janedoe\n"
+        "Engineer, Acme  Jan 2015 - Dec 2019\nEmployee ID: 9876543210\n"
+    )
+    assert fields["email"] == "jane.doe@example.com"
+    assert fields["phone"] == "+1 555 123 4567"
+    assert fields["links"] == ["linkedin.com/in/janedoe"]
+    assert fields["total_experience_years"] == 5.0
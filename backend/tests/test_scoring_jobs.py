@@ -0,0 +1,200 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from models import JobDescription, Resume, ScoringJob, ScoringJobItem
+from services import scoring_jobs
+from services.scoring_jobs import create_scoring_job, run_scoring_job, resume_pending_jobs
+
+JD_JSON = {"role_title": "Backend Engineer", "required_skills": ["python", "django"], "minimum_experience_years": 2}
+
+def add_jd(db, resumes: int) -> JobDescription:
+    jd = JobDescription(role_title="Backend Engineer", filename="jd.txt", parsed_json=JD_JSON)
+    db.add(jd)
+    db.flush()
+    db.add_all([
+        Resume(job_description_id=jd.id, filename=f"{n}.txt", parsed_json={"name": f"Candidate {n}", "skills": ["python"]})
+        for n in range(resumes)
+    ])
+    db.commit()
+    return jd
+
+def stub_score(score: int = 70, fail=()):
+    """score_fn stand-in: a fixed score, or an error for the named candidates. Records its calls."""
+    calls = []
+    def score_fn(resume_json, jd_json, api_key=None):
+        calls.append(resume_json["name"])
+        if resume_json["name"] in fail:
+            return {"error": f"could not score {resume_json['name']}"}
+        return {"score": score, "verdict": "Relevant", "missing_skills": ["django"], "matching_skills": ["python"],
+                "red_flags": [], "reasoning": "Stub."}
+    score_fn.calls = calls
+    return score_fn
+
+def run(session_factory, job_id, score_fn, **kwargs):
+    run_scoring_job(job_id, score_fn=score_fn, session_factory=session_factory, batch_size=1, **kwargs)
+
+def test_job_scores_every_resume_and_completes(db, session_factory, no_llm):
+    jd = add_jd(db, 4)
+    job = create_scoring_job(db, jd)
+    assert (job.status, job.total, job.skipped) == ("queued", 4, 0)
+
+    score_fn = stub_score(score=72)
+    run(session_factory, job.id, score_fn)
+    db.expire_all()
+    job = db.get(ScoringJob, job.id)
+    assert (job.status, job.done, job.failed) == ("completed", 4, 0)
+    assert len(score_fn.calls) == 4
+    for resume in db.query(Resume):
+        assert resume.score == 72 and resume.verdict == "Relevant"
+        assert resume.score_json["fingerprint"]
+    assert {item.status for item in db.query(ScoringJobItem)} == {"done"}
+
+    # Current scores are not requeued; force rescoring everything
+    rerun = create_scoring_job(db, jd)
+    assert (rerun.total, rerun.skipped) == (0, 4)
+    assert create_scoring_job(db, jd, force=True).total == 4
+
+def test_failed_items_are_counted_and_kept(db, session_factory, no_llm):
+    jd = add_jd(db, 4)
+    job = create_scoring_job(db, jd)
+    score_fn = stub_score(fail=("Candidate 1",))
+    def raising_score_fn(resume_json, jd_json, api_key=None):
+        if resume_json["name"] == "Candidate 2":
+            raise RuntimeError("provider down")
+        return score_fn(resume_json, jd_json, api_key=api_key)
+
+    run(session_factory, job.id, raising_score_fn)
+    db.expire_all()
+    job = db.get(ScoringJob, job.id)
+    # Failures do not fail the job; they are counted on it and recorded per item
+    assert (job.status, job.done, job.failed) == ("completed", 2, 2)
+    errors = {item.resume_id: item.error for item in db.query(ScoringJobItem).filter(ScoringJobItem.status == "failed")}
+    names = dict(db.query(Resume.id, Resume.filename))
+    assert sorted(names[resume_id] for resume_id in errors) == ["1.txt", "2.txt"]
+    assert "provider down" in errors[next(i for i, name in names.items() if name == "2.txt")]
+    # Failed resumes keep no score, so the next job picks them up again
+    assert create_scoring_job(db, jd).total == 2
+
+def test_stale_job_resumes_with_pending_items_only(db, session_factory, no_llm, monkeypatch):
+    jd = add_jd(db, 3)
+    job = create_scoring_job(db, jd)
+    first = db.query(ScoringJobItem).filter(ScoringJobItem.job_id == job.id).order_by(ScoringJobItem.id).first()
+    # A worker that scored one item, then died without a heartbeat for longer than the stale window
+    first.status = "done"
+    job.status, job.done = "running", 1
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=scoring_jobs.SCORING_JOB_STALE_SECONDS + 60)
+    db.commit()
+
+    enqueued = []
+    monkeypatch.setattr(scoring_jobs, "enqueue_scoring_job", lambda job_id, api_key=None: enqueued.append(job_id))
+    resume_pending_jobs(session_factory)
+    assert enqueued == [job.id]
+
+    score_fn = stub_score()
+    run(session_factory, job.id, score_fn)
+    db.expire_all()
+    job = db.get(ScoringJob, job.id)
+    assert (job.status, job.done, job.failed) == ("completed", 3, 0)
+    assert sorted(score_fn.calls) == ["Candidate 1", "Candidate 2"]
+
+def test_live_or_finished_jobs_are_not_claimed(db, session_factory, no_llm, monkeypatch):
+    jd = add_jd(db, 2)
+    running = create_scoring_job(db, jd)
+    running.status, running.heartbeat_at = "running", datetime.utcnow()
+    db.commit()
+
+    enqueued = []
+    monkeypatch.setattr(scoring_jobs, "enqueue_scoring_job", lambda job_id, api_key=None: enqueued.append(job_id))
+    resume_pending_jobs(session_factory)
+    assert enqueued == []
+
+    score_fn = stub_score()
+    run(session_factory, running.id, score_fn)
+    db.expire_all()
+    assert db.get(ScoringJob, running.id).status == "running" and score_fn.calls == []
+
+    queued = create_scoring_job(db, jd, force=True)
+    run(session_factory, queued.id, score_fn)
+    run(session_factory, queued.id, score_fn)
+    # The second run finds the job completed and scores nothing
+    assert len(score_fn.calls) == 2
+
+def test_batch_entries_the_model_got_wrong_are_scored_singly(db, session_factory, no_llm):
+    jd = add_jd(db, 3)
+    job = create_scoring_job(db, jd)
+    score_fn = stub_score(score=50)
+    batches = []
+    def batch_score_fn(resume_jsons, jd_json, api_key=None):
+        batches.append([resume_json["name"] for resume_json in resume_jsons])
+        # The model dropped the middle candidate
+        result = {"score": 90, "verdict": "Highly Relevant", "missing_skills": [], "matching_skills": [],
+                  "red_flags": [], "reasoning": "Batch."}
+        return [dict(result) if i != 1 else None for i in range(len(resume_jsons))]
+
+    run_scoring_job(job.id, score_fn=score_fn, batch_score_fn=batch_score_fn, session_factory=session_factory, batch_size=3)
+    db.expire_all()
+    assert db.get(ScoringJob, job.id).done == 3
+    assert batches == [["Candidate 0", "Candidate 1", "Candidate 2"]] and score_fn.calls == ["Candidate 1"]
+    assert [resume.score for resume in db.query(Resume).order_by(Resume.id)] == [90, 50, 90]
+
+def test_failed_batch_call_falls_back_to_single_scoring(db, session_factory, no_llm):
+    jd = add_jd(db, 3)
+    job = create_scoring_job(db, jd)
+    score_fn = stub_score(score=60)
+    def batch_score_fn(resume_jsons, jd_json, api_key=None):
+        raise RuntimeError("context length exceeded")
+
+    run_scoring_job(job.id, score_fn=score_fn, batch_score_fn=batch_score_fn, session_factory=session_factory, batch_size=3)
+    db.expire_all()
+    job = db.get(ScoringJob, job.id)
+    assert (job.done, job.failed) == (3, 0)
+    assert sorted(score_fn.calls) == ["Candidate 0", "Candidate 1", "Candidate 2"]
+
+def slow_score(seconds: float, score: int):
+    """stub_score() whose calls each take `seconds`."""
+    score_fn = stub_score(score=score)
+    def slow(resume_json, jd_json, api_key=None):
+        time.sleep(seconds)
+        return score_fn(resume_json, jd_json, api_key=api_key)
+    slow.calls = score_fn.calls
+    return slow
+
+def test_heartbeat_keeps_a_slow_job_from_being_taken_over(db, session_factory, no_llm, monkeypatch):
+    monkeypatch.setattr(scoring_jobs, "SCORING_JOB_STALE_SECONDS", 1)
+    monkeypatch.setattr(scoring_jobs, "SCORING_JOB_HEARTBEAT_SECONDS", 0.2)
+    jd = add_jd(db, 2)
+    job = create_scoring_job(db, jd)
+    first = slow_score(2, score=70)
+    worker = threading.Thread(target=run, args=(session_factory, job.id, first))
+    worker.start()
+    time.sleep(1.5)
+    # No item has finished for longer than the stale window, but the heartbeat is fresh
+    db.expire_all()
+    assert not scoring_jobs.is_stale(db.get(ScoringJob, job.id))
+    second = stub_score()
+    run(session_factory, job.id, second)
+    worker.join()
+    db.expire_all()
+    job = db.get(ScoringJob, job.id)
+    assert second.calls == [] and len(first.calls) == 2
+    assert (job.status, job.done, job.total) == ("completed", 2, 2)
+
+def test_superseded_worker_stops_without_writing(db, session_factory, no_llm, monkeypatch):
+    # No heartbeats, as if the worker's process had stalled: the job looks dead and is claimed again
+    monkeypatch.setattr(scoring_jobs, "SCORING_JOB_STALE_SECONDS", 1)
+    monkeypatch.setattr(scoring_jobs, "SCORING_JOB_HEARTBEAT_SECONDS", 60)
+    jd = add_jd(db, 2)
+    job = create_scoring_job(db, jd)
+    first = slow_score(2, score=10)
+    worker = threading.Thread(target=run, args=(session_factory, job.id, first))
+    worker.start()
+    time.sleep(1.2)
+    second = stub_score(score=80)
+    run(session_factory, job.id, second)
+    worker.join()
+    db.expire_all()
+    job = db.get(ScoringJob, job.id)
+    assert len(second.calls) == 2
+    # The first worker's late results were refused: counters are not doubled, scores are the second's
+    assert (job.status, job.done, job.failed, job.total) == ("completed", 2, 0, 2)
+    assert [resume.score for resume in db.query(Resume)] == [80, 80]
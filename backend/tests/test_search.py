@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import inspect, text
+from models import JobDescription
+from services import search
+from services.ingestion import insert_resumes
+from services.search import parse_query, postgres_query, search_resumes, sqlite_match
+
+RESUMES = [
+    ("Jane Doe", ["Python", "C++"], "Built machine learning pipelines in C++ and Python."),
+    ("John Roe", ["Java"], "Led a team and shipped payment APIs. Not a python developer, or so he says."),
+]
+
+def add_resumes(db):
+    jd = JobDescription(role_title="Engineer", filename="jd.txt", parsed_json={"required_skills": ["python"]})
+    db.add(jd)
+    db.commit()
+    return insert_resumes(db, jd.id, [
+        {"filename": f"{name}.txt", "raw_text": body, "status": "parsed",
+         "parsed_json": {"name": name, "skills": {"technical": skills}}}
+        for name, skills, body in RESUMES
+    ])
+
+def test_first_insert_creates_the_index(db):
+    bind = db.get_bind()
+    assert bind not in search._ready and "resume_fts" not in inspect(bind).get_table_names()
+    jane, _ = add_resumes(db)
+    assert "resume_fts" in inspect(bind).get_table_names()
+    assert [resume_id for resume_id, _ in search_resumes(db, "pipelines")["hits"]] == [jane]
+
+def test_rolled_back_insert_leaves_the_index_to_be_created_again(db):
+    bind = db.get_bind()
+    # Indexing runs after the caller's own insert
+    db.add(JobDescription(role_title="Engineer", filename="jd.txt"))
+    db.flush()
+    search.index_resumes(db, [(1, None, {"name": "Jane"}, "text", [])])
+    db.rollback()
+    assert bind not in search._ready and "resume_fts" not in inspect(bind).get_table_names()
+    add_resumes(db)
+    assert search_resumes(db, "jane")["total"] == 1
+
+@pytest.mark.parametrize("q, terms, phrases", [
+    ("", [], []),
+    ("   ", [], []),
+    ('""', [], []),
+    ('"machine  learning" c++', ["c++"], ["machine learning"]),
+    ('python AND NOT java', ["python", "AND", "NOT", "java"], []),
+    ('"unclosed phrase', ["unclosed", "phrase"], []),
+    ("name:jane pyth* -java (c++)", ["namejane", "pyth", "java", "c++"], []),
+    ("NEAR(python java) ^python", ["NEARpython", "java", "python"], []),
+])
+def test_parse_query_keeps_only_words(q, terms, phrases):
+    assert parse_query(q) == (terms, phrases)
+
+@pytest.mark.parametrize("q, names", [
+    ("", []),
+    ('""', []),
+    ('"', []),
+    ("python", ["Jane Doe", "John Roe"]),
+    ('"machine learning" c++', ["Jane Doe"]),
+    ('"learning machine"', []),
+    # FTS5 operators in user input are searched for as words
+    ("python AND NOT java", ["John Roe"]),
+    ("python OR java", ["John Roe"]),
+    ('java"; DROP TABLE resumes; --', []),
+    ("name:jane NEAR(python) pyth* -java ^c++", []),
+    ("C++", ["Jane Doe"]),
+])
+def test_user_input_is_searched_literally(db, q, names):
+    ids = dict(zip(add_resumes(db), [name for name, _, _ in RESUMES]))
+    assert sorted(ids[resume_id] for resume_id, _ in search_resumes(db, q)["hits"]) == names
+    assert db.execute(text("SELECT count(*) FROM resumes")).scalar() == 2
+
+def test_match_expressions_quote_every_word():
+    assert sqlite_match([], [], []) == ""
+    assert sqlite_match(['a"b', "OR"], ["x y"], ["sk1"]) == (
+        '{name skills titles body} : ("a""b" AND "OR" AND "x y") AND tags : ("sk1")'
+    )
+    query, params = postgres_query(["it's", "a|b"], ['"x" & y'], ["sk1", "jd2"])
+    assert query == (
+        "plainto_tsquery('english', :term0) && plainto_tsquery('english', :term1) && "
+        "phraseto_tsquery('english', :phrase0) && to_tsquery('simple', :tags)"
+    )
+    assert params == {"term0": "it's", "term1": "a|b", "phrase0": '"x" & y', "tags": "sk1 & jd2"}
+    assert postgres_query([], [], []) == ("", {})
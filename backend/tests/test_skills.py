@@ -0,0 +1,92 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from database import MIGRATIONS_DIR
+from models import JobDescription, Resume, Skill, SkillAlias
+from services import skills
+from services.skills import SkillTaxonomy
+
+@pytest.fixture
+def taxonomy(db):
+    taxonomy = SkillTaxonomy()
+    taxonomy.load(db)
+    return taxonomy
+
+def names(taxonomy, db, terms):
+    return [taxonomy.name(skill_id) for skill_id in taxonomy.resolve(db, terms)]
+
+def test_spellings_resolve_to_one_skill(db, taxonomy):
+    assert names(taxonomy, db, ["React.js", "reactjs", "ReactJS", "Postgres", "k8s"]) == ["React", "PostgreSQL", "Kubernetes"]
+
+@pytest.mark.parametrize("term, skill", [
+    ("GitHub", "GitHub"),
+    ("GitLab", "GitLab"),
+    ("git", "Git"),
+    ("Spring", "Spring"),
+    ("Spring Boot", "Spring Boot"),
+    ("Next.js", "Next.js"),
+])
+def test_related_skills_stay_distinct(db, taxonomy, term, skill):
+    assert names(taxonomy, db, [term]) == [skill]
+
+@pytest.mark.parametrize("term", ["next", "PM"])
+def test_ambiguous_words_are_not_seeded_skills(db, taxonomy, term):
+    assert names(taxonomy, db, [term]) == [term]
+
+@pytest.mark.parametrize("typo, skill", [
+    ("Kubernets", "Kubernetes"),
+    ("Typescrpt", "TypeScript"),
+    ("Tensorflw", "TensorFlow"),
+])
+def test_typos_match_by_trigrams_and_become_aliases(db, taxonomy, typo, skill):
+    assert names(taxonomy, db, [typo]) == [skill]
+    key = skills.normalize_term(typo)
+    assert db.get(SkillAlias, key).skill_id == taxonomy.lookup(db, skill)
+    assert taxonomy._match(key) == (taxonomy.lookup(db, skill), True)
+
+def test_typos_below_the_threshold_are_new_skills(db, taxonomy, monkeypatch):
+    # "kubernets" is 0.58 similar to "kubernetes"
+    monkeypatch.setattr(skills, "SKILL_FUZZY_THRESHOLD", 0.6)
+    assert taxonomy.lookup(db, "Kubernets") is None
+    monkeypatch.setattr(skills, "SKILL_FUZZY_THRESHOLD", 0.55)
+    assert taxonomy.name(taxonomy.lookup(db, "Kubernets")) == "Kubernetes"
+
+@pytest.mark.parametrize("term", [
+    "Pythn",  # one dropped letter in a short key leaves too few shared trigrams
+    "Pandora",
+    "GraphiteDB",
+    "Terrafirma",  # close in spelling, a different word
+    "Kafkaesque",  # contains a skill, but far longer
+])
+def test_near_misses_do_not_match(db, taxonomy, term):
+    assert taxonomy.lookup(db, term) is None
+    assert names(taxonomy, db, [term]) == [term]
+
+def test_migration_splits_wrongly_merged_aliases(session_factory, db, taxonomy):
+    git = taxonomy.lookup(db, "git")
+    python = taxonomy.lookup(db, "python")
+    # A database seeded with the old aliases, and a resume resolved through one
+    db.query(SkillAlias).filter(SkillAlias.key.in_(["github", "gitlab", "springframework"])).delete()
+    db.query(Skill).filter(Skill.name.in_(["GitHub", "GitLab", "Spring"])).delete()
+    db.query(SkillAlias).filter(SkillAlias.key == "spring").delete()
+    db.add_all([SkillAlias(key="github", skill_id=git), SkillAlias(key="pm", skill_id=taxonomy.lookup(db, "project management"))])
+    jd = JobDescription(role_title="Engineer", filename="jd.txt", skill_ids={"required": [git], "good_to_have": []})
+    db.add(jd)
+    db.flush()
+    db.add_all([Resume(job_description_id=jd.id, filename="a.txt", skill_ids=[python, git]),
+                Resume(job_description_id=jd.id, filename="b.txt", skill_ids=[python])])
+    db.execute(text("UPDATE alembic_version SET version_num = '0006'"))
+    db.commit()
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    with db.get_bind().begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+    db.expire_all()
+    assert db.get(SkillAlias, "github").skill_id != git and db.get(SkillAlias, "pm") is None
+    assert db.get(Skill, db.get(SkillAlias, "github").skill_id).name == "GitHub"
+    assert db.get(Skill, db.get(SkillAlias, "spring").skill_id).name == "Spring"
+    assert db.get(JobDescription, jd.id).skill_ids is None
+    assert [resume.skill_ids for resume in db.query(Resume).order_by(Resume.id)] == [None, [python]]
@@ -0,0 +1,47 @@
+import pytest
+from typing import List
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from services.uploads import RequestSizeLimitMiddleware
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, max_bytes=4096, limits={"/one": 1024})
+    parsed = []
+
+    @app.post("/many")
+    async def many(files: List[UploadFile] = File(...)):
+        parsed.append(len(files))
+        return {"sizes": [file.size for file in files]}
+
+    @app.post("/one")
+    async def one(file: UploadFile = File(...)):
+        parsed.append(1)
+        return {"size": file.size}
+
+    client = TestClient(app)
+    client.parsed = parsed
+    return client
+
+def test_bodies_within_the_limit_are_parsed(client):
+    response = client.post("/many", files=[("files", ("a.txt", b"x" * 1000)), ("files", ("b.txt", b"y" * 1000))])
+    assert response.status_code == 200 and response.json() == {"sizes": [1000, 1000]}
+
+def test_oversized_content_length_is_refused_before_parsing(client):
+    response = client.post("/one", files={"file": ("a.txt", b"x" * 2000)})
+    assert response.status_code == 413 and "limit" in response.json()["detail"]
+    assert client.post("/many", files={"files": ("a.txt", b"x" * 5000)}).status_code == 413
+    assert client.parsed == []
+
+def test_streamed_body_is_cut_off_at_the_limit(client):
+    boundary = "limit-test"
+    def body():
+        yield f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.txt\"\r\n\r\n".encode()
+        for _ in range(10):
+            yield b"x" * 512
+        yield f"\r\n--{boundary}--\r\n".encode()
+    # No Content-Length: the body arrives in chunks
+    response = client.post("/one", content=body(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+    assert client.parsed == []
@@ -0,0 +1,145 @@
+"""
+Load test for the write path: N concurrent clients upload synthetic resumes
+to /upload/resumes, then score them with /score (polling /score/jobs until
+each job finishes), and p50/p95 latency and throughput are printed per
+phase. Start the server with the offline LLM stand-in so no API calls are
+made and results are repeatable:
+
+    LLM_PROVIDER=fake FAKE_LLM_LATENCY_MS=800 FAKE_LLM_ERROR_RATE=0.02 uvicorn main:app --port 8001
+    python bench_pipeline.py --url http://localhost:8001 --concurrency 8 --uploads 40 --files-per-upload 5
+"""
+import argparse
+import asyncio
+import random
+import time
+import httpx
+from load_test import percentile
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Angular", "Node", "Django", "Flask", "FastAPI",
+    "Spring", "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "AWS", "Azure", "GCP", "Docker",
+    "Kubernetes", "Terraform", "Kafka", "Spark", "Pandas", "TensorFlow", "PyTorch", "Go", "Rust", "Linux",
+]
+FIRST_NAMES = ["Asha", "Ravi", "Maria", "John", "Wei", "Fatima", "Carlos", "Priya", "Olga", "Kenji"]
+LAST_NAMES = ["Sharma", "Iyer", "Garcia", "Smith", "Chen", "Khan", "Silva", "Nair", "Petrova", "Sato"]
+# Upload statuses of files that were stored with a usable parse
+PARSED_STATUSES = ("parsed", "cached", "reused", "local")
+
+def resume_text(rng, run_id, n):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = ", ".join(rng.sample(SKILLS, rng.randint(3, 8)))
+    years = rng.randint(0, 15)
+    return (
+        f"{name}\n{name.lower().replace(' ', '.')}.{run_id}.{n}@example.com\n+1 555 {rng.randint(1000000, 9999999)}\n\n"
+        f"Software engineer with {years} years of experience.\nSkills: {skills}\n"
+        f"Experience: built services at Company {rng.randint(1, 500)} using {skills}.\n"
+        f"Education: B.Tech, State University, {2024 - years}\n"
+    )
+
+def jd_text(rng, n):
+    return (
+        f"Backend Engineer {n}\nRequired skills: {', '.join(rng.sample(SKILLS, 5))}\n"
+        f"Minimum {rng.randint(1, 6)} years of experience. Location: Remote.\n"
+    )
+
+class Phase:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.items = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def report(self):
+        count = len(self.latencies)
+        print(f"{self.name:<16} {count:>6} {count / self.elapsed:>8.2f} {self.items / self.elapsed:>9.1f} "
+              f"{percentile(self.latencies, 0.5):>9.0f} {percentile(self.latencies, 0.95):>9.0f} {self.errors:>7}")
+
+async def upload_jd(client, rng, n):
+    files = {"file": (f"jd_{n}.txt", jd_text(rng, n).encode(), "text/plain")}
+    response = await client.post("/upload/jd", files=files)
+    response.raise_for_status()
+    return response.json()["id"]
+
+async def upload_loop(client, phase, jd_id, count, files_per_upload, rng, run_id, counter):
+    for _ in range(count):
+        files = []
+        for _ in range(files_per_upload):
+            counter[0] += 1
+            files.append(("files", (f"resume_{run_id}_{counter[0]}.txt", resume_text(rng, run_id, counter[0]).encode(), "text/plain")))
+        started = time.perf_counter()
+        try:
+            response = await client.post("/upload/resumes", params={"jd_id": jd_id}, files=files)
+            response.raise_for_status()
+            statuses = [f["status"] for f in response.json()["files"]]
+        except httpx.HTTPError:
+            phase.errors += 1
+            continue
+        phase.latencies.append((time.perf_counter() - started) * 1000)
+        phase.items += sum(status in PARSED_STATUSES for status in statuses)
+        phase.errors += sum(status not in PARSED_STATUSES for status in statuses)
+
+async def score_loop(client, phase, jd_id, rounds, poll):
+    """One /score job per round; latency is from the POST until the job finishes."""
+    for _ in range(rounds):
+        started = time.perf_counter()
+        try:
+            response = await client.post("/score", params={"jd_id": jd_id, "force": "true"})
+            response.raise_for_status()
+            job = response.json()
+            job_id = job["job_id"]
+            while job["status"] not in ("completed", "failed"):
+                await asyncio.sleep(poll)
+                response = await client.get(f"/score/jobs/{job_id}")
+                response.raise_for_status()
+                job = response.json()
+        except httpx.HTTPError:
+            phase.errors += 1
+            continue
+        phase.latencies.append((time.perf_counter() - started) * 1000)
+        phase.items += job.get("done", 0)
+        phase.errors += job.get("failed", 0) + (job["status"] == "failed")
+
+async def run_phase(phase, loops):
+    started = time.perf_counter()
+    await asyncio.gather(*loops)
+    phase.elapsed = time.perf_counter() - started
+
+async def run(args):
+    rng = random.Random(args.seed)
+    run_id = args.run_id or str(int(time.time()))
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        # One JD per client, so concurrent scoring jobs do not rescore the same resumes
+        jd_ids = [await upload_jd(client, rng, n) for n in range(args.concurrency)]
+        per_client = [args.uploads // args.concurrency + (i < args.uploads % args.concurrency) for i in range(args.concurrency)]
+        counter = [0]
+        uploads = Phase("upload/resumes")
+        await run_phase(uploads, [
+            upload_loop(client, uploads, jd_id, count, args.files_per_upload, rng, run_id, counter)
+            for jd_id, count in zip(jd_ids, per_client)
+        ])
+        scoring = Phase("score (job)")
+        await run_phase(scoring, [score_loop(client, scoring, jd_id, args.score_rounds, args.poll) for jd_id in jd_ids])
+
+    print(f"{args.url}  concurrency={args.concurrency}  files/upload={args.files_per_upload}  run={run_id}")
+    print(f"{'phase':<16} {'reqs':>6} {'req/s':>8} {'items/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    uploads.report()
+    scoring.report()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--uploads", type=int, default=40, help="Upload requests in total, spread over the clients")
+    parser.add_argument("--files-per-upload", type=int, default=5)
+    parser.add_argument("--score-rounds", type=int, default=2, help="Scoring jobs per client (force=true, so each rescores all its resumes)")
+    parser.add_argument("--poll", type=float, default=0.5, help="Seconds between job status polls")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic documents")
+    parser.add_argument("--run-id", help="Tag in the resume emails; reuse one to re-upload the same documents (exercises parse reuse)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
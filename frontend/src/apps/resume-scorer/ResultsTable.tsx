@@ -16,12 +16,15 @@ export default function ResultsTable({ selectedJdId }: ResultsTableProps) {
     const [candidates, setCandidates] = useState<any[]>([]);
     const [loading, setLoading] = useState(false);
     const [selectedCandidate, setSelectedCandidate] = useState<any | null>(null);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         if (selectedJdId) {
             fetchAnalysis();
         } else {
             setCandidates([]);
+            setNextCursor(null);
         }
     }, [selectedJdId]);
 
@@ -30,6 +33,7 @@ export default function ResultsTable({ selectedJdId }: ResultsTableProps) {
         try {
             const response = await api.get(`/analysis?jd_id=${selectedJdId}`);
             setCandidates(response.data);
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (error) {
             console.error("Failed to fetch results", error);
         } finally {
@@ -37,6 +41,20 @@ export default function ResultsTable({ selectedJdId }: ResultsTableProps) {
         }
     };
 
+    const fetchMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const response = await api.get(`/analysis?jd_id=${selectedJdId}&cursor=${encodeURIComponent(nextCursor)}`);
+            setCandidates((prev) => [...prev, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+        } catch (error) {
+            console.error("Failed to fetch more results", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const getVerdictVariant = (verdict: string) => {
         switch (verdict?.toLowerCase()) {
             case 'highly relevant': return 'success';
@@ -78,7 +96,7 @@ export default function ResultsTable({ selectedJdId }: ResultsTableProps) {
                                             key={candidate.id}
                                             initial={{ opacity: 0, y: 10 }}
                                             animate={{ opacity: 1, y: 0 }}
-                                            transition={{ delay: index * 0.05 }}
+                                            transition={{ delay: Math.min(index, 20) * 0.05 }}
                                             className="border-b hover:bg-muted/50 transition-colors"
                                         >
                                             <td className="px-4 py-3 font-medium">#{index + 1}</td>
@@ -112,6 +130,13 @@ export default function ResultsTable({ selectedJdId }: ResultsTableProps) {
                                     ))}
                                 </tbody>
                             </table>
+                            {nextCursor && (
+                                <div className="flex justify-center pt-4">
+                                    <Button variant="outline" size="sm" onClick={fetchMore} disabled={loadingMore}>
+                                        {loadingMore ? "Loading..." : "Load more"}
+                                    </Button>
+                                </div>
+                            )}
                         </div>
                     )}
                 </CardContent>
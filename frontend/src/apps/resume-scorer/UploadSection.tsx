@@ -12,6 +12,16 @@ interface UploadSectionProps {
     isCreateMode?: boolean;
 }
 
+// Scoring runs as a background job on the server; poll until it finishes
+const waitForScoringJob = async (jobId: number) => {
+    while (true) {
+        const response = await api.get(`/score/jobs/${jobId}`);
+        if (response.data.status === 'completed') return response.data;
+        if (response.data.status === 'failed') throw new Error(response.data.error || 'Scoring failed');
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+};
+
 export default function UploadSection({ onUploadComplete, selectedJdId, isCreateMode = false }: UploadSectionProps) {
     const [uploading, setUploading] = useState(false);
     const [jdFile, setJdFile] = useState<File | null>(null);
@@ -75,7 +85,8 @@ export default function UploadSection({ onUploadComplete, selectedJdId, isCreate
 
             // Trigger Scoring (Skip if in Create Mode, or maybe score if just JD uploaded? No, need resumes)
             if (!isCreateMode && currentJdId && resumeFiles.length > 0) {
-                await api.post(`/score?jd_id=${currentJdId}`);
+                const scoreResponse = await api.post(`/score?jd_id=${currentJdId}`);
+                await waitForScoringJob(scoreResponse.data.job_id);
             }
 
             setStatus({ type: 'success', message: isCreateMode ? 'Role created successfully!' : 'Files uploaded and analysis complete!' });
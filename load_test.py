@@ -0,0 +1,71 @@
+"""
+Load test for the read endpoints: N concurrent clients request the given
+paths in a loop for a fixed time, then requests/sec and latency percentiles
+are printed per path. Run it against the server before and after a change:
+
+    python load_test.py --url http://localhost:8001 --concurrency 32 --duration 20
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+import httpx
+
+DEFAULT_PATHS = ["/jds", "/resumes?jd_id=1", "/resumes/search?q=python", "/analysis?jd_id=1&limit=50"]
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+async def client_loop(client, paths, offset, deadline, latencies, errors):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors[path] += 1
+                continue
+        except httpx.HTTPError:
+            errors[path] += 1
+            continue
+        latencies[path].append((time.perf_counter() - started) * 1000)
+
+async def run(url, paths, concurrency, duration, warmup):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        if warmup:
+            await asyncio.gather(*[client.get(path) for path in paths])
+        latencies, errors = defaultdict(list), defaultdict(int)
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            client_loop(client, paths, i, deadline, latencies, errors) for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    print(f"{url}  concurrency={concurrency}  duration={elapsed:.1f}s")
+    print(f"{'path':<40} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for path in paths:
+        values = latencies[path]
+        print(f"{path:<40} {len(values) / elapsed:>8.1f} {percentile(values, 0.5):>8.1f} "
+              f"{percentile(values, 0.95):>8.1f} {errors[path]:>7}")
+    total = sum(len(values) for values in latencies.values())
+    print(f"{'total':<40} {total / elapsed:>8.1f} {'':>8} {'':>8} {sum(errors.values()):>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--path", action="append", help="Path to request (repeatable); defaults to the main read endpoints")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--no-warmup", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.path or DEFAULT_PATHS, args.concurrency, args.duration, not args.no_warmup))
+
+if __name__ == "__main__":
+    main()